@@ -0,0 +1,64 @@
+"""Benchmark of the referee assignment solver.
+
+Usage: ``python benchmarks/bench_arbitros.py [partidos] [arbitros] [categorias]``
+
+Builds a synthetic weekend (crossings of ``categorias`` partidos each) and
+times :func:`ligas.arbitros.plan_asignaciones`, without touching the database.
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from ligas.arbitros import ArbitroSlot, PartidoSlot, plan_asignaciones  # noqa: E402
+
+
+def build(partidos: int, arbitros: int, categorias: int, seed: int = 7):
+    rng = random.Random(seed)
+    clubes = list(range(1, 2 * (partidos // categorias + 1) + 1))
+    slots = []
+    partido_id = 0
+    for idx in range(0, len(clubes) - 1, 2):
+        for _ in range(categorias):
+            if partido_id >= partidos:
+                break
+            partido_id += 1
+            slots.append(PartidoSlot(partido_id, clubes[idx], clubes[idx + 1]))
+    refs = [
+        ArbitroSlot(
+            arbitro_id=ref_id,
+            capacidad=rng.randint(3, 8),
+            carga=rng.randint(0, 40),
+            clubes={club: rng.randint(0, 3) for club in rng.sample(clubes, k=min(6, len(clubes)))},
+        )
+        for ref_id in range(1, arbitros + 1)
+    ]
+    return slots, refs
+
+
+def main():
+    partidos = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    arbitros = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+    categorias = int(sys.argv[3]) if len(sys.argv) > 3 else 12
+    for total in sorted({partidos // 4, partidos // 2, partidos}):
+        slots, refs = build(total, arbitros, categorias)
+        inicio = time.perf_counter()
+        plan = plan_asignaciones(slots, refs)
+        duracion = time.perf_counter() - inicio
+        print(
+            f"{total:>5} partidos / {arbitros} árbitros: {len(plan)} asignados "
+            f"en {duracion * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
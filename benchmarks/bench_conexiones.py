@@ -0,0 +1,64 @@
+"""Benchmark of per-request connection cost.
+
+Usage: ``python benchmarks/bench_conexiones.py [requests]``
+
+Replays the connection lifecycle Django runs around every request
+(``close_old_connections`` on request start and finish) plus one small query,
+with ``CONN_MAX_AGE = 0`` (a new connection per request, the previous default)
+and with persistent connections, with and without health checks. Uses the
+database configured by the environment, so run it against Postgres to see the
+real handshake cost.
+"""
+
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import close_old_connections, connection  # noqa: E402
+
+
+def simular(requests: int, max_age, health_checks: bool):
+    connection.close()
+    connection.settings_dict["CONN_MAX_AGE"] = max_age
+    connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+    tiempos = []
+    for _ in range(requests):
+        inicio = time.perf_counter()
+        close_old_connections()  # request_started
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        close_old_connections()  # request_finished
+        tiempos.append(time.perf_counter() - inicio)
+    connection.close()
+    return tiempos
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"Motor: {connection.vendor}  requests: {requests}")
+    base = None
+    for nombre, max_age, health in (
+        ("nueva conexión por request (CONN_MAX_AGE=0)", 0, False),
+        ("persistente (CONN_MAX_AGE=60)", 60, False),
+        ("persistente + health checks", 60, True),
+    ):
+        simular(min(requests, 20), max_age, health)  # calentamiento
+        tiempos = simular(requests, max_age, health)
+        p50 = statistics.median(tiempos) * 1000
+        p95 = sorted(tiempos)[int(len(tiempos) * 0.95) - 1] * 1000
+        base = base or p50
+        print(f"{nombre:48s} p50={p50:7.3f} ms  p95={p95:7.3f} ms  ahorro p50={base - p50:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
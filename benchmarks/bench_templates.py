@@ -0,0 +1,92 @@
+"""Benchmark of template render time per template.
+
+Usage: ``python benchmarks/bench_templates.py [renders] [template ...]``
+
+Renders each template of the panel (all of ``ligas/templates`` by default)
+as a superuser on an empty context, in three configurations:
+
+- loaders without cache and no fragment cache: every render reads and parses
+  the template and its parents from disk (what ``DEBUG=1`` did before);
+- cached loader: templates are compiled once per process;
+- cached loader plus the ``{% cache %}`` fragments of ``base_admin.html``.
+
+Templates that cannot render without their view's context are skipped.
+"""
+
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.template.backends.django import DjangoTemplates  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+SIN_FRAGMENTOS = {
+    "default": settings.CACHES["default"],
+    "template_fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+CON_FRAGMENTOS = {
+    "default": settings.CACHES["default"],
+    "template_fragments": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench"},
+}
+
+
+def motor(loaders):
+    opciones = dict(settings.TEMPLATES[0]["OPTIONS"], loaders=loaders)
+    return DjangoTemplates({"NAME": "bench", "DIRS": [], "APP_DIRS": False, "OPTIONS": opciones})
+
+
+def plantillas():
+    raiz = Path(__file__).resolve().parent.parent / "ligas" / "templates"
+    return sorted(str(ruta.relative_to(raiz)) for ruta in raiz.rglob("*.html"))
+
+
+def medir(backend, nombre, renders):
+    request = RequestFactory().get("/administracion/ligas/")
+    request.user = User(username="bench", is_active=True, is_superuser=True, is_staff=True)
+    backend.get_template(nombre).render({}, request)  # calentamiento
+    tiempos = []
+    for _ in range(renders):
+        inicio = time.perf_counter()
+        backend.get_template(nombre).render({}, request)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    nombres = sys.argv[2:] or plantillas()
+    sin_cache = motor(LOADERS)
+    cacheado = motor([("django.template.loaders.cached.Loader", LOADERS)])
+    print(f"renders: {renders}  (p50 en ms)")
+    print(f"{'plantilla':56s} {'sin cache':>10s} {'loader':>10s} {'+fragm.':>10s}")
+    for nombre in nombres:
+        try:
+            with override_settings(CACHES=SIN_FRAGMENTOS):
+                base = medir(sin_cache, nombre, renders)
+                loader = medir(cacheado, nombre, renders)
+            with override_settings(CACHES=CON_FRAGMENTOS):
+                fragmentos = medir(cacheado, nombre, renders)
+        except Exception as exc:  # noqa: BLE001 - plantillas que requieren contexto
+            print(f"{nombre:56s} omitida ({type(exc).__name__})")
+            continue
+        print(f"{nombre:56s} {base:10.3f} {loader:10.3f} {fragmentos:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the project through it (e.g. ``uvicorn config.asgi:application``) so the
+live results stream (``/api/v1/torneos/<id>/en-vivo/``) holds connections
+without tying up a worker thread each.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +15,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Los settings lo leen para no usar conexiones persistentes (ver DB_CONN_MAX_AGE)
+os.environ.setdefault('LIGAS_ASGI', '1')
 
 application = get_asgi_application()
@@ -10,9 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
-from pathlib import Path
 import os
+from importlib.util import find_spec
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 
@@ -20,6 +21,19 @@ from dotenv import load_dotenv
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
 
+
+def env_bool(nombre, default=False):
+    valor = os.getenv(nombre)
+    if valor is None:
+        return default
+    return valor.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(nombre, default):
+    valor = os.getenv(nombre)
+    return int(valor) if valor not in (None, "") else default
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -52,24 +66,51 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# Igual que ModelBackend, pero guarda los permisos de cada usuario en la cache
+# durante LIGAS_PERMISOS_TIMEOUT segundos (definido junto a CACHES).
+AUTHENTICATION_BACKENDS = [
+    'ligas.permisos.PermisosCacheadosBackend',
+]
+
+# Las plantillas se compilan una vez por proceso. En desarrollo se leen de disco
+# en cada request para ver los cambios sin reiniciar; TEMPLATE_CACHE=1 fuerza
+# el loader cacheado también con DEBUG (p. ej. para medir).
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if env_bool("TEMPLATE_CACHE", not DEBUG):
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'ligas.context_processors.identity',
+                'ligas.context_processors.panel',
             ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+
+# Conexiones persistentes: se reutilizan entre requests durante DB_CONN_MAX_AGE
+# segundos y se verifican antes de reutilizarlas si DB_CONN_HEALTH_CHECKS=1.
+# Bajo ASGI (config.asgi define LIGAS_ASGI=1) cada llamada sync puede quedar en
+# otro hilo con su propia conexión abierta: ahí el default es 0, y con
+# PostgreSQL conviene POSTGRES_POOL. WSGI, el worker y los comandos usan 60.
+SERVIDOR_ASGI = env_bool("LIGAS_ASGI")
+DB_CONN_MAX_AGE = env_int("DB_CONN_MAX_AGE", 0 if SERVIDOR_ASGI else 60)
+DB_CONN_HEALTH_CHECKS = env_bool("DB_CONN_HEALTH_CHECKS", True)
+
 # DB: usa Postgres si hay variables, sino SQLite
 if os.getenv("POSTGRES_DB"):
     DATABASES = {
@@ -80,16 +121,72 @@ if os.getenv("POSTGRES_DB"):
             "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
             "HOST": os.getenv("POSTGRES_HOST", "127.0.0.1"),
             "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+            "OPTIONS": {
+                "connect_timeout": env_int("POSTGRES_CONNECT_TIMEOUT", 5),
+            },
         }
     }
+    if env_bool("POSTGRES_POOL"):
+        # Pool de psycopg 3 (extra "pool"); reemplaza a las conexiones persistentes
+        if find_spec("psycopg_pool") is None:
+            raise ImproperlyConfigured('POSTGRES_POOL=1 requiere psycopg[pool]: pip install -e ".[pool]"')
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": env_int("POSTGRES_POOL_MIN_SIZE", 2),
+            "max_size": env_int("POSTGRES_POOL_MAX_SIZE", 10),
+            "timeout": env_int("POSTGRES_POOL_TIMEOUT", 10),
+        }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+            "OPTIONS": {
+                # WAL permite lecturas concurrentes con una escritura en curso
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    f"PRAGMA busy_timeout={env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)};"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                    "PRAGMA mmap_size=134217728;"
+                ),
+                # Toma el lock de escritura al iniciar la transacción y evita "database is locked" al promoverla
+                "transaction_mode": "IMMEDIATE",
+            },
         }
     }
 
+# Cache: "locmem" (por proceso, default), "file" o "redis" (compartida entre
+# workers; sirve cualquier servidor compatible con el protocolo de Redis).
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "ligas"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND inválido: {CACHE_BACKEND}")
+if CACHE_BACKEND == "redis" and find_spec("redis") is None:
+    raise ImproperlyConfigured('CACHE_BACKEND=redis requiere el paquete redis: pip install -e ".[redis]"')
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.getenv("CACHE_LOCATION", CACHE_BACKENDS[CACHE_BACKEND][1]),
+        "TIMEOUT": env_int("CACHE_TIMEOUT", 300),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "ligas"),
+    }
+}
+
+# Permisos por usuario (ligas.permisos): al quitar un permiso solo se entera la
+# cache del worker que atendió el cambio. Con "locmem" cada worker tiene la suya,
+# así que la copia dura unos segundos; una hora requiere "file" o "redis".
+LIGAS_PERMISOS_TIMEOUT = env_int("LIGAS_PERMISOS_TIMEOUT", 10 if CACHE_BACKEND == "locmem" else 60 * 60)
+
 STATIC_URL = "static/"
 STATICFILES_DIRS = []
 
@@ -136,3 +233,13 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Resultados en vivo (SSE): "memory" alcanza con un solo worker ASGI; con varios
+# workers usar "redis" y un servidor compatible con el protocolo de Redis.
+LIGAS_LIVE_BROKER = os.getenv("LIGAS_LIVE_BROKER", "memory")
+LIGAS_LIVE_REDIS_URL = os.getenv("LIGAS_LIVE_REDIS_URL", "redis://localhost:6379/0")
+
+# Tareas largas (generar fixture o equipos, eliminar una liga completa) se encolan
+# en la tabla Trabajo y las procesa `manage.py procesar_trabajos`; con
+# LIGAS_TRABAJOS_EAGER=1 se ejecutan dentro del mismo request (sin worker).
+LIGAS_TRABAJOS_EAGER = env_bool("LIGAS_TRABAJOS_EAGER", False)
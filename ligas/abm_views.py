@@ -1,9 +1,15 @@
+import hashlib
+import re
 from urllib.parse import urlencode
 
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
-from django.urls import reverse_lazy
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Q
+from django.urls import reverse, reverse_lazy
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views import View
 from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import FormView
@@ -12,12 +18,13 @@ from django.shortcuts import get_object_or_404, redirect
 from django.db import transaction
 from django.db.utils import OperationalError, ProgrammingError
 
-from .forms import EquipoGenerateForm, ResultadoPartidoFixtureForm
-from .fixture import (
-    FixtureAlreadyExists,
-    FixtureGenerationError,
-    generate_fixture,
-)
+from .archivo import ArchivoError, en_liga_archivada, leer_snapshot
+from .forms import EquipoGenerateForm, JugadorImportForm, ResultadoPartidoFixtureForm
+from .estadisticas import tabla_disciplina, top_goleadores
+from .exports import CONTENT_TYPES, ExportError, en_async, exportar, nombre_archivo
+from .live import delta_resultado, publicar
+from .purga import TIPOS as TIPOS_PURGA, programar_purga, progreso, purgas_pendientes
+from .trabajos import encolar
 from .models import (
     Club,
     Liga,
@@ -30,8 +37,12 @@ from .models import (
     PartidoFixture,
     ResultadoCategoriaPartido,
     SiteIdentity,
+    Trabajo,
+    normalizar_dni,
 )
 
+DNI_BUSQUEDA_RE = re.compile(r"^\d{1,3}(\.?\d{3}){2}$")
+
 
 class AdminBaseView(LoginRequiredMixin):
     # Reutilizamos el login de /admin para no montar auth aparte
@@ -55,6 +66,90 @@ class AjaxTemplateMixin:
         return template_names
 
 
+def informar_trabajo(request, trabajo, descripcion, al_terminar):
+    """Flash the outcome of a queued job, or where to follow it if it has not run yet.
+
+    In eager mode the job already ran and ``al_terminar(resultado)`` reports it.
+    """
+
+    if trabajo.estado == Trabajo.TERMINADO:
+        al_terminar(trabajo.resultado)
+    elif trabajo.estado == Trabajo.ERROR:
+        messages.error(request, trabajo.mensaje or f"Falló {descripcion}.")
+    else:
+        estado_url = reverse("ligas:trabajo_estado", args=[trabajo.pk])
+        messages.info(
+            request,
+            f"{descripcion[:1].upper()}{descripcion[1:]} quedó en cola (trabajo #{trabajo.pk}); "
+            f"el progreso se consulta en {estado_url}.",
+        )
+
+
+class LigaArchivadaGuardMixin:
+    """Refuse to edit or delete catalogue rows that an archived liga's snapshot points to.
+
+    Archiving removes the matches that protected them; a missing row would
+    leave ``restaurar_liga`` unable to put the season back.
+    """
+
+    def _rechazar_archivada(self):
+        self.object = self.get_object()
+        if not en_liga_archivada(self.object, borrar=isinstance(self, DeleteView)):
+            return None
+        messages.error(
+            self.request, f"{self.object} pertenece a una liga archivada: restaurala antes de modificarlo."
+        )
+        return redirect(self.get_success_url())
+
+    def get(self, request, *args, **kwargs):
+        return self._rechazar_archivada() or super().get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        return self._rechazar_archivada() or super().post(request, *args, **kwargs)
+
+
+def _sin_purga_pendiente(queryset, tipo):
+    """Drop the ligas/torneos (``tipo``) whose purge is queued or running."""
+
+    pendientes = purgas_pendientes()
+    queryset = queryset.exclude(pk__in=pendientes[tipo])
+    if tipo == "torneo":
+        queryset = queryset.exclude(liga_id__in=pendientes["liga"])
+    return queryset
+
+
+class OcultarEnPurgaMixin:
+    """Hide ligas/torneos waiting for their purge: not listed, and 404 on edit or delete."""
+
+    purga_tipo = None
+
+    def get_queryset(self):
+        return _sin_purga_pendiente(super().get_queryset(), self.purga_tipo)
+
+
+class PurgaDeleteMixin(OcultarEnPurgaMixin):
+    """DeleteView that removes the object and its whole tree in the background.
+
+    The request only schedules :func:`ligas.purga.purgar` and redirects; the
+    progress is available as JSON from ``PurgaEstadoView``.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["purga_en_segundo_plano"] = True
+        return context
+
+    def form_valid(self, form):
+        programar_purga(self.purga_tipo, self.object.pk, usuario=self.request.user)
+        estado_url = reverse("ligas:purga_estado", args=[self.purga_tipo, self.object.pk])
+        messages.info(
+            self.request,
+            f"Se está eliminando {self.object} con todos sus datos; puede tardar unos minutos "
+            f"(progreso en {estado_url}).",
+        )
+        return redirect(self.get_success_url())
+
+
 class AjaxCreateMixin(AjaxTemplateMixin):
     """Enhances CreateView to support 'save and add another' in AJAX modals."""
     def form_valid(self, form):
@@ -152,7 +247,7 @@ class ClubUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin,
     success_url = reverse_lazy("ligas:club_list")
 
 
-class ClubDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
+class ClubDeleteView(LigaArchivadaGuardMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
     permission_required = "ligas.delete_club"
     model = Club
     template_name = "ligas/administracion/confirm_delete.html"
@@ -163,9 +258,10 @@ class ClubDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin,
 # ========
 # TORNEO
 # ========
-class TorneoListView(PageSizeMixin, AdminBaseView, PermissionRequiredMixin, ListView):
+class TorneoListView(OcultarEnPurgaMixin, PageSizeMixin, AdminBaseView, PermissionRequiredMixin, ListView):
     permission_required = "ligas.view_torneo"
     model = Torneo
+    purga_tipo = "torneo"
     template_name = "ligas/administracion/torneo_list.html"
     paginate_by = 10
 
@@ -186,18 +282,20 @@ class TorneoCreateView(AjaxCreateMixin, AdminBaseView, PermissionRequiredMixin,
     success_url = reverse_lazy("ligas:torneo_list")
 
 
-class TorneoUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
+class TorneoUpdateView(LigaArchivadaGuardMixin, OcultarEnPurgaMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
     permission_required = "ligas.change_torneo"
     model = Torneo
+    purga_tipo = "torneo"
     fields = ["liga", "nombre"]
     template_name = "ligas/administracion/form.html"
     ajax_template_name = "ligas/administracion/_modal_form.html"
     success_url = reverse_lazy("ligas:torneo_list")
 
 
-class TorneoDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
+class TorneoDeleteView(LigaArchivadaGuardMixin, PurgaDeleteMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
     permission_required = "ligas.delete_torneo"
     model = Torneo
+    purga_tipo = "torneo"
     template_name = "ligas/administracion/confirm_delete.html"
     ajax_template_name = "ligas/administracion/_modal_confirm_delete.html"
     success_url = reverse_lazy("ligas:torneo_list")
@@ -208,7 +306,9 @@ class TorneoFixtureView(AdminBaseView, PermissionRequiredMixin, TemplateView):
     template_name = "ligas/administracion/torneo_fixture.html"
 
     def dispatch(self, request, *args, **kwargs):
-        self.torneo = get_object_or_404(Torneo.objects.select_related("liga"), pk=kwargs["pk"])
+        self.torneo = get_object_or_404(
+            _sin_purga_pendiente(Torneo.objects.select_related("liga"), "torneo"), pk=kwargs["pk"]
+        )
         return super().dispatch(request, *args, **kwargs)
 
     def get_success_url(self):
@@ -235,6 +335,19 @@ class TorneoFixtureView(AdminBaseView, PermissionRequiredMixin, TemplateView):
             )
         return self._categorias_cache
 
+    @staticmethod
+    def _fecha_cache_key(ronda, numero, filas, libre):
+        """Huella de lo que muestra una fecha: si no cambia, se reutiliza el fragmento cacheado."""
+
+        partes = [str(ronda), str(numero), libre.nombre if libre else ""]
+        for fila in filas:
+            partido = fila["partido"]
+            partes.append(
+                f"{partido.pk}:{fila['estado']}:{int(fila['tiene_resultados'])}:"
+                f"{partido.club_local.nombre}:{partido.club_visitante.nombre}"
+            )
+        return hashlib.md5("\n".join(partes).encode(), usedforsecurity=False).hexdigest()
+
     def _build_fixture_rows(self, clubs, partidos, categorias):
         rondas = {
             PartidoFixture.RONDA_IDA: {},
@@ -305,11 +418,13 @@ class TorneoFixtureView(AdminBaseView, PermissionRequiredMixin, TemplateView):
                     }
                     for partido in partidos_fecha
                 ]
+                libre = bye_por_fecha[ronda].get(numero)
                 items.append(
                     {
                         "numero": numero,
                         "partidos": partida_rows,
-                        "libre": bye_por_fecha[ronda].get(numero),
+                        "libre": libre,
+                        "cache_key": self._fecha_cache_key(ronda, numero, partida_rows, libre),
                     }
                 )
             rounds_data.append(
@@ -325,6 +440,7 @@ class TorneoFixtureView(AdminBaseView, PermissionRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         clubes = self.get_participating_clubs()
+        archivada = self.torneo.liga.archivada
 
         fixture_table_missing = False
         try:
@@ -343,6 +459,11 @@ class TorneoFixtureView(AdminBaseView, PermissionRequiredMixin, TemplateView):
         categorias = self.get_torneo_categorias()
         rounds_data, estado_por_partido = self._build_fixture_rows(clubes, partidos, categorias)
 
+        clubes_en_fixture = {match.club_local_id for match in partidos} | {
+            match.club_visitante_id for match in partidos
+        }
+        fixture_desactualizado = fixture_exists and clubes_en_fixture != {club.id for club in clubes}
+
         if fixture_exists:
             fechas_totales = max(match.fecha_nro for match in partidos)
         else:
@@ -360,20 +481,37 @@ class TorneoFixtureView(AdminBaseView, PermissionRequiredMixin, TemplateView):
                 "fixture_exists": fixture_exists,
 
                 "fixture_table_missing": fixture_table_missing,
+                "fixture_desactualizado": fixture_desactualizado,
                 "fecha_count": fechas_totales,
                 "categorias": categorias,
                 "estado_por_partido": estado_por_partido,
+                "liga_archivada": archivada,
                 "can_generate": self.request.user.has_perm("ligas.add_partidofixture")
-                and not fixture_table_missing,
-                "can_manage_resultados": self.can_manage_fixture(),
+                and not fixture_table_missing
+                and not archivada,
+                "can_manage_resultados": self.can_manage_fixture() and not archivada,
+                "can_materializar": self.request.user.has_perm("ligas.add_partido") and not archivada,
                 "has_bye": len(clubes) % 2 == 1,
                 "club_count": len(clubes),
                 "fixture_rounds_data": rounds_data,
+                "resultados_url": self._resultados_url(),
             }
         )
         return context
 
+    def _resultados_url(self):
+        # Una sola resolución de URL para todas las filas: prefijo + id + sufijo
+        url = reverse("ligas:partido_fixture_resultados", args=[self.torneo.pk, 0])
+        prefijo, sufijo = url.rsplit("/0/", 1)
+        return {"prefijo": f"{prefijo}/", "sufijo": f"/{sufijo}"}
+
     def post(self, request, *args, **kwargs):
+        if self.torneo.liga.archivada:
+            messages.error(request, "La liga está archivada: restaurala antes de modificar su fixture.")
+            return redirect(self.get_success_url())
+        if request.POST.get("accion") == "materializar":
+            return self._materializar(request)
+
         if not request.user.has_perm("ligas.add_partidofixture"):
             raise PermissionDenied
 
@@ -382,16 +520,68 @@ class TorneoFixtureView(AdminBaseView, PermissionRequiredMixin, TemplateView):
             messages.error(request, "Se necesitan al menos dos clubes para crear un fixture.")
             return redirect(self.get_success_url())
 
-        try:
-            created = generate_fixture(self.torneo, clubes)
-        except FixtureAlreadyExists:
+        if request.POST.get("accion") == "replanificar":
+            return self._replan(request, clubes)
+
+        if PartidoFixture.objects.filter(torneo=self.torneo).exists():
             messages.info(request, "El torneo ya tiene un fixture generado.")
-        except FixtureGenerationError as exc:
-            messages.error(request, str(exc))
-        else:
-            messages.success(request, f"Se generó el fixture con {len(created)} partidos.")
+            return redirect(self.get_success_url())
+
+        trabajo = encolar(
+            "generar_fixture",
+            usuario=request.user,
+            torneo_id=self.torneo.pk,
+            club_ids=[club.pk for club in clubes],
+        )
+        informar_trabajo(
+            request,
+            trabajo,
+            "la generación del fixture",
+            lambda resultado: messages.success(request, f"Se generó el fixture con {resultado['partidos']} partidos."),
+        )
+        return redirect(self.get_success_url())
+
+    def _materializar(self, request):
+        if not request.user.has_perm("ligas.add_partido"):
+            raise PermissionDenied
+
+        trabajo = encolar("materializar_partidos", usuario=request.user, torneo_id=self.torneo.pk)
+        informar_trabajo(request, trabajo, "la creación de los partidos", self._informar_materializacion)
+        return redirect(self.get_success_url())
+
+    def _informar_materializacion(self, resultado):
+        messages.success(
+            self.request,
+            f"Se crearon {resultado['fechas_creadas']} fechas y {resultado['partidos_creados']} partidos por categoría.",
+        )
+        if resultado["sin_equipo"]:
+            messages.warning(
+                self.request,
+                f"{resultado['sin_equipo']} cruces se omitieron porque algún club no tiene equipo en la categoría.",
+            )
+
+    def _replan(self, request, clubes):
+        trabajo = encolar(
+            "replanificar_fixture",
+            usuario=request.user,
+            torneo_id=self.torneo.pk,
+            club_ids=[club.pk for club in clubes],
+        )
+        informar_trabajo(request, trabajo, "la replanificación del fixture", self._informar_replan)
         return redirect(self.get_success_url())
 
+    def _informar_replan(self, resultado):
+        request = self.request
+        if resultado["creados"] or resultado["actualizados"] or resultado["eliminados"]:
+            messages.success(
+                request,
+                f"Fixture actualizado: {resultado['creados']} partidos nuevos, "
+                f"{resultado['actualizados']} modificados y {resultado['eliminados']} eliminados. "
+                f"Se conservaron {resultado['fijos']} partidos con resultados.",
+            )
+        else:
+            messages.info(request, "El fixture ya estaba actualizado.")
+
 
 class PartidoFixtureResultadoView(AdminBaseView, PermissionRequiredMixin, FormView):
     permission_required = "ligas.change_partidofixture"
@@ -399,7 +589,9 @@ class PartidoFixtureResultadoView(AdminBaseView, PermissionRequiredMixin, FormVi
     template_name = "ligas/administracion/torneo_fixture_resultados.html"
 
     def dispatch(self, request, *args, **kwargs):
-        self.torneo = get_object_or_404(Torneo.objects.select_related("liga"), pk=kwargs["pk"])
+        self.torneo = get_object_or_404(
+            _sin_purga_pendiente(Torneo.objects.select_related("liga"), "torneo"), pk=kwargs["pk"]
+        )
         self.partido = get_object_or_404(
             PartidoFixture.objects.select_related("torneo", "club_local", "club_visitante"),
             pk=kwargs["partido_id"],
@@ -467,19 +659,24 @@ class PartidoFixtureResultadoView(AdminBaseView, PermissionRequiredMixin, FormVi
             completados = len(resultados_actuales)
 
             if completados == 0 or total_categorias == 0:
+                estado = "pendiente"
                 self.partido.jugado = False
                 self.partido.goles_local = None
                 self.partido.goles_visitante = None
             elif completados == total_categorias:
+                estado = "jugado"
                 self.partido.jugado = True
                 self.partido.goles_local = sum(r.goles_local for r in resultados_actuales)
                 self.partido.goles_visitante = sum(r.goles_visitante for r in resultados_actuales)
             else:
+                estado = "parcial"
                 self.partido.jugado = False
                 self.partido.goles_local = None
                 self.partido.goles_visitante = None
 
             self.partido.save(update_fields=["jugado", "goles_local", "goles_visitante"])
+            delta = delta_resultado(self.partido, estado, resultados_actuales)
+            transaction.on_commit(lambda: publicar(self.torneo.pk, "resultado", delta))
 
         messages.success(self.request, "Resultados guardados")
         return super().form_valid(form)
@@ -580,7 +777,7 @@ class CategoriaCreateView(AjaxCreateMixin, AdminBaseView, PermissionRequiredMixi
     success_url = reverse_lazy("ligas:categoria_list")
 
 
-class CategoriaUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
+class CategoriaUpdateView(LigaArchivadaGuardMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
     permission_required = "ligas.change_categoria"
     model = Categoria
     fields = ["liga", "nombre", "horario", "activa", "suma_puntos_general"]
@@ -589,7 +786,7 @@ class CategoriaUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMi
     success_url = reverse_lazy("ligas:categoria_list")
 
 
-class CategoriaDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
+class CategoriaDeleteView(LigaArchivadaGuardMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
     permission_required = "ligas.delete_categoria"
     model = Categoria
     template_name = "ligas/administracion/confirm_delete.html"
@@ -597,6 +794,22 @@ class CategoriaDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMi
     success_url = reverse_lazy("ligas:categoria_list")
 
 
+class CategoriaGoleadoresView(AdminBaseView, PermissionRequiredMixin, DetailView):
+    permission_required = "ligas.view_categoria"
+    model = Categoria
+    template_name = "ligas/administracion/categoria_goleadores.html"
+    limite = 20
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("liga")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["goleadores"] = top_goleadores(self.object, self.limite)
+        ctx["disciplina"] = tabla_disciplina(self.object, self.limite)
+        return ctx
+
+
 # ========
 # EQUIPO
 # ========
@@ -631,43 +844,39 @@ class EquipoGenerateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMix
     success_url = reverse_lazy("ligas:equipo_list")
 
     def form_valid(self, form):
-        club = form.cleaned_data["club"]
-        liga = form.cleaned_data["liga"]
-        categorias = list(liga.categorias.all())
+        clubes = list(form.cleaned_data["club"])
+        ligas = list(form.cleaned_data["liga"])
+        trabajo = encolar(
+            "generar_equipos",
+            usuario=self.request.user,
+            club_ids=[club.pk for club in clubes],
+            liga_ids=[liga.pk for liga in ligas],
+        )
+        informar_trabajo(
+            self.request, trabajo, "la generación de equipos", lambda resultado: self._informar(resultado, clubes, ligas)
+        )
+        return super().form_valid(form)
 
-        if not categorias:
+    def _informar(self, resultado, clubes, ligas):
+        for liga in resultado["ligas_sin_categorias"]:
             messages.warning(self.request, f"La liga {liga} no tiene categorías asociadas.")
-            return super().form_valid(form)
-
-        created = 0
-        for categoria in categorias:
-            alias = f"{club.nombre} - {categoria.nombre}"
-            equipo, created_flag = Equipo.objects.get_or_create(
-                club=club,
-                categoria=categoria,
-                defaults={"alias": alias},
+
+        destino = f"{clubes[0]}" if len(clubes) == 1 else f"{len(clubes)} clubes"
+        ligas_texto = f"{ligas[0]}" if len(ligas) == 1 else f"{len(ligas)} ligas"
+        if resultado["creados"]:
+            message = (
+                f"Se generaron {resultado['creados']} equipo{'s' if resultado['creados'] != 1 else ''} "
+                f"para {destino} en {ligas_texto}."
             )
-            if created_flag:
-                created += 1
-            elif not equipo.alias:
-                equipo.alias = alias
-                equipo.save(update_fields=["alias"])
-
-        skipped = len(categorias) - created
-
-        if created:
-            message = f"Se generaron {created} equipo{'s' if created != 1 else ''} para {club} en {liga}."
-            if skipped:
-                message += f" {skipped} ya existían."
+            if resultado["existentes"]:
+                message += f" {resultado['existentes']} ya existían."
             messages.success(self.request, message)
-        else:
+        elif len(resultado["ligas_sin_categorias"]) < len(ligas):
             messages.info(
                 self.request,
-                f"No se crearon equipos nuevos: ya existían para todas las categorías de {liga}.",
+                f"No se crearon equipos nuevos: ya existían para todas las categorías de {ligas_texto}.",
             )
 
-        return super().form_valid(form)
-
 
 class EquipoDetailView(AdminBaseView, PermissionRequiredMixin, DetailView):
     permission_required = "ligas.view_equipo"
@@ -680,7 +889,7 @@ class EquipoDetailView(AdminBaseView, PermissionRequiredMixin, DetailView):
         ctx["jugadores"] = self.object.jugadores.all().order_by("apellido", "nombre")
         return ctx
 
-class EquipoUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
+class EquipoUpdateView(LigaArchivadaGuardMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
     permission_required = "ligas.change_equipo"
     model = Equipo
     fields = ["club", "categoria", "alias"]
@@ -689,7 +898,7 @@ class EquipoUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin
     success_url = reverse_lazy("ligas:equipo_list")
 
 
-class EquipoDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
+class EquipoDeleteView(LigaArchivadaGuardMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
     permission_required = "ligas.delete_equipo"
     model = Equipo
     template_name = "ligas/administracion/confirm_delete.html"
@@ -709,11 +918,48 @@ class JugadorListView(PageSizeMixin, AdminBaseView, PermissionRequiredMixin, Lis
     def get_queryset(self):
         qs = super().get_queryset().select_related("equipo", "equipo__club", "equipo__categoria")
         q = self.request.GET.get("q", "").strip()
-        if q:
+        if DNI_BUSQUEDA_RE.match(q):
+            # Búsqueda exacta por índice en lugar de recorrer la tabla con icontains
+            qs = qs.filter(dni_normalizado=normalizar_dni(q))
+        elif q:
             qs = qs.filter(Q(apellido__icontains=q) | Q(nombre__icontains=q) | Q(dni__icontains=q) | Q(equipo__club__nombre__icontains=q))
         return qs
 
 
+class JugadorDuplicadosView(PageSizeMixin, AdminBaseView, PermissionRequiredMixin, ListView):
+    """DNIs registered in more than one jugador row, grouped in the database."""
+
+    permission_required = "ligas.view_jugador"
+    template_name = "ligas/administracion/jugador_duplicados.html"
+    paginate_by = 25
+
+    def get_queryset(self):
+        qs = Jugador.objects.exclude(dni_normalizado="")
+        liga_id = self.request.GET.get("liga")
+        if liga_id and liga_id.isdigit():
+            qs = qs.filter(equipo__categoria__liga_id=liga_id)
+        return (
+            qs.values("dni_normalizado")
+            .annotate(registros=Count("id"), equipos=Count("equipo", distinct=True))
+            .filter(registros__gt=1)
+            .order_by("-registros", "dni_normalizado")
+        )
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        grupos = list(ctx["object_list"])
+        jugadores = {}
+        for jugador in Jugador.objects.filter(
+            dni_normalizado__in=[grupo["dni_normalizado"] for grupo in grupos]
+        ).select_related("equipo__club", "equipo__categoria__liga"):
+            jugadores.setdefault(jugador.dni_normalizado, []).append(jugador)
+        for grupo in grupos:
+            grupo["jugadores"] = jugadores.get(grupo["dni_normalizado"], [])
+        ctx["grupos"] = grupos
+        ctx["ligas"] = Liga.objects.order_by("-temporada", "nombre")
+        return ctx
+
+
 class JugadorCreateView(AjaxCreateMixin, AdminBaseView, PermissionRequiredMixin, CreateView):
     permission_required = "ligas.add_jugador"
     model = Jugador
@@ -733,7 +979,7 @@ class JugadorCreateView(AjaxCreateMixin, AdminBaseView, PermissionRequiredMixin,
         return initial
 
 
-class JugadorUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
+class JugadorUpdateView(LigaArchivadaGuardMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
     permission_required = "ligas.change_jugador"
     model = Jugador
     fields = ["equipo", "apellido", "nombre", "dni", "fecha_nac"]
@@ -742,7 +988,7 @@ class JugadorUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixi
     success_url = reverse_lazy("ligas:jugador_list")
 
 
-class JugadorDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
+class JugadorDeleteView(LigaArchivadaGuardMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
     permission_required = "ligas.delete_jugador"
     model = Jugador
     template_name = "ligas/administracion/confirm_delete.html"
@@ -750,6 +996,46 @@ class JugadorDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixi
     success_url = reverse_lazy("ligas:jugador_list")
 
 
+class JugadorImportView(AdminBaseView, PermissionRequiredMixin, FormView):
+    """Queue the import of an uploaded roster; ``?trabajo=<id>`` shows its outcome."""
+
+    permission_required = "ligas.add_jugador"
+    form_class = JugadorImportForm
+    template_name = "ligas/administracion/jugador_import.html"
+
+    def form_valid(self, form):
+        archivo = form.cleaned_data["archivo"]
+        liga = form.cleaned_data["liga"]
+        # El worker puede correr en otra máquina: el archivo pasa por el storage (MEDIA_ROOT compartido)
+        ruta = default_storage.save(f"importaciones/{archivo.name}", archivo)
+        trabajo = encolar("importar_jugadores", usuario=self.request.user, liga_id=liga.pk, ruta=ruta)
+        informar_trabajo(
+            self.request,
+            trabajo,
+            f"la importación de jugadores en {liga}",
+            lambda resultado: messages.success(
+                self.request,
+                f"Se importaron {resultado['creados']} jugador{'es' if resultado['creados'] != 1 else ''} en {liga}. "
+                f"Duplicados omitidos: {resultado['duplicados']}. Filas con errores: {resultado['total_errores']}.",
+            ),
+        )
+        return redirect(f"{reverse('ligas:jugador_import')}?{urlencode({'trabajo': trabajo.pk})}")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        pk = self.request.GET.get("trabajo", "")
+        trabajo = Trabajo.objects.filter(pk=pk, tipo="importar_jugadores").first() if pk.isdigit() else None
+        if trabajo is not None and (
+            trabajo.usuario_id == self.request.user.pk or self.request.user.has_perm("ligas.view_trabajo")
+        ):
+            context["trabajo"] = trabajo
+            context["estado_url"] = reverse("ligas:trabajo_estado", args=[trabajo.pk])
+            if trabajo.estado == Trabajo.TERMINADO:
+                context["resultado"] = trabajo.resultado
+                context["errores"] = trabajo.resultado["errores"]
+        return context
+
+
 # =========
 # ARBITRO
 # =========
@@ -770,7 +1056,7 @@ class ArbitroListView(PageSizeMixin, AdminBaseView, PermissionRequiredMixin, Lis
 class ArbitroCreateView(AjaxCreateMixin, AdminBaseView, PermissionRequiredMixin, CreateView):
     permission_required = "ligas.add_arbitro"
     model = Arbitro
-    fields = ["apellido", "nombre"]
+    fields = ["apellido", "nombre", "activo", "max_partidos_por_dia"]
     template_name = "ligas/administracion/form.html"
     ajax_template_name = "ligas/administracion/_modal_form.html"
     success_url = reverse_lazy("ligas:arbitro_list")
@@ -779,7 +1065,7 @@ class ArbitroCreateView(AjaxCreateMixin, AdminBaseView, PermissionRequiredMixin,
 class ArbitroUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
     permission_required = "ligas.change_arbitro"
     model = Arbitro
-    fields = ["apellido", "nombre"]
+    fields = ["apellido", "nombre", "activo", "max_partidos_por_dia"]
     template_name = "ligas/administracion/form.html"
     ajax_template_name = "ligas/administracion/_modal_form.html"
     success_url = reverse_lazy("ligas:arbitro_list")
@@ -826,9 +1112,10 @@ class IdentidadView(AdminBaseView, PermissionRequiredMixin, UpdateView):
 # ========
 # LIGA
 # ========
-class LigaListView(PageSizeMixin, AdminBaseView, PermissionRequiredMixin, ListView):
+class LigaListView(OcultarEnPurgaMixin, PageSizeMixin, AdminBaseView, PermissionRequiredMixin, ListView):
     permission_required = "ligas.view_liga"
     model = Liga
+    purga_tipo = "liga"
     template_name = "ligas/administracion/liga_list.html"
     paginate_by = 10
 
@@ -849,18 +1136,149 @@ class LigaCreateView(AjaxCreateMixin, AdminBaseView, PermissionRequiredMixin, Cr
     success_url = reverse_lazy("ligas:liga_list")
 
 
-class LigaUpdateView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
+class LigaUpdateView(OcultarEnPurgaMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, UpdateView):
     permission_required = "ligas.change_liga"
     model = Liga
+    purga_tipo = "liga"
     fields = ["nombre", "temporada"]
     template_name = "ligas/administracion/form.html"
     ajax_template_name = "ligas/administracion/_modal_form.html"
     success_url = reverse_lazy("ligas:liga_list")
 
 
-class LigaDeleteView(AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
+class LigaDeleteView(PurgaDeleteMixin, AjaxTemplateMixin, AdminBaseView, PermissionRequiredMixin, DeleteView):
     permission_required = "ligas.delete_liga"
     model = Liga
+    purga_tipo = "liga"
     template_name = "ligas/administracion/confirm_delete.html"
     ajax_template_name = "ligas/administracion/_modal_confirm_delete.html"
     success_url = reverse_lazy("ligas:liga_list")
+
+
+class LigaArchivoView(AdminBaseView, PermissionRequiredMixin, TemplateView):
+    """Read-only view of an archived temporada, built from its snapshot."""
+
+    permission_required = "ligas.view_liga"
+    template_name = "ligas/administracion/liga_archivo.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        liga = get_object_or_404(Liga.objects.select_related("archivo"), pk=self.kwargs["pk"], archivada=True)
+        try:
+            tablas = leer_snapshot(liga)
+        except ArchivoError as exc:
+            raise Http404(str(exc)) from exc
+
+        fixture = tablas.get("ligas.partidofixture", [])
+        posiciones = tablas.get("ligas.tablaposicion", [])
+        clubes = Club.objects.in_bulk(
+            {fila["club_local_id"] for fila in fixture} | {fila["club_visitante_id"] for fila in fixture}
+        )
+        equipos = dict(Equipo.objects.filter(categoria__liga=liga).values_list("pk", "club__nombre"))
+        categorias = dict(Categoria.objects.filter(liga=liga).values_list("pk", "nombre"))
+        ronda_nombres = dict(PartidoFixture.RONDA_CHOICES)
+
+        partidos_por_torneo = {}
+        for fila in sorted(fixture, key=lambda f: (f["ronda"], f["fecha_nro"], f["id"])):
+            partidos_por_torneo.setdefault(fila["torneo_id"], []).append(
+                {
+                    "ronda": ronda_nombres.get(fila["ronda"], fila["ronda"]),
+                    "fecha": fila["fecha_nro"],
+                    "local": clubes.get(fila["club_local_id"]),
+                    "visitante": clubes.get(fila["club_visitante_id"]),
+                    "goles_local": fila["goles_local"],
+                    "goles_visitante": fila["goles_visitante"],
+                }
+            )
+        tablas_por_categoria = {}
+        for fila in sorted(posiciones, key=lambda f: (-f["puntos"], -f["pg"], f["gc"], -f["gf"])):
+            tablas_por_categoria.setdefault(categorias.get(fila["categoria_id"], "—"), []).append(
+                dict(fila, club=equipos.get(fila["equipo_id"], "—"), dg=fila["gf"] - fila["gc"])
+            )
+
+        context.update(
+            {
+                "liga": liga,
+                "archivo": liga.archivo,
+                "torneos": [
+                    {"torneo": torneo, "partidos": partidos_por_torneo.get(torneo.pk, [])}
+                    for torneo in liga.torneos.order_by("nombre")
+                ],
+                "posiciones": sorted(tablas_por_categoria.items()),
+            }
+        )
+        return context
+
+
+class LigaExportView(AdminBaseView, PermissionRequiredMixin, View):
+    """Stream a dataset of the temporada (optionally of one torneo) as a download."""
+
+    permisos_por_dataset = {
+        "fixture": "ligas.view_partidofixture",
+        "resultados": "ligas.view_resultadocategoriapartido",
+        "posiciones": "ligas.view_tablaposicion",
+    }
+
+    def get_permission_required(self):
+        permiso = self.permisos_por_dataset.get(self.kwargs["dataset"])
+        if permiso is None:
+            raise Http404("Exportación desconocida.")
+        return (permiso,)
+
+    def get(self, request, pk, dataset, formato):
+        liga = get_object_or_404(Liga, pk=pk)
+        torneo = None
+        torneo_id = request.GET.get("torneo")
+        if torneo_id:
+            torneo = get_object_or_404(Torneo, pk=torneo_id, liga=liga)
+        try:
+            contenido = exportar(dataset, formato, liga, torneo)
+        except ExportError as exc:
+            raise Http404(str(exc)) from exc
+        if isinstance(request, ASGIRequest):
+            contenido = en_async(contenido)
+
+        response = StreamingHttpResponse(contenido, content_type=CONTENT_TYPES[formato])
+        response["Content-Disposition"] = (
+            f'attachment; filename="{nombre_archivo(dataset, formato, liga, torneo)}"'
+        )
+        return response
+
+
+class PurgaEstadoView(AdminBaseView, PermissionRequiredMixin, View):
+    """JSON progress of a background liga/torneo purge."""
+
+    def has_permission(self):
+        tipo = self.kwargs["tipo"]
+        return tipo in TIPOS_PURGA and self.request.user.has_perm(f"ligas.delete_{tipo}")
+
+    def get(self, request, tipo, pk):
+        estado = progreso(tipo, pk)
+        if estado is None:
+            raise Http404("No hay una eliminación registrada para ese objeto.")
+        return JsonResponse(estado)
+
+
+class TrabajoEstadoView(AdminBaseView, View):
+    """JSON state of a queued job, for the panel to poll."""
+
+    def get(self, request, pk):
+        trabajo = get_object_or_404(Trabajo, pk=pk)
+        if trabajo.usuario_id != request.user.pk and not request.user.has_perm("ligas.view_trabajo"):
+            raise PermissionDenied
+        return JsonResponse(
+            {
+                "id": trabajo.pk,
+                "tipo": trabajo.tipo,
+                "estado": trabajo.estado,
+                "intentos": trabajo.intentos,
+                "max_intentos": trabajo.max_intentos,
+                "progreso": trabajo.progreso,
+                "total": trabajo.total,
+                "mensaje": trabajo.mensaje,
+                "resultado": trabajo.resultado,
+                "creado": trabajo.creado,
+                "iniciado": trabajo.iniciado,
+                "terminado": trabajo.terminado,
+            }
+        )
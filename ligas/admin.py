@@ -1,97 +1,306 @@
+import json
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .archivo import en_liga_archivada
 from .models import (
     Club, Liga, Torneo, Ronda, Categoria, Equipo,
-    Jugador, Arbitro, Fecha, Partido, PartidoFixture,
-    ResultadoCategoriaPartido, EventoPartido, ReglaPuntos, TablaPosicion
+    Jugador, Arbitro, IndisponibilidadArbitro, Fecha, Partido, PartidoFixture,
+    ResultadoCategoriaPartido, EventoPartido, EstadisticaJugador, DisciplinaJugador,
+    Suspension, ReglaPuntos, TablaPosicion, PosicionesFecha, LigaArchivada, Trabajo
 )
 
+
+# ==========================
+# RENDIMIENTO DE CHANGELISTS
+# ==========================
+
+class ConteoEstimadoPaginator(Paginator):
+    """Paginator that trusts the planner's row estimate on big PostgreSQL tables.
+
+    ``COUNT(*)`` over a season-sized table costs a full scan per page view. On
+    PostgreSQL the changelist query is ``EXPLAIN``-ed first; when the estimate
+    exceeds ``UMBRAL`` it is used as the count (page links may be slightly off
+    at the very end). Smaller results and other backends get the exact count.
+    """
+
+    UMBRAL = 10000
+
+    @cached_property
+    def count(self):
+        estimado = self._estimar()
+        if estimado is not None and estimado > self.UMBRAL:
+            return estimado
+        return super().count
+
+    def _estimar(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or connections[queryset.db].vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class RelacionListFilter(admin.RelatedFieldListFilter):
+    """FK filter whose choices are read in one query.
+
+    The choices come from the (small) related table with ``select_related()``,
+    because their ``__str__`` walks up to the liga. Filtering then uses the
+    indexed foreign key instead of a ``DISTINCT`` over the big table.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        queryset = field.related_model._default_manager.select_related()
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return [(objeto.pk, str(objeto)) for objeto in queryset]
+
+
+class LigasModelAdmin(admin.ModelAdmin):
+    """Base for every admin of the app: estimated counts and no second ``COUNT(*)``.
+
+    Subclasses declare ``list_select_related`` with every relation that
+    ``list_display`` prints (including the ones ``__str__`` follows). Rows
+    that an archived liga's snapshot points to are read-only, as in the panel.
+    """
+
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
+    list_select_related = False
+
+    def has_change_permission(self, request, obj=None):
+        if obj is not None and en_liga_archivada(obj):
+            return False
+        return super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and en_liga_archivada(obj, borrar=True):
+            return False
+        return super().has_delete_permission(request, obj)
+
+
+# ==========
+# ENTIDADES
+# ==========
+
 @admin.register(Club)
-class ClubAdmin(admin.ModelAdmin):
+class ClubAdmin(LigasModelAdmin):
     list_display = ("nombre",)
     search_fields = ("nombre",)
 
 @admin.register(Liga)
-class LigaAdmin(admin.ModelAdmin):
-    list_display = ("nombre", "temporada")
-    list_filter = ("temporada",)
+class LigaAdmin(LigasModelAdmin):
+    list_display = ("nombre", "temporada", "archivada")
+    list_filter = ("temporada", "archivada")
     search_fields = ("nombre", "temporada")
 
 @admin.register(Torneo)
-class TorneoAdmin(admin.ModelAdmin):
+class TorneoAdmin(LigasModelAdmin):
     list_display = ("nombre", "liga")
-    list_filter = ("liga__temporada", "liga__nombre")
+    list_select_related = ("liga",)
+    list_filter = (("liga", RelacionListFilter),)
     search_fields = ("nombre",)
 
 @admin.register(Ronda)
-class RondaAdmin(admin.ModelAdmin):
+class RondaAdmin(LigasModelAdmin):
     list_display = ("nombre", "torneo")
-    list_filter = ("torneo__liga__temporada", "torneo__nombre")
+    list_select_related = ("torneo__liga",)
+    list_filter = (("torneo", RelacionListFilter),)
     search_fields = ("nombre",)
 
 @admin.register(Categoria)
-class CategoriaAdmin(admin.ModelAdmin):
+class CategoriaAdmin(LigasModelAdmin):
     list_display = ("nombre", "liga", "activa", "suma_puntos_general", "horario")
-    list_filter = ("liga__temporada", "liga__nombre", "activa", "suma_puntos_general")
+    list_select_related = ("liga",)
+    list_filter = (("liga", RelacionListFilter), "activa", "suma_puntos_general")
     search_fields = ("nombre",)
 
 @admin.register(Equipo)
-class EquipoAdmin(admin.ModelAdmin):
+class EquipoAdmin(LigasModelAdmin):
     list_display = ("club", "categoria", "alias")
-    list_filter = ("categoria__liga__temporada", "categoria__nombre", "club__nombre")
+    list_select_related = ("club", "categoria__liga")
+    list_filter = (("categoria__liga", RelacionListFilter),)
     search_fields = ("club__nombre", "alias")
 
 @admin.register(Jugador)
-class JugadorAdmin(admin.ModelAdmin):
+class JugadorAdmin(LigasModelAdmin):
     list_display = ("apellido", "nombre", "equipo", "dni")
-    list_filter = ("equipo__categoria__nombre",)
+    list_select_related = ("equipo__club", "equipo__categoria")
+    list_filter = (("equipo__categoria", RelacionListFilter),)
     search_fields = ("apellido", "nombre", "dni")
 
 @admin.register(Arbitro)
-class ArbitroAdmin(admin.ModelAdmin):
-    list_display = ("apellido", "nombre")
+class ArbitroAdmin(LigasModelAdmin):
+    list_display = ("apellido", "nombre", "activo", "max_partidos_por_dia")
+    list_filter = ("activo",)
     search_fields = ("apellido", "nombre")
 
+@admin.register(IndisponibilidadArbitro)
+class IndisponibilidadArbitroAdmin(LigasModelAdmin):
+    list_display = ("arbitro", "fecha")
+    list_select_related = ("arbitro",)
+    list_filter = ("fecha",)
+    search_fields = ("arbitro__apellido", "arbitro__nombre")
+    autocomplete_fields = ("arbitro",)
+
 @admin.register(Fecha)
-class FechaAdmin(admin.ModelAdmin):
+class FechaAdmin(LigasModelAdmin):
     list_display = ("numero", "ronda", "fecha")
-    list_filter = ("ronda__torneo__liga__temporada", "ronda__torneo__nombre")
+    list_select_related = ("ronda__torneo__liga",)
+    list_filter = (("ronda__torneo", RelacionListFilter),)
     search_fields = ("ronda__nombre",)
 
 @admin.register(Partido)
-class PartidoAdmin(admin.ModelAdmin):
+class PartidoAdmin(LigasModelAdmin):
     list_display = ("fecha_ref", "categoria", "local", "visitante", "goles_local", "goles_visitante", "jugado")
-    list_filter = ("categoria__liga__temporada", "categoria__nombre", "jugado")
+    list_select_related = (
+        "fecha_ref__ronda__torneo__liga",
+        "categoria__liga",
+        "local__club",
+        "local__categoria",
+        "visitante__club",
+        "visitante__categoria",
+    )
+    list_filter = (("categoria", RelacionListFilter), "jugado")
+    # El orden del modelo cruza cuatro tablas: en el admin, los más nuevos primero por PK
+    ordering = ("-pk",)
     search_fields = ("local__club__nombre", "visitante__club__nombre")
     autocomplete_fields = ("arbitro", "local", "visitante", "categoria")
 
 
 @admin.register(PartidoFixture)
-class PartidoFixtureAdmin(admin.ModelAdmin):
+class PartidoFixtureAdmin(LigasModelAdmin):
     list_display = ("torneo", "ronda", "fecha_nro", "club_local", "club_visitante", "jugado")
-    list_filter = ("torneo__liga__temporada", "torneo__nombre", "ronda", "jugado")
+    list_select_related = ("torneo__liga", "club_local", "club_visitante")
+    list_filter = (("torneo", RelacionListFilter), "ronda", "jugado")
+    ordering = ("-pk",)
     search_fields = ("club_local__nombre", "club_visitante__nombre", "torneo__nombre")
     autocomplete_fields = ("torneo", "club_local", "club_visitante")
 
 
 @admin.register(ResultadoCategoriaPartido)
-class ResultadoCategoriaPartidoAdmin(admin.ModelAdmin):
+class ResultadoCategoriaPartidoAdmin(LigasModelAdmin):
     list_display = ("partido", "categoria", "goles_local", "goles_visitante")
-    list_filter = ("partido__torneo__liga__temporada", "partido__torneo__nombre", "categoria__nombre")
+    list_select_related = (
+        "partido__torneo__liga",
+        "partido__club_local",
+        "partido__club_visitante",
+        "categoria__liga",
+    )
+    list_filter = (("partido__torneo", RelacionListFilter), ("categoria", RelacionListFilter))
+    ordering = ("-pk",)
     search_fields = ("partido__club_local__nombre", "partido__club_visitante__nombre", "categoria__nombre")
     autocomplete_fields = ("partido", "categoria")
 
 @admin.register(EventoPartido)
-class EventoPartidoAdmin(admin.ModelAdmin):
+class EventoPartidoAdmin(LigasModelAdmin):
     list_display = ("partido", "tipo", "minuto", "equipo", "jugador")
+    list_select_related = (
+        "partido__fecha_ref__ronda__torneo__liga",
+        "partido__categoria",
+        "partido__local__club",
+        "partido__local__categoria",
+        "partido__visitante__club",
+        "partido__visitante__categoria",
+        "equipo__club",
+        "equipo__categoria",
+        "jugador__equipo__club",
+        "jugador__equipo__categoria",
+    )
     list_filter = ("tipo",)
+    ordering = ("-pk",)
     search_fields = ("detalle",)
 
+@admin.register(EstadisticaJugador)
+class EstadisticaJugadorAdmin(LigasModelAdmin):
+    list_display = ("jugador", "categoria", "goles", "amarillas", "rojas")
+    list_select_related = ("jugador__equipo__club", "jugador__equipo__categoria", "categoria__liga")
+    list_filter = (("categoria", RelacionListFilter),)
+    search_fields = ("jugador__apellido", "jugador__nombre")
+
+@admin.register(DisciplinaJugador)
+class DisciplinaJugadorAdmin(LigasModelAdmin):
+    list_display = ("jugador", "torneo", "amarillas", "rojas", "fechas_pendientes")
+    list_select_related = ("jugador__equipo__club", "jugador__equipo__categoria", "torneo__liga")
+    list_filter = (("torneo", RelacionListFilter),)
+    ordering = ("-pk",)
+    search_fields = ("jugador__apellido", "jugador__nombre", "jugador__dni")
+
+@admin.register(Suspension)
+class SuspensionAdmin(LigasModelAdmin):
+    list_display = ("jugador", "fecha", "motivo")
+    list_select_related = ("jugador__equipo__club", "jugador__equipo__categoria", "fecha__ronda__torneo__liga")
+    list_filter = ("motivo", ("fecha__ronda__torneo", RelacionListFilter))
+    ordering = ("-pk",)
+    search_fields = ("jugador__apellido", "jugador__nombre", "jugador__dni")
+
 @admin.register(ReglaPuntos)
-class ReglaPuntosAdmin(admin.ModelAdmin):
+class ReglaPuntosAdmin(LigasModelAdmin):
     list_display = ("categoria", "puntos_victoria", "puntos_empate", "puntos_derrota")
+    list_select_related = ("categoria__liga",)
 
 @admin.register(TablaPosicion)
-class TablaPosicionAdmin(admin.ModelAdmin):
+class TablaPosicionAdmin(LigasModelAdmin):
     list_display = ("categoria", "equipo", "puntos", "pj", "pg", "pe", "pp", "gf", "gc")
-    list_filter = ("categoria__liga__temporada", "categoria__nombre")
+    list_select_related = ("categoria__liga", "equipo__club", "equipo__categoria")
+    list_filter = (("categoria", RelacionListFilter),)
     search_fields = ("equipo__club__nombre",)
+
+@admin.register(PosicionesFecha)
+class PosicionesFechaAdmin(LigasModelAdmin):
+    # Se regeneran solas al cargar resultados (ligas.posiciones)
+    list_display = ("torneo", "categoria", "ronda", "fecha_nro", "creada")
+    list_select_related = ("torneo__liga", "categoria__liga")
+    list_filter = (("torneo", RelacionListFilter), "ronda")
+    readonly_fields = ("torneo", "categoria", "ronda", "fecha_nro", "filas", "creada")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(LigaArchivada)
+class LigaArchivadaAdmin(LigasModelAdmin):
+    # El contenido se restaura con `manage.py restaurar_liga`, no se edita a mano
+    list_display = ("liga", "creada", "formato")
+    list_select_related = ("liga",)
+    readonly_fields = ("liga", "creada", "formato", "resumen")
+    exclude = ("datos",)
+
+    def get_queryset(self, request):
+        # El snapshot comprimido puede pesar megas: el listado no lo necesita
+        return super().get_queryset(request).defer("datos")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Trabajo)
+class TrabajoAdmin(LigasModelAdmin):
+    # Los crea ligas.trabajos.encolar y los procesa `manage.py procesar_trabajos`
+    list_display = ("id", "tipo", "estado", "progreso", "total", "intentos", "usuario", "creado", "terminado")
+    list_select_related = ("usuario",)
+    list_filter = ("estado",)
+    readonly_fields = (
+        "tipo", "parametros", "estado", "intentos", "max_intentos", "progreso", "total", "mensaje",
+        "resultado", "error", "usuario", "worker", "creado", "disponible_desde", "iniciado", "terminado",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,227 @@
+"""Read-only public JSON API for ligas, torneos, fixture, results and standings.
+
+Views are native async and payloads are built from ``values()`` querysets
+read with the async ORM. Every response carries a
+strong ETag computed from the cache counters in :mod:`ligas.versioning`
+(read with the async cache API); ``If-None-Match`` is answered with 304
+before the view runs, without any database query.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from functools import wraps
+
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+
+from .models import Club, Liga, PartidoFixture, PosicionesFecha, ResultadoCategoriaPartido, TablaPosicion, Torneo
+from .posiciones import desplegar
+from .versioning import aetag
+
+RONDA_NOMBRES = dict(PartidoFixture.RONDA_CHOICES)
+
+
+def _json(data) -> JsonResponse:
+    response = JsonResponse(data, json_dumps_params={"ensure_ascii": False})
+    # Los clientes deben revalidar siempre; el 304 es barato
+    response["Cache-Control"] = "public, no-cache"
+    return response
+
+
+async def _lista(queryset):
+    return [fila async for fila in queryset]
+
+
+async def _fila(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist as exc:
+        raise Http404 from exc
+
+
+def _condicional(ambito, *, por_pk=True):
+    """``@condition(etag_func=...)`` for async views: the ETag comes from :func:`aetag`.
+
+    The sync ``etag_func`` of ``condition`` would hit the cache from the event loop.
+    """
+
+    def decorador(vista):
+        @wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            valor = await aetag(ambito, kwargs["pk"] if por_pk else None)
+            response = get_conditional_response(request, etag=valor)
+            if response is None:
+                response = await vista(request, *args, **kwargs)
+            response.headers.setdefault("ETag", valor)
+            return response
+
+        return envoltura
+
+    return decorador
+
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+@require_safe
+@_condicional("ligas", por_pk=False)
+async def ligas(request):
+    filas = await _lista(Liga.objects.order_by("-temporada", "nombre").values("id", "nombre", "temporada"))
+    return _json({"ligas": filas})
+
+
+@require_safe
+@_condicional("ligas", por_pk=False)
+async def liga_torneos(request, pk):
+    liga, torneos = await asyncio.gather(
+        _fila(Liga.objects.values("id", "nombre", "temporada"), pk=pk),
+        _lista(Torneo.objects.filter(liga_id=pk).order_by("nombre").values("id", "nombre")),
+    )
+    return _json({"liga": liga, "torneos": torneos})
+
+
+@require_safe
+@_condicional("torneo")
+async def torneo_fixture(request, pk):
+    """Fixture grouped by ronda and fecha; ``?ronda=`` and ``?fecha=`` narrow it down."""
+
+    partidos = PartidoFixture.objects.filter(torneo_id=pk)
+    ronda = _entero(request.GET.get("ronda"))
+    fecha = _entero(request.GET.get("fecha"))
+    if ronda is not None:
+        partidos = partidos.filter(ronda=ronda)
+    if fecha is not None:
+        partidos = partidos.filter(fecha_nro=fecha)
+
+    torneo, filas = await asyncio.gather(
+        _fila(Torneo.objects.values("id", "nombre", "liga_id"), pk=pk),
+        _lista(
+            partidos.order_by("ronda", "fecha_nro", "id").values(
+                "id",
+                "ronda",
+                "fecha_nro",
+                "fecha_programada",
+                "jugado",
+                "goles_local",
+                "goles_visitante",
+                "club_local_id",
+                "club_visitante_id",
+                local=F("club_local__nombre"),
+                visitante=F("club_visitante__nombre"),
+            )
+        ),
+    )
+    fechas = defaultdict(list)
+    for partido in filas:
+        fechas[(partido.pop("ronda"), partido.pop("fecha_nro"))].append(partido)
+
+    return _json(
+        {
+            "torneo": torneo,
+            "fechas": [
+                {
+                    "ronda": ronda_nro,
+                    "ronda_nombre": RONDA_NOMBRES.get(ronda_nro),
+                    "fecha": fecha_nro,
+                    "partidos": lista,
+                }
+                for (ronda_nro, fecha_nro), lista in fechas.items()
+            ],
+        }
+    )
+
+
+@require_safe
+@_condicional("torneo")
+async def torneo_resultados(request, pk):
+    torneo, resultados = await asyncio.gather(
+        _fila(Torneo.objects.values("id", "nombre", "liga_id"), pk=pk),
+        _lista(
+            ResultadoCategoriaPartido.objects.filter(partido__torneo_id=pk)
+            .order_by("partido__ronda", "partido__fecha_nro", "partido_id", "categoria__nombre")
+            .values(
+                "partido_id",
+                "goles_local",
+                "goles_visitante",
+                ronda=F("partido__ronda"),
+                fecha=F("partido__fecha_nro"),
+                categoria_nombre=F("categoria__nombre"),
+                local=F("partido__club_local__nombre"),
+                visitante=F("partido__club_visitante__nombre"),
+            )
+        ),
+    )
+    return _json({"torneo": torneo, "resultados": resultados})
+
+
+@require_safe
+@_condicional("torneo")
+async def torneo_evolucion(request, pk):
+    """Standings after each completed fecha, per categoria; ``?categoria=`` narrows it down.
+
+    Served from the ``PosicionesFecha`` snapshots: nothing is replayed here.
+    """
+
+    snapshots = PosicionesFecha.objects.filter(torneo_id=pk)
+    categoria = _entero(request.GET.get("categoria"))
+    if categoria is not None:
+        snapshots = snapshots.filter(categoria_id=categoria)
+
+    torneo, filas = await asyncio.gather(
+        _fila(Torneo.objects.values("id", "nombre", "liga_id"), pk=pk),
+        _lista(
+            snapshots.order_by("categoria__nombre", "ronda", "fecha_nro").values_list(
+                "categoria_id", "categoria__nombre", "ronda", "fecha_nro", "filas"
+            )
+        ),
+    )
+    club_ids = {fila[0] for *_, tabla in filas for fila in tabla}
+    clubes = dict(await _lista(Club.objects.filter(pk__in=club_ids).values_list("id", "nombre")))
+
+    categorias = {}
+    for categoria_id, categoria_nombre, ronda, fecha_nro, tabla in filas:
+        entrada = categorias.setdefault(
+            categoria_id, {"categoria_id": categoria_id, "categoria": categoria_nombre, "fechas": []}
+        )
+        tabla = desplegar(tabla)
+        for fila in tabla:
+            fila["club"] = clubes.get(fila["club_id"])
+        entrada["fechas"].append({"ronda": ronda, "fecha": fecha_nro, "tabla": tabla})
+
+    return _json({"torneo": torneo, "categorias": list(categorias.values())})
+
+
+@require_safe
+@_condicional("liga")
+async def liga_posiciones(request, pk):
+    liga, filas = await asyncio.gather(
+        _fila(Liga.objects.values("id", "nombre", "temporada"), pk=pk),
+        _lista(
+            TablaPosicion.objects.filter(categoria__liga_id=pk)
+            .order_by("categoria__nombre", "-puntos", "-pg", "gc", "-gf", "equipo__club__nombre")
+            .values(
+                "puntos", "pj", "pg", "pe", "pp", "gf", "gc",
+                categoria_nombre=F("categoria__nombre"),
+                club=F("equipo__club__nombre"),
+            )
+        ),
+    )
+    categorias = defaultdict(list)
+    for fila in filas:
+        fila["dg"] = fila["gf"] - fila["gc"]
+        categorias[fila.pop("categoria_nombre")].append(fila)
+
+    return _json(
+        {
+            "liga": liga,
+            "categorias": [{"categoria": nombre, "tabla": tabla} for nombre, tabla in categorias.items()],
+        }
+    )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LigasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ligas'
+
+    def ready(self):
+        from . import signals, tareas  # noqa: F401
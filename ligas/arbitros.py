@@ -0,0 +1,295 @@
+"""Automatic referee assignment for the partidos of a fecha.
+
+The assignment is modelled as a min-cost flow problem. Partidos are grouped by
+crossing (the pair of clubs playing), since every categoria of a crossing has
+the same cost for a given referee:
+
+    source -> cruce (capacity = partidos of the crossing)
+    cruce -> arbitro (one cheap unit, extra units heavily penalised)
+    arbitro -> sink (one unit per remaining slot of the day, increasing cost)
+
+The increasing cost of the arbitro -> sink units balances the season load,
+while the cruce -> arbitro cost discourages sending a referee to clubs they
+already officiated. Solving it with successive shortest paths yields the
+maximum number of assignments at minimum total cost.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Arbitro, Fecha, IndisponibilidadArbitro, Partido
+
+# Costo por cada partido previo del árbitro con alguno de los clubes
+PESO_CLUB = 10
+# Costo por dirigir más de un partido del mismo cruce en el día
+PENALIDAD_REPETICION = 1000
+# Costo por cada partido ya dirigido en la temporada
+PESO_CARGA = 1
+
+
+class AsignacionArbitrosError(Exception):
+    """Raised when the referees of a fecha cannot be assigned."""
+
+
+@dataclass(frozen=True)
+class PartidoSlot:
+    """A partido waiting for a referee."""
+
+    partido_id: int
+    club_local_id: int
+    club_visitante_id: int
+
+
+@dataclass(frozen=True)
+class ArbitroSlot:
+    """A referee available for the day.
+
+    ``capacidad`` is the amount of partidos they can still take that day,
+    ``carga`` the partidos already officiated in the season and ``clubes`` how
+    many times they officiated each club.
+    """
+
+    arbitro_id: int
+    capacidad: int
+    carga: int = 0
+    clubes: Optional[Dict[int, int]] = None
+
+
+@dataclass(frozen=True)
+class AsignacionResultado:
+    """Summary of :func:`assign_arbitros`."""
+
+    asignados: int
+    sin_asignar: int
+
+
+class _MinCostFlow:
+    """Primal-dual min-cost flow.
+
+    Each phase runs Dijkstra with Johnson potentials and then saturates every
+    augmenting path made of zero reduced-cost edges, so partidos with the same
+    cost are assigned in a single phase instead of one shortest path each.
+    """
+
+    def __init__(self, size: int):
+        self.graph: List[List[list]] = [[] for _ in range(size)]
+
+    def add_edge(self, origen: int, destino: int, capacidad: int, costo: int) -> None:
+        forward = [destino, capacidad, costo, None]
+        backward = [origen, 0, -costo, forward]
+        forward[3] = backward
+        self.graph[origen].append(forward)
+        self.graph[destino].append(backward)
+
+    def _dijkstra(self, source: int, potential: List[int]) -> List[Optional[int]]:
+        dist: List[Optional[int]] = [None] * len(self.graph)
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            base = d + potential[node]
+            for destino, capacidad, costo, _ in self.graph[node]:
+                if capacidad <= 0:
+                    continue
+                nd = base + costo - potential[destino]
+                if dist[destino] is None or nd < dist[destino]:
+                    dist[destino] = nd
+                    heapq.heappush(heap, (nd, destino))
+        return dist
+
+    def _augment(self, node: int, sink: int, limite: int, potential: List[int], visited: List[bool]) -> int:
+        if node == sink:
+            return limite
+        visited[node] = True
+        empujado = 0
+        for edge in self.graph[node]:
+            destino, capacidad, costo, reversa = edge
+            if capacidad <= 0 or visited[destino]:
+                continue
+            if costo + potential[node] - potential[destino] != 0:
+                continue
+            enviado = self._augment(destino, sink, min(limite - empujado, capacidad), potential, visited)
+            if enviado:
+                edge[1] -= enviado
+                reversa[1] += enviado
+                empujado += enviado
+                if empujado == limite:
+                    break
+        if empujado < limite:
+            # Sin más caminos admisibles desde este nodo en la fase actual
+            return empujado
+        visited[node] = False
+        return empujado
+
+    def solve(self, source: int, sink: int) -> int:
+        size = len(self.graph)
+        potential = [0] * size
+        infinito = sum(edge[1] for edge in self.graph[source])
+        flujo = 0
+        while True:
+            dist = self._dijkstra(source, potential)
+            if dist[sink] is None:
+                return flujo
+            for node in range(size):
+                if dist[node] is not None:
+                    potential[node] += dist[node]
+            while True:
+                enviado = self._augment(source, sink, infinito - flujo, potential, [False] * size)
+                if not enviado:
+                    break
+                flujo += enviado
+
+
+def plan_asignaciones(
+    partidos: Sequence[PartidoSlot], arbitros: Sequence[ArbitroSlot]
+) -> Dict[int, int]:
+    """Return ``{partido_id: arbitro_id}`` for the cheapest maximum assignment.
+
+    Pure function with no database access; partidos that cannot be covered
+    with the available capacity are left out of the result.
+    """
+
+    cruces: Dict[tuple, List[PartidoSlot]] = defaultdict(list)
+    for partido in partidos:
+        key = tuple(sorted((partido.club_local_id, partido.club_visitante_id)))
+        cruces[key].append(partido)
+    disponibles = [arbitro for arbitro in arbitros if arbitro.capacidad > 0]
+    if not cruces or not disponibles:
+        return {}
+
+    cruce_keys = list(cruces)
+    source = 0
+    first_cruce = 1
+    first_arbitro = first_cruce + len(cruce_keys)
+    sink = first_arbitro + len(disponibles)
+    red = _MinCostFlow(sink + 1)
+
+    for idx, key in enumerate(cruce_keys):
+        cantidad = len(cruces[key])
+        red.add_edge(source, first_cruce + idx, cantidad, 0)
+        for a_idx, arbitro in enumerate(disponibles):
+            historial = arbitro.clubes or {}
+            costo = PESO_CLUB * (historial.get(key[0], 0) + historial.get(key[-1], 0))
+            red.add_edge(first_cruce + idx, first_arbitro + a_idx, 1, costo)
+            if cantidad > 1:
+                red.add_edge(
+                    first_cruce + idx,
+                    first_arbitro + a_idx,
+                    cantidad - 1,
+                    costo + PENALIDAD_REPETICION,
+                )
+
+    for a_idx, arbitro in enumerate(disponibles):
+        for k in range(arbitro.capacidad):
+            red.add_edge(first_arbitro + a_idx, sink, 1, PESO_CARGA * (arbitro.carga + k))
+
+    red.solve(source, sink)
+
+    asignacion: Dict[int, int] = {}
+    for idx, key in enumerate(cruce_keys):
+        pendientes = list(cruces[key])
+        for edge in red.graph[first_cruce + idx]:
+            destino = edge[0]
+            if not first_arbitro <= destino < sink:
+                continue
+            usados = edge[3][1]  # flujo = capacidad residual de la arista inversa
+            arbitro_id = disponibles[destino - first_arbitro].arbitro_id
+            for _ in range(usados):
+                asignacion[pendientes.pop(0).partido_id] = arbitro_id
+    return asignacion
+
+
+def assign_arbitros(fecha: Fecha, *, sobrescribir: bool = False) -> AsignacionResultado:
+    """Assign referees to the partidos of ``fecha`` and save them in one bulk update.
+
+    Inactive referees and those marked unavailable for the day are skipped.
+    The daily limit counts partidos already assigned on the same day in other
+    fechas; the season load and club history come from the liga of each
+    partido. With ``sobrescribir`` existing assignments of the fecha are
+    recomputed, otherwise only partidos without referee are assigned.
+    """
+
+    partidos_qs = Partido.objects.filter(fecha_ref=fecha).select_related("local", "visitante", "categoria")
+    if not sobrescribir:
+        partidos_qs = partidos_qs.filter(arbitro__isnull=True)
+    partidos = list(partidos_qs.order_by("categoria__nombre", "id"))
+    if not partidos:
+        return AsignacionResultado(asignados=0, sin_asignar=0)
+
+    pendientes_ids = [partido.id for partido in partidos]
+    liga_ids = {partido.categoria.liga_id for partido in partidos}
+
+    arbitros_qs = Arbitro.objects.filter(activo=True)
+    mismo_dia = Q(fecha_ref=fecha)
+    if fecha.fecha is not None:
+        arbitros_qs = arbitros_qs.exclude(
+            pk__in=IndisponibilidadArbitro.objects.filter(fecha=fecha.fecha).values("arbitro_id")
+        )
+        mismo_dia |= Q(fecha_ref__fecha=fecha.fecha)
+    arbitros = list(arbitros_qs.order_by("id").values_list("id", "max_partidos_por_dia"))
+    if not arbitros:
+        raise AsignacionArbitrosError("No hay árbitros disponibles para la fecha.")
+
+    otros = Partido.objects.filter(arbitro__isnull=False).exclude(pk__in=pendientes_ids).order_by()
+    ocupados = Counter(
+        dict(otros.filter(mismo_dia).values("arbitro_id").annotate(n=Count("id")).values_list("arbitro_id", "n"))
+    )
+    temporada = otros.filter(categoria__liga_id__in=liga_ids)
+    carga = Counter(
+        dict(temporada.values("arbitro_id").annotate(n=Count("id")).values_list("arbitro_id", "n"))
+    )
+    historial: Dict[int, Counter] = defaultdict(Counter)
+    for arbitro_id, club_id, n in (
+        temporada.values("arbitro_id", club=F("local__club_id")).annotate(n=Count("id")).values_list(
+            "arbitro_id", "club", "n"
+        )
+    ):
+        historial[arbitro_id][club_id] += n
+    for arbitro_id, club_id, n in (
+        temporada.values("arbitro_id", club=F("visitante__club_id")).annotate(n=Count("id")).values_list(
+            "arbitro_id", "club", "n"
+        )
+    ):
+        historial[arbitro_id][club_id] += n
+
+    plan = plan_asignaciones(
+        [
+            PartidoSlot(partido.id, partido.local.club_id, partido.visitante.club_id)
+            for partido in partidos
+        ],
+        [
+            ArbitroSlot(
+                arbitro_id=arbitro_id,
+                capacidad=max(maximo - ocupados[arbitro_id], 0),
+                carga=carga[arbitro_id],
+                clubes=dict(historial.get(arbitro_id, {})),
+            )
+            for arbitro_id, maximo in arbitros
+        ],
+    )
+
+    for partido in partidos:
+        partido.arbitro_id = plan.get(partido.id)
+    with transaction.atomic():
+        Partido.objects.bulk_update(partidos, ["arbitro"], batch_size=500)
+
+    return AsignacionResultado(asignados=len(plan), sin_asignar=len(partidos) - len(plan))
+
+
+__all__ = [
+    "ArbitroSlot",
+    "AsignacionArbitrosError",
+    "AsignacionResultado",
+    "PartidoSlot",
+    "assign_arbitros",
+    "plan_asignaciones",
+]
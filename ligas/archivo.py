@@ -0,0 +1,277 @@
+"""Archiving of finished temporadas into a compressed snapshot.
+
+:func:`archivar_liga` moves a liga's game data out of the hot tables: rondas,
+fechas, partidos, events, suspensions, fixture, results and standings. It
+writes one ``LigaArchivada`` row holding the rows as zlib-compressed JSON and
+deletes the originals in the same transaction. The catalogue stays in place
+(liga, torneos, categorias, reglas, equipos, jugadores, player statistics),
+so the snapshot keeps pointing at valid ids and the archived season can still
+be browsed with :func:`leer_snapshot`. The per-fecha standings of
+:mod:`ligas.posiciones` are small and stay too, so evolution charts keep
+working for archived seasons.
+
+Without the archived rows, the ``PROTECT`` foreign keys no longer guard the
+catalogue, so the panel refuses to edit or delete it while the liga is
+archived (:func:`en_liga_archivada`).
+
+:func:`restaurar_liga` inserts the rows back, with new primary keys for the
+archived tables and their foreign keys remapped in memory. New rows may have
+taken the old ids in the meantime. Every catalogue row the snapshot points to
+is checked before anything is written; nullable references to rows deleted
+meanwhile (an arbitro, the jugador of an event) are restored as empty.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Type
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Model
+
+from .models import (
+    Categoria,
+    Club,
+    DisciplinaJugador,
+    Equipo,
+    EventoPartido,
+    Fecha,
+    Jugador,
+    Liga,
+    LigaArchivada,
+    Partido,
+    PartidoFixture,
+    ReglaPuntos,
+    ResultadoCategoriaPartido,
+    Ronda,
+    Suspension,
+    TablaPosicion,
+    Torneo,
+)
+from .purga import borrar_directo
+from .versioning import bump_liga, bump_torneo, invalidar
+
+FORMATO = 1
+
+# (modelo, lookup hasta la liga) en orden de inserción; se borran en orden inverso
+TABLAS: List[tuple[Type[Model], str]] = [
+    (Ronda, "torneo__liga"),
+    (Fecha, "ronda__torneo__liga"),
+    (Partido, "fecha_ref__ronda__torneo__liga"),
+    (EventoPartido, "partido__fecha_ref__ronda__torneo__liga"),
+    (Suspension, "fecha__ronda__torneo__liga"),
+    (PartidoFixture, "torneo__liga"),
+    (ResultadoCategoriaPartido, "partido__torneo__liga"),
+    (DisciplinaJugador, "torneo__liga"),
+    (TablaPosicion, "categoria__liga"),
+]
+
+# Claves foráneas hacia tablas archivadas: se renumeran al restaurar
+REMAPEO = {
+    Fecha: {"ronda_id": Ronda},
+    Partido: {"fecha_ref_id": Fecha},
+    EventoPartido: {"partido_id": Partido},
+    Suspension: {"fecha_id": Fecha},
+    ResultadoCategoriaPartido: {"partido_id": PartidoFixture},
+}
+
+# Catálogo al que apunta el snapshot: lookup hasta Liga.archivada. Los clubes
+# son compartidos entre ligas, así que solo se les impide el borrado.
+CATALOGO = {
+    Torneo: "liga__archivada",
+    Categoria: "liga__archivada",
+    ReglaPuntos: "categoria__liga__archivada",
+    Equipo: "categoria__liga__archivada",
+    Jugador: "equipo__categoria__liga__archivada",
+}
+CATALOGO_BORRADO = {**CATALOGO, Club: "equipos__categoria__liga__archivada"}
+
+
+class ArchivoError(Exception):
+    """Raised when a liga cannot be archived or restored."""
+
+
+@dataclass(frozen=True)
+class ArchivoResultado:
+    """Summary of an archive or restore: rows per table and compressed size."""
+
+    liga: Liga
+    filas: Dict[str, int]
+    bytes_comprimidos: int
+
+
+def _etiqueta(modelo: Type[Model]) -> str:
+    return modelo._meta.label_lower
+
+
+def _columnas(modelo: Type[Model]) -> List[str]:
+    return [campo.attname for campo in modelo._meta.concrete_fields]
+
+
+def en_liga_archivada(objeto: Model, *, borrar: bool = False) -> bool:
+    """Whether the snapshot of an archived liga points to ``objeto`` (so it must not change)."""
+
+    lookup = (CATALOGO_BORRADO if borrar else CATALOGO).get(type(objeto))
+    if lookup is None or objeto.pk is None:
+        return False
+    return type(objeto)._base_manager.filter(pk=objeto.pk, **{lookup: True}).exists()
+
+
+def pendientes(liga: Liga) -> int:
+    """Fixture matches of ``liga`` that are not played yet."""
+
+    return PartidoFixture.objects.filter(torneo__liga=liga, jugado=False).count()
+
+
+def archivar_liga(liga: Liga, *, forzar: bool = False) -> ArchivoResultado:
+    """Move the game data of ``liga`` into a ``LigaArchivada`` snapshot."""
+
+    if liga.archivada:
+        raise ArchivoError(f"{liga} ya está archivada.")
+    faltan = pendientes(liga)
+    if faltan and not forzar:
+        raise ArchivoError(f"{liga} tiene {faltan} partidos sin jugar; usá forzar para archivarla igual.")
+
+    with transaction.atomic():
+        tablas = {
+            _etiqueta(modelo): list(
+                modelo._base_manager.filter(**{lookup: liga.pk}).order_by("pk").values(*_columnas(modelo))
+            )
+            for modelo, lookup in TABLAS
+        }
+        datos = zlib.compress(
+            json.dumps({"formato": FORMATO, "tablas": tablas}, cls=DjangoJSONEncoder, separators=(",", ":")).encode(),
+            9,
+        )
+        filas = {etiqueta: len(lista) for etiqueta, lista in tablas.items()}
+        LigaArchivada.objects.create(liga=liga, formato=FORMATO, resumen=filas, datos=datos)
+
+        for modelo, lookup in reversed(TABLAS):
+            # Sin Collector ni señales: todo lo que cuelga de estas filas también se archiva
+            borrar_directo(modelo._base_manager.filter(**{lookup: liga.pk}))
+
+        Liga.objects.filter(pk=liga.pk).update(archivada=True)
+        liga.archivada = True
+        _invalidar(liga)
+
+    return ArchivoResultado(liga=liga, filas=filas, bytes_comprimidos=len(datos))
+
+
+def leer_snapshot(liga: Liga) -> Dict[str, List[dict]]:
+    """Rows of the snapshot of ``liga`` keyed by ``app_label.model`` (read-only)."""
+
+    try:
+        archivo = LigaArchivada.objects.get(liga=liga)
+    except LigaArchivada.DoesNotExist as exc:
+        raise ArchivoError(f"{liga} no está archivada.") from exc
+    contenido = json.loads(zlib.decompress(bytes(archivo.datos)))
+    if contenido.get("formato") != FORMATO:
+        raise ArchivoError(f"Formato de archivo desconocido: {contenido.get('formato')}.")
+    return contenido["tablas"]
+
+
+def _insertar(modelo: Type[Model], objetos: List[Model]) -> None:
+    if connection.features.can_return_rows_from_bulk_insert:
+        modelo._base_manager.bulk_create(objetos, batch_size=1000)
+    else:  # pragma: no cover - p. ej. MySQL: hacen falta los ids nuevos
+        for objeto in objetos:
+            objeto.save(force_insert=True)
+
+
+def _referencias_perdidas(tablas: Dict[str, List[dict]]) -> Dict[str, set]:
+    """Check the snapshot's references to the catalogue before restoring.
+
+    Nullable columns pointing to deleted rows are set to ``None`` in ``tablas``
+    (what ``on_delete`` would have done); the missing targets of the other
+    columns are returned as ``{"app_label.model": {ids}}``.
+    """
+
+    referencias: Dict[Type[Model], set] = {}
+    columnas: List[tuple] = []
+    for modelo, _ in TABLAS:
+        remapeo = REMAPEO.get(modelo, {})
+        for campo in modelo._meta.concrete_fields:
+            if campo.is_relation and campo.attname not in remapeo:
+                ids = {fila[campo.attname] for fila in tablas.get(_etiqueta(modelo), [])} - {None}
+                referencias.setdefault(campo.related_model, set()).update(ids)
+                columnas.append((modelo, campo))
+
+    faltantes = {
+        destino: ids - set(destino._base_manager.filter(pk__in=ids).values_list("pk", flat=True))
+        for destino, ids in referencias.items()
+        if ids
+    }
+    perdidas: Dict[str, set] = {}
+    for modelo, campo in columnas:
+        borrados = faltantes.get(campo.related_model)
+        if not borrados:
+            continue
+        for fila in tablas.get(_etiqueta(modelo), []):
+            if fila[campo.attname] in borrados:
+                if campo.null:
+                    fila[campo.attname] = None
+                else:
+                    perdidas.setdefault(_etiqueta(campo.related_model), set()).add(fila[campo.attname])
+    return perdidas
+
+
+def restaurar_liga(liga: Liga) -> ArchivoResultado:
+    """Put the archived rows of ``liga`` back into the hot tables.
+
+    Raises :class:`ArchivoError` without writing anything if a catalogue row
+    the snapshot needs was deleted after archiving.
+    """
+
+    tablas = leer_snapshot(liga)
+    perdidas = _referencias_perdidas(tablas)
+    if perdidas:
+        detalle = "; ".join(
+            f"{etiqueta} {', '.join(map(str, sorted(ids)))}" for etiqueta, ids in sorted(perdidas.items())
+        )
+        raise ArchivoError(f"No se puede restaurar {liga}: faltan filas a las que apunta el archivo ({detalle}).")
+    filas: Dict[str, int] = {}
+    with transaction.atomic():
+        nuevos_ids: Dict[Type[Model], Dict[int, int]] = {}
+        for modelo, _ in TABLAS:
+            remapeo = REMAPEO.get(modelo, {})
+            campos = {campo.attname: campo for campo in modelo._meta.concrete_fields}
+            viejos = []
+            objetos = []
+            for fila in tablas.get(_etiqueta(modelo), []):
+                viejos.append(fila.pop("id"))
+                valores = {columna: campos[columna].to_python(valor) for columna, valor in fila.items()}
+                for columna, destino in remapeo.items():
+                    valores[columna] = nuevos_ids[destino][valores[columna]]
+                objetos.append(modelo(**valores))
+            _insertar(modelo, objetos)
+            nuevos_ids[modelo] = {viejo: objeto.pk for viejo, objeto in zip(viejos, objetos)}
+            filas[_etiqueta(modelo)] = len(objetos)
+
+        archivo = LigaArchivada.objects.get(liga=liga)
+        tamano = len(archivo.datos)
+        archivo.delete()
+        Liga.objects.filter(pk=liga.pk).update(archivada=False)
+        liga.archivada = False
+        _invalidar(liga)
+
+    return ArchivoResultado(liga=liga, filas=filas, bytes_comprimidos=tamano)
+
+
+def _invalidar(liga: Liga) -> None:
+    invalidar(bump_liga, liga.pk)
+    for torneo_id in liga.torneos.values_list("pk", flat=True):
+        invalidar(bump_torneo, torneo_id)
+
+
+__all__ = [
+    "ArchivoError",
+    "ArchivoResultado",
+    "archivar_liga",
+    "en_liga_archivada",
+    "leer_snapshot",
+    "pendientes",
+    "restaurar_liga",
+]
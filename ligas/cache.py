@@ -0,0 +1,68 @@
+"""Cache-aside helper with stampede protection.
+
+Callers embed the version counters of :mod:`ligas.versioning` they depend on
+in the key (the site identity uses ``IDENTIDAD``), so invalidation is a
+counter bump done by the signal handlers in ``ligas.signals``; stale entries
+are never read again and simply expire.
+
+:func:`get_or_set` stores each value with a soft expiry shorter than the cache
+timeout. When the soft expiry passes, the first caller to take a short lock
+recomputes while the others keep serving the previous value; on a cold miss
+the callers that lose the lock wait briefly for the winner instead of all
+hitting the database at once.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from django.core.cache import cache
+
+TIMEOUT = 300
+# Margen entre el vencimiento "blando" y el real de la cache
+GRACIA = 60
+LOCK_TIMEOUT = 10
+ESPERA_MAXIMA = 2.0
+INTERVALO_ESPERA = 0.05
+
+
+def get_or_set(
+    key: str,
+    calcular: Callable[[], Any],
+    timeout: int = TIMEOUT,
+    *,
+    gracia: int = GRACIA,
+) -> Any:
+    """Return the cached value of ``key``, computing it with ``calcular`` when needed."""
+
+    ahora = time.time()
+    entrada = cache.get(key)
+    if entrada is not None and entrada[0] > ahora:
+        return entrada[1]
+
+    lock = f"{key}:lock"
+    if cache.add(lock, 1, LOCK_TIMEOUT):
+        try:
+            valor = calcular()
+            cache.set(key, (time.time() + timeout, valor), timeout + gracia)
+            return valor
+        finally:
+            cache.delete(lock)
+
+    if entrada is not None:
+        # Otro proceso está recalculando: servimos el valor vencido mientras tanto
+        return entrada[1]
+
+    limite = ahora + ESPERA_MAXIMA
+    while time.time() < limite:
+        time.sleep(INTERVALO_ESPERA)
+        entrada = cache.get(key)
+        if entrada is not None:
+            return entrada[1]
+    return calcular()
+
+
+__all__ = [
+    "get_or_set",
+]
@@ -1,9 +1,16 @@
+import hashlib
+
 from django.db.utils import OperationalError, ProgrammingError
+from django.utils.functional import cached_property
+
+from .cache import get_or_set
 from .models import SiteIdentity
+from .versioning import IDENTIDAD, get_version
 
 
 def identity(request):
     """Inyecta la identidad del sitio en el contexto de templates.
+    Se lee de la cache (se invalida al guardarla) para no consultar la base en cada request.
     Tolera falta de migraciones/tablas devolviendo defaults in-memory.
     """
     default = {
@@ -13,7 +20,7 @@ def identity(request):
         "logo_url": "",
     }
     try:
-        obj = SiteIdentity.get_solo()
+        obj = get_or_set(f"ligas:identidad:{get_version(IDENTIDAD)}", SiteIdentity.get_solo, 60 * 60)
         return {"identity": obj}
     except (OperationalError, ProgrammingError):
         # Tabla aún no creada, devolvemos defaults simples
@@ -25,3 +32,36 @@ def identity(request):
 
         return {"identity": Obj()}
 
+
+class PanelCache:
+    """Claves de los fragmentos cacheados de ``base_admin.html``.
+
+    Se calculan sólo si la plantilla las usa: ``permisos`` es una huella del
+    conjunto de permisos del usuario, ``seccion`` el prefijo de la URL que
+    marca el ítem activo del menú e ``identidad`` la versión de la identidad.
+    """
+
+    def __init__(self, request):
+        self._request = request
+
+    @cached_property
+    def permisos(self):
+        user = getattr(self._request, "user", None)
+        if user is None or not user.is_authenticated:
+            return "anonimo"
+        if user.is_active and user.is_superuser:
+            return "superusuario"
+        permisos = ",".join(sorted(user.get_all_permissions()))
+        return hashlib.md5(permisos.encode(), usedforsecurity=False).hexdigest()
+
+    @cached_property
+    def seccion(self):
+        return "/".join(self._request.path.split("/")[:3])
+
+    @cached_property
+    def identidad(self):
+        return get_version(IDENTIDAD)
+
+
+def panel(request):
+    return {"panel": PanelCache(request)}
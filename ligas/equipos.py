@@ -0,0 +1,98 @@
+"""Bulk generation of equipos for clubs × ligas.
+
+Every club gets one ``Equipo`` per categoria of every selected liga, named
+"Club - Categoría". The existing ``(club, categoria)`` pairs are read in one
+query, with the clubs locked; the missing equipos go through
+``bulk_create(ignore_conflicts=True)`` (an equipo added meanwhile cannot make
+it fail on the unique constraint) and are counted again afterwards, and
+existing equipos without alias are completed with one ``bulk_update``.
+
+Bulk operations skip the model signals, so the liga version counters used by
+the caches are bumped explicitly.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+from django.db import transaction
+
+from .models import Categoria, Club, Equipo, Liga
+from .versioning import bump_liga, invalidar
+
+
+@dataclass(frozen=True)
+class GeneracionEquipos:
+    """Summary of :func:`generar_equipos`."""
+
+    creados: int
+    existentes: int
+    alias_completados: int
+    ligas_sin_categorias: Tuple[str, ...] = ()
+
+
+def alias_equipo(club: Club, categoria: Categoria) -> str:
+    return f"{club.nombre} - {categoria.nombre}"
+
+
+def generar_equipos(
+    clubes: Iterable[Club],
+    ligas: Iterable[Liga],
+    *,
+    batch_size: int = 500,
+) -> GeneracionEquipos:
+    """Create the missing equipos of every club in every categoria of ``ligas``."""
+
+    clubes = list(clubes)
+    ligas = list(ligas)
+    categorias = list(Categoria.objects.filter(liga__in=ligas).only("id", "nombre", "liga_id"))
+    ligas_con_categorias = {categoria.liga_id for categoria in categorias}
+    sin_categorias = tuple(str(liga) for liga in ligas if liga.pk not in ligas_con_categorias)
+    if not clubes or not categorias:
+        return GeneracionEquipos(0, 0, 0, sin_categorias)
+
+    with transaction.atomic():
+        # Serializa las generaciones que comparten clubes: las claves leídas siguen valiendo al insertar
+        bloqueo = Club.objects.select_for_update().filter(pk__in=[club.pk for club in clubes]).order_by("pk")
+        list(bloqueo.values_list("pk", flat=True))
+        destino = Equipo.objects.filter(club__in=clubes, categoria__in=categorias)
+        existentes = {
+            (equipo.club_id, equipo.categoria_id): equipo
+            for equipo in destino.only("id", "club_id", "categoria_id", "alias")
+        }
+
+        nuevos: List[Equipo] = []
+        sin_alias: List[Equipo] = []
+        for club in clubes:
+            for categoria in categorias:
+                equipo = existentes.get((club.pk, categoria.pk))
+                if equipo is None:
+                    nuevos.append(Equipo(club=club, categoria=categoria, alias=alias_equipo(club, categoria)))
+                elif not equipo.alias:
+                    equipo.alias = alias_equipo(club, categoria)
+                    sin_alias.append(equipo)
+
+        creados = 0
+        if nuevos:
+            Equipo.objects.bulk_create(nuevos, batch_size=batch_size, ignore_conflicts=True)
+            # ignore_conflicts no informa qué filas se omitieron: se cuentan las que quedaron
+            creados = destino.count() - len(existentes)
+        Equipo.objects.bulk_update(sin_alias, ["alias"], batch_size=batch_size)
+        if creados or sin_alias:
+            for liga_id in ligas_con_categorias:
+                invalidar(bump_liga, liga_id)
+
+    return GeneracionEquipos(
+        creados=creados,
+        existentes=len(existentes),
+        alias_completados=len(sin_alias),
+        ligas_sin_categorias=sin_categorias,
+    )
+
+
+__all__ = [
+    "GeneracionEquipos",
+    "alias_equipo",
+    "generar_equipos",
+]
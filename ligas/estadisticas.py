@@ -0,0 +1,105 @@
+"""Materialized goal and card counters per jugador built from ``EventoPartido``.
+
+Counters are kept up to date incrementally by the signal handlers in
+``ligas.signals`` (one ``UPDATE ... SET x = x ± 1`` per event write), so the
+goleadores and discipline tables are plain indexed top-K reads. Bulk writes
+bypass signals; :func:`rebuild_estadisticas` recomputes everything from the
+events table.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import Categoria, EstadisticaJugador, EventoPartido
+
+CAMPOS_POR_TIPO = {
+    EventoPartido.GOL: "goles",
+    EventoPartido.TA: "amarillas",
+    EventoPartido.TR: "rojas",
+}
+
+
+def apply_evento(jugador_id: Optional[int], categoria_id: Optional[int], tipo: str, signo: int) -> None:
+    """Add (``signo=1``) or remove (``signo=-1``) one event from the counters."""
+
+    campo = CAMPOS_POR_TIPO.get(tipo)
+    if campo is None or jugador_id is None or categoria_id is None:
+        return
+
+    filas = EstadisticaJugador.objects.filter(categoria_id=categoria_id, jugador_id=jugador_id)
+    if signo < 0:
+        filas.filter(**{f"{campo}__gt": 0}).update(**{campo: F(campo) - 1})
+        return
+
+    if filas.update(**{campo: F(campo) + 1}):
+        return
+    try:
+        with transaction.atomic():
+            EstadisticaJugador.objects.create(categoria_id=categoria_id, jugador_id=jugador_id, **{campo: 1})
+    except IntegrityError:
+        # Otra escritura concurrente creó la fila primero
+        filas.update(**{campo: F(campo) + 1})
+
+
+def rebuild_estadisticas(categorias: Optional[Iterable[Categoria]] = None) -> int:
+    """Recompute the counters from ``EventoPartido`` and return the rows written."""
+
+    eventos = EventoPartido.objects.filter(jugador__isnull=False, tipo__in=CAMPOS_POR_TIPO)
+    existentes = EstadisticaJugador.objects.all()
+    if categorias is not None:
+        categoria_ids = [categoria.pk for categoria in categorias]
+        eventos = eventos.filter(partido__categoria_id__in=categoria_ids)
+        existentes = existentes.filter(categoria_id__in=categoria_ids)
+
+    agregados = (
+        eventos.order_by()
+        .values("partido__categoria_id", "jugador_id")
+        .annotate(
+            goles=Count("id", filter=Q(tipo=EventoPartido.GOL)),
+            amarillas=Count("id", filter=Q(tipo=EventoPartido.TA)),
+            rojas=Count("id", filter=Q(tipo=EventoPartido.TR)),
+        )
+    )
+    filas = [
+        EstadisticaJugador(
+            categoria_id=fila["partido__categoria_id"],
+            jugador_id=fila["jugador_id"],
+            goles=fila["goles"],
+            amarillas=fila["amarillas"],
+            rojas=fila["rojas"],
+        )
+        for fila in agregados.iterator(chunk_size=2000)
+    ]
+    with transaction.atomic():
+        existentes.delete()
+        EstadisticaJugador.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+def top_goleadores(categoria: Categoria, limit: int = 10):
+    return (
+        EstadisticaJugador.objects.filter(categoria=categoria, goles__gt=0)
+        .select_related("jugador__equipo__club")
+        .order_by("-goles", "jugador__apellido", "jugador__nombre")[:limit]
+    )
+
+
+def tabla_disciplina(categoria: Categoria, limit: int = 10):
+    return (
+        EstadisticaJugador.objects.filter(categoria=categoria)
+        .filter(Q(amarillas__gt=0) | Q(rojas__gt=0))
+        .select_related("jugador__equipo__club")
+        .order_by("-rojas", "-amarillas", "jugador__apellido", "jugador__nombre")[:limit]
+    )
+
+
+__all__ = [
+    "apply_evento",
+    "rebuild_estadisticas",
+    "tabla_disciplina",
+    "top_goleadores",
+]
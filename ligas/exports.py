@@ -0,0 +1,275 @@
+"""Streaming exports of fixtures, results and standings.
+
+Every dataset is a ``values_list`` queryset consumed with
+``.iterator(chunk_size=CHUNK_SIZE)`` and every format is a generator of text
+chunks, so a full temporada is written row by row in constant memory, either
+into a ``StreamingHttpResponse`` or into a file from the management command.
+Under ASGI, Django would buffer a sync iterator whole (``sync_to_async(list)``),
+so views wrap it with :func:`en_async`.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import json
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import Liga, PartidoFixture, ResultadoCategoriaPartido, TablaPosicion, Torneo
+from .programacion import DURACION_PARTIDO
+
+CHUNK_SIZE = 2000
+# Filas acumuladas por cada escritura a la respuesta
+FILAS_POR_BLOQUE = 500
+
+RONDA_NOMBRES = dict(PartidoFixture.RONDA_CHOICES)
+
+
+class ExportError(Exception):
+    """Raised for unknown datasets or formats."""
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """A flat export: column names and the queryset fields that fill them."""
+
+    nombre: str
+    columnas: Tuple[str, ...]
+    campos: Tuple[str, ...]
+    orden: Tuple[str, ...]
+    consulta: Callable[[Liga, Optional[Torneo]], QuerySet]
+    formatos: Tuple[str, ...] = ("csv", "jsonl")
+    por_torneo: bool = True  # False: los datos son de toda la liga y no se pueden acotar a un torneo
+
+    def filas(self, liga: Liga, torneo: Optional[Torneo] = None) -> Iterator[tuple]:
+        qs = self.consulta(liga, torneo).order_by(*self.orden).values_list(*self.campos)
+        return qs.iterator(chunk_size=CHUNK_SIZE)
+
+
+def _fixture(liga: Liga, torneo: Optional[Torneo]) -> QuerySet:
+    qs = PartidoFixture.objects.filter(torneo__liga=liga)
+    return qs.filter(torneo=torneo) if torneo is not None else qs
+
+
+def _resultados(liga: Liga, torneo: Optional[Torneo]) -> QuerySet:
+    qs = ResultadoCategoriaPartido.objects.filter(partido__torneo__liga=liga)
+    return qs.filter(partido__torneo=torneo) if torneo is not None else qs
+
+
+def _posiciones(liga: Liga, torneo: Optional[Torneo]) -> QuerySet:
+    # TablaPosicion acumula todos los torneos de la categoría
+    return TablaPosicion.objects.filter(categoria__liga=liga)
+
+
+DATASETS: Dict[str, Dataset] = {
+    "fixture": Dataset(
+        nombre="fixture",
+        columnas=(
+            "id", "torneo", "ronda", "fecha", "local", "visitante",
+            "fecha_programada", "jugado", "goles_local", "goles_visitante",
+        ),
+        campos=(
+            "id", "torneo__nombre", "ronda", "fecha_nro", "club_local__nombre", "club_visitante__nombre",
+            "fecha_programada", "jugado", "goles_local", "goles_visitante",
+        ),
+        orden=("torneo__nombre", "ronda", "fecha_nro", "id"),
+        consulta=_fixture,
+        formatos=("csv", "jsonl", "ics"),
+    ),
+    "resultados": Dataset(
+        nombre="resultados",
+        columnas=(
+            "partido_id", "torneo", "ronda", "fecha", "categoria", "local", "visitante",
+            "goles_local", "goles_visitante",
+        ),
+        campos=(
+            "partido_id", "partido__torneo__nombre", "partido__ronda", "partido__fecha_nro", "categoria__nombre",
+            "partido__club_local__nombre", "partido__club_visitante__nombre", "goles_local", "goles_visitante",
+        ),
+        orden=("partido__torneo__nombre", "partido__ronda", "partido__fecha_nro", "partido_id", "categoria__nombre"),
+        consulta=_resultados,
+    ),
+    "posiciones": Dataset(
+        nombre="posiciones",
+        columnas=("categoria", "club", "puntos", "pj", "pg", "pe", "pp", "gf", "gc"),
+        campos=("categoria__nombre", "equipo__club__nombre", "puntos", "pj", "pg", "pe", "pp", "gf", "gc"),
+        orden=("categoria__nombre", "-puntos", "-pg", "gc", "-gf", "equipo__club__nombre"),
+        consulta=_posiciones,
+        por_torneo=False,
+    ),
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+    "ics": "text/calendar; charset=utf-8",
+}
+
+
+def _valor(valor):
+    if isinstance(valor, datetime.datetime):
+        return timezone.localtime(valor).isoformat() if timezone.is_aware(valor) else valor.isoformat()
+    if isinstance(valor, datetime.date):
+        return valor.isoformat()
+    return valor
+
+
+def stream_csv(columnas: Sequence[str], filas: Iterable[tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columnas)
+    pendientes = 0
+    for fila in filas:
+        writer.writerow([_valor(valor) for valor in fila])
+        pendientes += 1
+        if pendientes >= FILAS_POR_BLOQUE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pendientes = 0
+    yield buffer.getvalue()
+
+
+def stream_jsonl(columnas: Sequence[str], filas: Iterable[tuple]) -> Iterator[str]:
+    bloque = []
+    for fila in filas:
+        bloque.append(json.dumps(dict(zip(columnas, map(_valor, fila))), ensure_ascii=False))
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield "\n".join(bloque) + "\n"
+            bloque = []
+    if bloque:
+        yield "\n".join(bloque) + "\n"
+
+
+def _ics_texto(valor: str) -> str:
+    return (
+        str(valor).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _ics_linea(linea: str) -> str:
+    """Fold a content line at 75 octets as required by RFC 5545."""
+
+    partes = []
+    actual = ""
+    for caracter in linea:
+        if len((actual + caracter).encode("utf-8")) > 75:
+            partes.append(actual)
+            actual = " " + caracter
+        else:
+            actual += caracter
+    partes.append(actual)
+    return "\r\n".join(partes) + "\r\n"
+
+
+def _ics_fecha(valor: datetime.datetime) -> str:
+    return valor.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def stream_ics(
+    nombre: str, filas: Iterable[tuple], *, duracion: datetime.timedelta = DURACION_PARTIDO
+) -> Iterator[str]:
+    """iCalendar feed of the fixture rows that already have ``fecha_programada``."""
+
+    sello = _ics_fecha(timezone.now())
+    yield "".join(
+        _ics_linea(linea)
+        for linea in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//Ligas//Fixture//ES",
+            "CALSCALE:GREGORIAN",
+            f"X-WR-CALNAME:{_ics_texto(nombre)}",
+        )
+    )
+    bloque = []
+    for partido_id, torneo, ronda, fecha_nro, local, visitante, programada, *_ in filas:
+        if programada is None:
+            continue
+        bloque.extend(
+            _ics_linea(linea)
+            for linea in (
+                "BEGIN:VEVENT",
+                f"UID:fixture-{partido_id}@ligas",
+                f"DTSTAMP:{sello}",
+                f"DTSTART:{_ics_fecha(programada)}",
+                f"DTEND:{_ics_fecha(programada + duracion)}",
+                f"SUMMARY:{_ics_texto(f'{local} vs {visitante}')}",
+                f"DESCRIPTION:{_ics_texto(f'{torneo} - {RONDA_NOMBRES.get(ronda, ronda)} - Fecha {fecha_nro}')}",
+                "END:VEVENT",
+            )
+        )
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield "".join(bloque)
+            bloque = []
+    bloque.append(_ics_linea("END:VCALENDAR"))
+    yield "".join(bloque)
+
+
+def exportar(
+    dataset: str, formato: str, liga: Liga, torneo: Optional[Torneo] = None
+) -> Iterator[str]:
+    """Return the chunk generator of ``dataset`` rendered as ``formato``."""
+
+    definicion = DATASETS.get(dataset)
+    if definicion is None:
+        raise ExportError(f"Exportación desconocida: {dataset}.")
+    if formato not in definicion.formatos:
+        raise ExportError(f"El formato {formato} no está disponible para {dataset}.")
+    if torneo is not None and not definicion.por_torneo:
+        raise ExportError(f"La exportación {dataset} es de toda la liga: no admite un torneo.")
+
+    filas = definicion.filas(liga, torneo)
+    if formato == "ics":
+        return stream_ics(str(torneo or liga), filas)
+    if formato == "jsonl":
+        return stream_jsonl(definicion.columnas, filas)
+    return stream_csv(definicion.columnas, filas)
+
+
+_FIN = object()
+
+
+async def en_async(chunks: Iterator[str]) -> AsyncIterator[str]:
+    """Async iterator over ``chunks`` that pulls one chunk at a time in the sync thread.
+
+    Thread-sensitive, so the queryset cursor stays on the thread of the view
+    that created it.
+    """
+
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await siguiente(chunks, _FIN)) is not _FIN:
+            yield chunk
+    finally:
+        # Cliente desconectado: cierra el generador (y el cursor) en su hilo
+        if hasattr(chunks, "close"):
+            await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def nombre_archivo(dataset: str, formato: str, liga: Liga, torneo: Optional[Torneo] = None) -> str:
+    partes = [dataset, str(liga.temporada), liga.nombre]
+    if torneo is not None:
+        partes.append(torneo.nombre)
+    base = "_".join(parte.strip().replace(" ", "-") for parte in partes if parte)
+    return f"{base}.{formato}"
+
+
+__all__ = [
+    "CHUNK_SIZE",
+    "CONTENT_TYPES",
+    "DATASETS",
+    "ExportError",
+    "en_async",
+    "exportar",
+    "nombre_archivo",
+    "stream_csv",
+    "stream_ics",
+    "stream_jsonl",
+]
@@ -6,11 +6,12 @@ from dataclasses import dataclass
 from typing import List, Optional, Sequence, Tuple
 
 from django.db import transaction
-
+from django.db.models import Exists, OuterRef
 from django.db.utils import OperationalError, ProgrammingError
 
 
-from .models import Club, PartidoFixture, Torneo
+from .models import Club, PartidoFixture, ResultadoCategoriaPartido, Torneo
+from .versioning import bump_torneo, invalidar
 
 
 class FixtureAlreadyExists(Exception):
@@ -31,6 +32,21 @@ class FixtureMatch:
     visitante: Club
 
 
+@dataclass(frozen=True)
+class FixtureReplan:
+    """Summary of the changes applied by :func:`replan_fixture`."""
+
+    creados: int
+    actualizados: int
+    eliminados: int
+    sin_cambios: int
+    fijos: int
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.creados or self.actualizados or self.eliminados)
+
+
 def _normalize_clubs(clubs: Sequence[Club]) -> List[Club]:
     """Return a list of unique clubs preserving the original order."""
 
@@ -164,9 +180,181 @@ def generate_fixture(torneo: Torneo, clubs: Sequence[Club]) -> List[FixtureMatch
     return created_matches
 
 
+def _ideal_keys(clubs: Sequence[Club]) -> List[Tuple[int, int, int, int]]:
+    """Return ``(ronda, fecha_nro, local_id, visitante_id)`` for the ideal fixture."""
+
+    ronda_ida, ronda_vuelta, _ = _build_rounds(clubs)
+    keys: List[Tuple[int, int, int, int]] = []
+    for ronda, fechas in (
+        (PartidoFixture.RONDA_IDA, ronda_ida),
+        (PartidoFixture.RONDA_VUELTA, ronda_vuelta),
+    ):
+        for fecha_idx, fecha in enumerate(fechas, start=1):
+            for local, visitante in fecha:
+                keys.append((ronda, fecha_idx, local.pk, visitante.pk))
+    return keys
+
+
+def _ubicar_cruces(
+    keys: Sequence[Tuple[int, int, int, int]],
+    ocupados: dict[Tuple[int, int], set[int]],
+) -> List[Tuple[int, int, int, int]]:
+    """Move the ideal crossings that clash with a fixed match to another fecha.
+
+    ``ocupados`` maps each ``(ronda, fecha_nro)`` to the clubs already playing
+    in it (the kept matches) and is updated in place. A crossing whose slot
+    already has one of its clubs goes to the first fecha of the same ronda
+    where both are free, or to a new fecha after the last one. The order of
+    ``keys`` is kept, so the result is deterministic and a second replan finds
+    nothing to change.
+    """
+
+    ultima: dict[int, int] = {}
+    for ronda, fecha_nro in list(ocupados) + [key[:2] for key in keys]:
+        ultima[ronda] = max(ultima.get(ronda, 0), fecha_nro)
+
+    ubicados: List[Tuple[int, int, int, int]] = []
+    for ronda, fecha_nro, local_id, visitante_id in keys:
+        clubes = {local_id, visitante_id}
+        if clubes & ocupados.get((ronda, fecha_nro), set()):
+            fecha_nro = next(
+                (
+                    nro for nro in range(1, ultima[ronda] + 1)
+                    if not clubes & ocupados.get((ronda, nro), set())
+                ),
+                None,
+            )
+            if fecha_nro is None:
+                ultima[ronda] += 1
+                fecha_nro = ultima[ronda]
+        ocupados.setdefault((ronda, fecha_nro), set()).update(clubes)
+        ubicados.append((ronda, fecha_nro, local_id, visitante_id))
+    return ubicados
+
+
+def replan_fixture(torneo: Torneo, clubs: Sequence[Club]) -> FixtureReplan:
+    """Bring the stored fixture of ``torneo`` in line with ``clubs``.
+
+    Instead of wiping the fixture, the ideal schedule for the current clubs is
+    diffed against the stored rows. Matches already played (``jugado``) or with
+    any category result loaded are kept untouched, and the ideal crossings they
+    already cover are skipped; a crossing that would put a club twice in the
+    fecha of a kept match is moved to a free fecha. The remaining rows are reconciled with minimal
+    changes: exact matches stay as they are, obsolete rows are reused through a
+    single bulk ``UPDATE`` (preferring rows of the same fecha), and only the
+    surplus is inserted or deleted.
+    """
+
+    clubes = _normalize_clubs(clubs)
+    if len(clubes) < 2:
+        raise FixtureGenerationError("Se necesitan al menos dos clubes para generar un fixture.")
+
+    ideal = _ideal_keys(clubes)
+
+    try:
+        with transaction.atomic():
+            stored = list(
+                PartidoFixture.objects.select_for_update()
+                .filter(torneo=torneo)
+                .annotate(
+                    con_resultados=Exists(
+                        ResultadoCategoriaPartido.objects.filter(partido=OuterRef("pk"))
+                    )
+                )
+                .order_by("ronda", "fecha_nro", "id")
+            )
+
+            cruces_fijos: set[Tuple[int, frozenset[int]]] = set()
+            ocupados: dict[Tuple[int, int], set[int]] = {}
+            pendientes: dict[Tuple[int, int, int, int], PartidoFixture] = {}
+            fijos = 0
+            for partido in stored:
+                if partido.jugado or partido.con_resultados:
+                    fijos += 1
+                    cruces_fijos.add(
+                        (partido.ronda, frozenset((partido.club_local_id, partido.club_visitante_id)))
+                    )
+                    ocupados.setdefault((partido.ronda, partido.fecha_nro), set()).update(
+                        (partido.club_local_id, partido.club_visitante_id)
+                    )
+                    continue
+                key = (partido.ronda, partido.fecha_nro, partido.club_local_id, partido.club_visitante_id)
+                pendientes[key] = partido
+
+            objetivo = _ubicar_cruces(
+                [key for key in ideal if (key[0], frozenset(key[2:])) not in cruces_fijos],
+                ocupados,
+            )
+            objetivo_set = set(objetivo)
+
+            sin_cambios = sum(1 for key in objetivo if key in pendientes)
+            faltantes = [key for key in objetivo if key not in pendientes]
+
+            # Filas sobrantes agrupadas por (ronda, fecha) para reutilizarlas
+            sobrantes: dict[Tuple[int, int], List[PartidoFixture]] = {}
+            for key, partido in pendientes.items():
+                if key not in objetivo_set:
+                    sobrantes.setdefault(key[:2], []).append(partido)
+
+            a_actualizar: List[PartidoFixture] = []
+            a_crear: List[PartidoFixture] = []
+            for ronda, fecha_nro, local_id, visitante_id in faltantes:
+                candidatos = sobrantes.get((ronda, fecha_nro))
+                if not candidatos:
+                    candidatos = next((lista for lista in sobrantes.values() if lista), None)
+                if candidatos:
+                    partido = candidatos.pop()
+                    if (partido.ronda, partido.fecha_nro) != (ronda, fecha_nro):
+                        partido.fecha_programada = None
+                    partido.ronda = ronda
+                    partido.fecha_nro = fecha_nro
+                    partido.club_local_id = local_id
+                    partido.club_visitante_id = visitante_id
+                    a_actualizar.append(partido)
+                else:
+                    a_crear.append(
+                        PartidoFixture(
+                            torneo=torneo,
+                            ronda=ronda,
+                            fecha_nro=fecha_nro,
+                            club_local_id=local_id,
+                            club_visitante_id=visitante_id,
+                        )
+                    )
+
+            a_eliminar = [partido.pk for lista in sobrantes.values() for partido in lista]
+            if a_eliminar:
+                PartidoFixture.objects.filter(pk__in=a_eliminar).delete()
+            if a_actualizar:
+                PartidoFixture.objects.bulk_update(
+                    a_actualizar,
+                    ["ronda", "fecha_nro", "club_local", "club_visitante", "fecha_programada"],
+                    batch_size=500,
+                )
+            if a_crear:
+                PartidoFixture.objects.bulk_create(a_crear, batch_size=500)
+            if a_actualizar or a_crear:
+                # bulk_update/bulk_create no disparan señales
+                invalidar(bump_torneo, torneo.pk)
+    except (ProgrammingError, OperationalError) as exc:
+        raise FixtureGenerationError(
+            "No se pudo acceder a la tabla de partidos de fixture. Ejecutá las migraciones pendientes."
+        ) from exc
+
+    return FixtureReplan(
+        creados=len(a_crear),
+        actualizados=len(a_actualizar),
+        eliminados=len(a_eliminar),
+        sin_cambios=sin_cambios,
+        fijos=fijos,
+    )
+
+
 __all__ = [
     "FixtureAlreadyExists",
     "FixtureGenerationError",
     "FixtureMatch",
+    "FixtureReplan",
     "generate_fixture",
+    "replan_fixture",
 ]
@@ -4,19 +4,41 @@ from typing import Iterable
 
 from django.core.exceptions import ValidationError
 
+from .importacion import formato_soportado
 from .models import Categoria, Club, Liga
 
 
 class EquipoGenerateForm(forms.Form):
-    club = forms.ModelChoiceField(
+    club = forms.ModelMultipleChoiceField(
         queryset=Club.objects.all().order_by("nombre"),
-        label="Club",
+        label="Clubes",
+        widget=forms.SelectMultiple(attrs={"size": 12}),
+        help_text="Ctrl/Cmd + clic para elegir varios.",
     )
+    liga = forms.ModelMultipleChoiceField(
+        queryset=Liga.objects.all().order_by("-temporada", "nombre"),
+        label="Ligas",
+        widget=forms.SelectMultiple(attrs={"size": 6}),
+        help_text="Se crearán equipos para todas las categorías asociadas a las ligas seleccionadas.",
+    )
+
+
+class JugadorImportForm(forms.Form):
     liga = forms.ModelChoiceField(
         queryset=Liga.objects.all().order_by("-temporada", "nombre"),
         label="Liga",
-        help_text="Se crearán equipos para todas las categorías asociadas a la liga seleccionada.",
     )
+    archivo = forms.FileField(
+        label="Archivo",
+        help_text="CSV o XLSX con columnas club, categoria, apellido, nombre, dni y fecha_nac (opcional).",
+    )
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data["archivo"]
+        # El contenido lo lee el worker; el formato se rechaza ya
+        if not formato_soportado(archivo.name):
+            raise ValidationError("Formato no soportado: use un archivo .csv o .xlsx.")
+        return archivo
 
 
 class ResultadoPartidoFixtureForm(forms.Form):
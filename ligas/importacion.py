@@ -0,0 +1,293 @@
+"""Streaming import of jugadores from CSV or XLSX rosters.
+
+Rows are read one at a time (``csv`` reader over a text stream, ``openpyxl``
+in read-only mode for spreadsheets), validated and buffered in batches. Each
+batch costs one indexed ``dni_normalizado IN (...)`` lookup to skip players
+already registered in the liga and one ``bulk_create``; the ``Equipo`` of every
+row is resolved from a single ``(club, categoria)`` map prefetched up front.
+
+Expected columns (header row, case insensitive): ``club``, ``categoria``,
+``apellido``, ``nombre``, ``dni`` and optionally ``fecha_nac``.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import datetime
+import io
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+
+from .models import Equipo, Jugador, Liga, normalizar_dni
+
+COLUMNAS_REQUERIDAS = ("club", "categoria", "apellido", "nombre", "dni")
+COLUMNAS = COLUMNAS_REQUERIDAS + ("fecha_nac",)
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+DNI_RE = re.compile(r"^\d{6,9}$")
+
+
+class ImportacionError(Exception):
+    """Raised when the file cannot be read as a roster."""
+
+
+@dataclass(frozen=True)
+class ErrorFila:
+    """A rejected row; ``fila`` is the 1-based line number including the header."""
+
+    fila: int
+    mensaje: str
+
+
+@dataclass
+class ImportacionResultado:
+    """Summary of :func:`importar_jugadores`."""
+
+    creados: int = 0
+    duplicados: int = 0
+    errores: List[ErrorFila] = field(default_factory=list)
+
+    @property
+    def procesados(self) -> int:
+        return self.creados + self.duplicados + len(self.errores)
+
+
+def _clave(valor) -> str:
+    return " ".join(str(valor or "").split()).casefold()
+
+
+def _texto(valor) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        # Las planillas guardan los DNI como números
+        valor = int(valor)
+    return " ".join(str(valor).split())
+
+
+def _parse_fecha(valor) -> Optional[datetime.date]:
+    if valor in (None, ""):
+        return None
+    if isinstance(valor, datetime.datetime):
+        return valor.date()
+    if isinstance(valor, datetime.date):
+        return valor
+    texto = _texto(valor)
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(texto)
+
+
+def _normalizar_encabezado(encabezado: Iterable) -> List[str]:
+    columnas = [_clave(nombre).replace("categoría", "categoria") for nombre in encabezado]
+    faltantes = [nombre for nombre in COLUMNAS_REQUERIDAS if nombre not in columnas]
+    if faltantes:
+        raise ImportacionError(f"Faltan columnas en el archivo: {', '.join(faltantes)}.")
+    return columnas
+
+
+def _filas(encabezado, filas: Iterator) -> Iterator[Tuple[int, Dict[str, object]]]:
+    columnas = _normalizar_encabezado(encabezado)
+    for numero, valores in enumerate(filas, start=2):
+        if not any(valor not in (None, "") for valor in valores):
+            continue
+        yield numero, dict(zip(columnas, valores))
+
+
+def _detectar_encoding(stream: IO[bytes]) -> str:
+    """``utf-8-sig`` if the whole stream decodes as UTF-8, else ``cp1252`` (Excel in Spanish)."""
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    inicio = stream.tell()
+    try:
+        for bloque in iter(lambda: stream.read(64 * 1024), b""):
+            decoder.decode(bloque)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return "cp1252"
+    finally:
+        stream.seek(inicio)
+    return "utf-8-sig"
+
+
+def leer_csv(stream: IO[bytes], encoding: Optional[str] = None) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """Yield ``(numero_fila, valores)`` from a binary CSV stream (``,`` or ``;``).
+
+    Without ``encoding``, a seekable stream is scanned once and read as UTF-8
+    when valid, or as Windows-1252 otherwise.
+    """
+
+    if encoding is None:
+        encoding = _detectar_encoding(stream) if stream.seekable() else "utf-8-sig"
+    texto = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    try:
+        muestra = texto.read(4096)
+        texto.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+        except csv.Error:
+            dialecto = csv.excel
+        reader = csv.reader(texto, dialecto)
+        encabezado = next(reader, None)
+        if encabezado is None:
+            raise ImportacionError("El archivo está vacío.")
+        yield from _filas(encabezado, reader)
+    except UnicodeDecodeError as exc:
+        raise ImportacionError(f"El archivo no es texto {encoding} válido (byte {exc.start}).") from exc
+
+
+def leer_xlsx(stream: IO[bytes]) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """Yield ``(numero_fila, valores)`` from the first sheet of an XLSX workbook."""
+
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError as exc:  # pragma: no cover - depende del entorno
+        raise ImportacionError("Para importar archivos XLSX instale el paquete openpyxl.") from exc
+
+    try:
+        libro = load_workbook(stream, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as exc:
+        # KeyError: un zip válido al que le falta alguna parte del libro
+        raise ImportacionError("El archivo no es una planilla XLSX válida.") from exc
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            raise ImportacionError("El archivo está vacío.")
+        yield from _filas(encabezado, filas)
+    finally:
+        libro.close()
+
+
+def formato_soportado(nombre: str) -> bool:
+    return nombre.lower().endswith((".xlsx", ".csv", ".txt"))
+
+
+def leer_archivo(stream: IO[bytes], nombre: str) -> Iterator[Tuple[int, Dict[str, object]]]:
+    if nombre.lower().endswith(".xlsx"):
+        return leer_xlsx(stream)
+    if nombre.lower().endswith((".csv", ".txt")):
+        return leer_csv(stream)
+    raise ImportacionError("Formato no soportado: use un archivo .csv o .xlsx.")
+
+
+def _equipos_por_nombre(liga: Liga) -> Dict[Tuple[str, str], int]:
+    return {
+        (_clave(club), _clave(categoria)): equipo_id
+        for equipo_id, club, categoria in Equipo.objects.filter(categoria__liga=liga)
+        .order_by()
+        .values_list("id", "club__nombre", "categoria__nombre")
+    }
+
+
+def importar_jugadores(
+    liga: Liga,
+    filas: Iterable[Tuple[int, Dict[str, object]]],
+    *,
+    batch_size: int = 500,
+) -> ImportacionResultado:
+    """Validate and insert the jugadores of ``filas`` into the equipos of ``liga``.
+
+    Rows whose DNI is already registered in the liga (or repeated earlier in
+    the file) are counted as duplicates; invalid rows are reported and the rest
+    of the file is still imported.
+    """
+
+    equipos = _equipos_por_nombre(liga)
+    resultado = ImportacionResultado()
+    vistos = set()
+    lote: List[Jugador] = []
+
+    def volcar() -> None:
+        existentes = set(
+            Jugador.objects.filter(
+                equipo__categoria__liga=liga, dni_normalizado__in=[j.dni_normalizado for j in lote]
+            )
+            .order_by()
+            .values_list("dni_normalizado", flat=True)
+        )
+        nuevos = [jugador for jugador in lote if jugador.dni_normalizado not in existentes]
+        Jugador.objects.bulk_create(nuevos, batch_size=batch_size)
+        resultado.creados += len(nuevos)
+        resultado.duplicados += len(lote) - len(nuevos)
+        lote.clear()
+
+    with transaction.atomic():
+        for numero, valores in filas:
+            apellido = _texto(valores.get("apellido"))
+            nombre = _texto(valores.get("nombre"))
+            dni = normalizar_dni(_texto(valores.get("dni")))
+            equipo_id = equipos.get((_clave(valores.get("club")), _clave(valores.get("categoria"))))
+
+            error = None
+            if not apellido or not nombre:
+                error = "Apellido y nombre son obligatorios."
+            elif not DNI_RE.match(dni):
+                error = f"DNI inválido: {_texto(valores.get('dni')) or '(vacío)'}."
+            elif equipo_id is None:
+                error = (
+                    f"No existe equipo para el club {_texto(valores.get('club'))!r} "
+                    f"en la categoría {_texto(valores.get('categoria'))!r}."
+                )
+            else:
+                try:
+                    fecha_nac = _parse_fecha(valores.get("fecha_nac"))
+                except ValueError as exc:
+                    error = f"Fecha de nacimiento inválida: {exc}."
+                else:
+                    if fecha_nac is not None and fecha_nac > datetime.date.today():
+                        error = "La fecha de nacimiento no puede ser futura."
+            if error:
+                resultado.errores.append(ErrorFila(numero, error))
+                continue
+
+            if dni in vistos:
+                resultado.duplicados += 1
+                continue
+            vistos.add(dni)
+            lote.append(
+                Jugador(
+                    equipo_id=equipo_id,
+                    apellido=apellido[:120],
+                    nombre=nombre[:120],
+                    dni=dni,
+                    dni_normalizado=dni,
+                    fecha_nac=fecha_nac,
+                )
+            )
+            if len(lote) >= batch_size:
+                volcar()
+        if lote:
+            volcar()
+
+    return resultado
+
+
+def escribir_reporte(errores: Iterable[ErrorFila], destino: IO[str]) -> None:
+    """Write the rejected rows as CSV (``fila,error``)."""
+
+    writer = csv.writer(destino)
+    writer.writerow(["fila", "error"])
+    for error in errores:
+        writer.writerow([error.fila, error.mensaje])
+
+
+__all__ = [
+    "ErrorFila",
+    "ImportacionError",
+    "ImportacionResultado",
+    "escribir_reporte",
+    "formato_soportado",
+    "importar_jugadores",
+    "leer_archivo",
+    "leer_csv",
+    "leer_xlsx",
+]
@@ -0,0 +1,180 @@
+"""Live result updates pushed to browsers with Server-Sent Events.
+
+Writers call :func:`publicar` (from ``transaction.on_commit``) and every open
+SSE connection of the torneo receives the delta. The default broker keeps the
+subscribers in process, which is enough for a single ASGI worker; with
+``LIGAS_LIVE_BROKER = "redis"`` and ``LIGAS_LIVE_REDIS_URL`` the messages go
+through Redis pub/sub (or any server speaking its protocol) so that every
+worker sees them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from django.conf import settings
+
+# Mensajes pendientes por conexión antes de descartar los más viejos
+MAX_PENDIENTES = 100
+
+
+def canal_torneo(torneo_id: int) -> str:
+    return f"ligas:live:torneo:{torneo_id}"
+
+
+class MemoryBroker:
+    """In-process pub/sub; ``publish`` may be called from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscriptores: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+
+    @staticmethod
+    def _entregar(cola: asyncio.Queue, mensaje: str) -> None:
+        if cola.full():
+            # Un cliente lento no frena al resto: pierde lo más viejo
+            cola.get_nowait()
+        cola.put_nowait(mensaje)
+
+    def publish(self, canal: str, mensaje: str) -> None:
+        with self._lock:
+            destinos = list(self._suscriptores.get(canal, ()))
+        for loop, cola in destinos:
+            try:
+                loop.call_soon_threadsafe(self._entregar, cola, mensaje)
+            except RuntimeError:
+                # El loop del suscriptor ya se cerró
+                pass
+
+    async def subscribe(self, canal: str) -> AsyncIterator[str]:
+        entrada = (asyncio.get_running_loop(), asyncio.Queue(maxsize=MAX_PENDIENTES))
+        with self._lock:
+            self._suscriptores[canal].add(entrada)
+        try:
+            while True:
+                yield await entrada[1].get()
+        finally:
+            with self._lock:
+                self._suscriptores[canal].discard(entrada)
+                if not self._suscriptores[canal]:
+                    del self._suscriptores[canal]
+
+    def suscriptores(self, canal: str) -> int:
+        with self._lock:
+            return len(self._suscriptores.get(canal, ()))
+
+
+class RedisBroker:
+    """Pub/sub over Redis for deployments with several workers."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+            import redis.asyncio as redis_async
+        except ImportError as exc:  # pragma: no cover - depende del entorno
+            raise RuntimeError("LIGAS_LIVE_BROKER='redis' requiere el paquete redis (pip install -e '.[redis]').") from exc
+        self._url = url
+        self._cliente = redis.Redis.from_url(url)
+        self._async = redis_async
+
+    def publish(self, canal: str, mensaje: str) -> None:
+        self._cliente.publish(canal, mensaje)
+
+    async def subscribe(self, canal: str) -> AsyncIterator[str]:
+        cliente = self._async.Redis.from_url(self._url)
+        pubsub = cliente.pubsub()
+        await pubsub.subscribe(canal)
+        try:
+            async for mensaje in pubsub.listen():
+                if mensaje.get("type") == "message":
+                    data = mensaje["data"]
+                    yield data.decode("utf-8") if isinstance(data, bytes) else data
+        finally:
+            await pubsub.unsubscribe(canal)
+            await pubsub.aclose()
+            await cliente.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if getattr(settings, "LIGAS_LIVE_BROKER", "memory") == "redis":
+                    _broker = RedisBroker(settings.LIGAS_LIVE_REDIS_URL)
+                else:
+                    _broker = MemoryBroker()
+    return _broker
+
+
+def publicar(torneo_id: int, evento: str, datos: dict) -> None:
+    mensaje = json.dumps({"evento": evento, "datos": datos}, separators=(",", ":"), ensure_ascii=False)
+    get_broker().publish(canal_torneo(torneo_id), mensaje)
+
+
+def delta_resultado(partido, estado: str, resultados) -> dict:
+    """Compact payload for a partido: estado, totals and goals per categoria."""
+
+    return {
+        "p": partido.pk,
+        "e": estado,
+        "g": [partido.goles_local, partido.goles_visitante],
+        "c": {str(r.categoria_id): [r.goles_local, r.goles_visitante] for r in resultados},
+    }
+
+
+def formatear_sse(mensaje: str, evento_id: Optional[int] = None) -> str:
+    contenido = json.loads(mensaje)
+    lineas = []
+    if evento_id is not None:
+        lineas.append(f"id: {evento_id}")
+    lineas.append(f"event: {contenido['evento']}")
+    lineas.append("data: " + json.dumps(contenido["datos"], separators=(",", ":"), ensure_ascii=False))
+    return "\n".join(lineas) + "\n\n"
+
+
+async def stream_torneo(torneo_id: int, *, heartbeat: float = 15.0) -> AsyncIterator[str]:
+    """SSE body for a torneo: deltas as they arrive and a comment as keep-alive."""
+
+    yield "retry: 5000\n\n"
+    suscripcion = get_broker().subscribe(canal_torneo(torneo_id))
+    siguiente = None
+    evento_id = 0
+    try:
+        while True:
+            if siguiente is None:
+                siguiente = asyncio.ensure_future(anext(suscripcion))
+            hechos, _ = await asyncio.wait({siguiente}, timeout=heartbeat)
+            if not hechos:
+                yield ": ping\n\n"
+                continue
+            mensaje = siguiente.result()
+            siguiente = None
+            evento_id += 1
+            yield formatear_sse(mensaje, evento_id)
+    finally:
+        if siguiente is not None:
+            siguiente.cancel()
+            with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                await siguiente
+        await suscripcion.aclose()
+
+
+__all__ = [
+    "MemoryBroker",
+    "RedisBroker",
+    "canal_torneo",
+    "delta_resultado",
+    "get_broker",
+    "publicar",
+    "stream_torneo",
+]
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.archivo import ArchivoError, archivar_liga
+from ligas.models import Liga
+
+
+class Command(BaseCommand):
+    help = "Mueve el fixture, resultados, eventos y posiciones de una liga terminada a un archivo comprimido."
+
+    def add_arguments(self, parser):
+        parser.add_argument("liga_id", type=int)
+        parser.add_argument("--forzar", action="store_true", help="Archiva aunque queden partidos sin jugar.")
+
+    def handle(self, *args, **options):
+        try:
+            liga = Liga.objects.get(pk=options["liga_id"])
+        except Liga.DoesNotExist as exc:
+            raise CommandError(f"No existe la liga {options['liga_id']}.") from exc
+
+        try:
+            resultado = archivar_liga(liga, forzar=options["forzar"])
+        except ArchivoError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{liga} archivada: {sum(resultado.filas.values())} filas en "
+                f"{resultado.bytes_comprimidos / 1024:.1f} KiB."
+            )
+        )
+        for tabla, cantidad in resultado.filas.items():
+            self.stdout.write(f"  {tabla}: {cantidad}")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.arbitros import AsignacionArbitrosError, assign_arbitros
+from ligas.models import Fecha
+
+
+class Command(BaseCommand):
+    help = "Asigna árbitros automáticamente a los partidos de una fecha."
+
+    def add_arguments(self, parser):
+        parser.add_argument("fecha_id", type=int)
+        parser.add_argument(
+            "--sobrescribir",
+            action="store_true",
+            help="Recalcula también los partidos que ya tienen árbitro.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            fecha = Fecha.objects.select_related("ronda__torneo").get(pk=options["fecha_id"])
+        except Fecha.DoesNotExist as exc:
+            raise CommandError(f"No existe la fecha {options['fecha_id']}.") from exc
+
+        try:
+            resultado = assign_arbitros(fecha, sobrescribir=options["sobrescribir"])
+        except AsignacionArbitrosError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"{fecha}: {resultado.asignados} partidos con árbitro asignado."))
+        if resultado.sin_asignar:
+            self.stdout.write(
+                self.style.WARNING(f"{resultado.sin_asignar} partidos quedaron sin árbitro por falta de disponibilidad.")
+            )
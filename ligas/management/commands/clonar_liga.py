@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.models import Liga
+from ligas.temporadas import TemporadaError, clonar_liga
+
+
+class Command(BaseCommand):
+    help = "Crea la liga de una nueva temporada copiando categorías, reglas de puntos, equipos y, opcionalmente, planteles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("liga_id", type=int)
+        parser.add_argument("temporada", help='Temporada de la nueva liga, p. ej. "2026".')
+        parser.add_argument("--nombre", help="Nombre de la nueva liga (por defecto el de la original).")
+        parser.add_argument("--sin-equipos", action="store_true", help="Copia sólo categorías y reglas.")
+        parser.add_argument("--jugadores", action="store_true", help="Copia también los planteles.")
+        parser.add_argument(
+            "--sin-transaccion",
+            action="store_true",
+            help="Confirma cada tabla por separado en lugar de hacer todo en una transacción.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            liga = Liga.objects.get(pk=options["liga_id"])
+        except Liga.DoesNotExist as exc:
+            raise CommandError(f"No existe la liga {options['liga_id']}.") from exc
+
+        inicio = time.perf_counter()
+        try:
+            resultado = clonar_liga(
+                liga,
+                options["temporada"],
+                nombre=options["nombre"],
+                equipos=not options["sin_equipos"],
+                jugadores=options["jugadores"],
+                atomic=not options["sin_transaccion"],
+                batch_size=options["batch_size"],
+            )
+        except TemporadaError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado.liga} (id {resultado.liga.pk}): {resultado.categorias} categorías, "
+                f"{resultado.reglas} reglas, {resultado.equipos} equipos y {resultado.jugadores} jugadores "
+                f"copiados en {time.perf_counter() - inicio:.2f} s."
+            )
+        )
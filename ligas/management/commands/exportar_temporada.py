@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.exports import DATASETS, ExportError, exportar
+from ligas.models import Liga, Torneo
+
+
+class Command(BaseCommand):
+    help = "Exporta el fixture, los resultados o las posiciones de una liga (temporada completa o un torneo)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("liga_id", type=int)
+        parser.add_argument("dataset", choices=sorted(DATASETS))
+        parser.add_argument("--formato", default="csv", choices=["csv", "jsonl", "ics"])
+        parser.add_argument("--torneo", type=int, help="Limita la exportación a un torneo de la liga.")
+        parser.add_argument("--salida", help="Archivo de destino (por defecto la salida estándar).")
+
+    def handle(self, *args, **options):
+        try:
+            liga = Liga.objects.get(pk=options["liga_id"])
+        except Liga.DoesNotExist as exc:
+            raise CommandError(f"No existe la liga {options['liga_id']}.") from exc
+        torneo = None
+        if options["torneo"]:
+            try:
+                torneo = Torneo.objects.get(pk=options["torneo"], liga=liga)
+            except Torneo.DoesNotExist as exc:
+                raise CommandError(f"No existe el torneo {options['torneo']} en {liga}.") from exc
+
+        try:
+            contenido = exportar(options["dataset"], options["formato"], liga, torneo)
+        except ExportError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if not options["salida"]:
+            for bloque in contenido:
+                self.stdout.write(bloque, ending="")
+            return
+        with open(options["salida"], "w", encoding="utf-8", newline="") as destino:
+            for bloque in contenido:
+                destino.write(bloque)
+        self.stderr.write(self.style.SUCCESS(f"Exportación guardada en {options['salida']}."))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.importacion import ImportacionError, escribir_reporte, importar_jugadores, leer_archivo
+from ligas.models import Liga
+
+
+class Command(BaseCommand):
+    help = "Importa jugadores desde una planilla CSV o XLSX a los equipos de una liga."
+
+    def add_arguments(self, parser):
+        parser.add_argument("liga_id", type=int)
+        parser.add_argument("archivo")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--reporte", help="Ruta del CSV donde guardar las filas rechazadas.")
+
+    def handle(self, *args, **options):
+        try:
+            liga = Liga.objects.get(pk=options["liga_id"])
+        except Liga.DoesNotExist as exc:
+            raise CommandError(f"No existe la liga {options['liga_id']}.") from exc
+
+        try:
+            with open(options["archivo"], "rb") as stream:
+                resultado = importar_jugadores(
+                    liga, leer_archivo(stream, options["archivo"]), batch_size=options["batch_size"]
+                )
+        except (OSError, ImportacionError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{liga}: {resultado.creados} jugadores creados, {resultado.duplicados} duplicados omitidos."
+            )
+        )
+        if resultado.errores:
+            self.stdout.write(self.style.WARNING(f"{len(resultado.errores)} filas con errores."))
+            if options["reporte"]:
+                with open(options["reporte"], "w", newline="", encoding="utf-8") as destino:
+                    escribir_reporte(resultado.errores, destino)
+            else:
+                for error in resultado.errores:
+                    self.stdout.write(f"  fila {error.fila}: {error.mensaje}")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.models import Torneo
+from ligas.partidos import materialize_partidos
+
+
+class Command(BaseCommand):
+    help = "Genera las fechas y los partidos por categoría a partir del fixture de un torneo."
+
+    def add_arguments(self, parser):
+        parser.add_argument("torneo_id", type=int)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            torneo = Torneo.objects.select_related("liga").get(pk=options["torneo_id"])
+        except Torneo.DoesNotExist as exc:
+            raise CommandError(f"No existe el torneo {options['torneo_id']}.") from exc
+
+        resultado = materialize_partidos(torneo, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{torneo}: {resultado.fechas_creadas} fechas y {resultado.partidos_creados} partidos creados, "
+                f"{resultado.partidos_eliminados} partidos obsoletos eliminados."
+            )
+        )
+        if resultado.sin_equipo:
+            self.stdout.write(
+                self.style.WARNING(f"{resultado.sin_equipo} cruces omitidos por clubes sin equipo en la categoría.")
+            )
@@ -0,0 +1,123 @@
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ligas.trabajos import LATIDO_SEGUNDOS, Latido, ejecutar, ejecutar_por_id, liberar_colgados, tomar
+
+
+def _inicializar_proceso():
+    # Con "spawn" el proceso hijo arranca sin Django configurado; con "fork" no hace nada
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de trabajos en segundo plano (generación de fixture y equipos, eliminaciones, etc.)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Trabajos simultáneos; con 1 (y sin --procesos) se ejecutan en el hilo principal.",
+        )
+        parser.add_argument(
+            "--procesos",
+            action="store_true",
+            help="Usa un pool de procesos en lugar de hilos (para tareas que ocupan CPU).",
+        )
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre consultas con la cola vacía.")
+        parser.add_argument("--una-vez", action="store_true", help="Vacía la cola y termina.")
+        parser.add_argument(
+            "--liberar-tras",
+            type=int,
+            default=10 * LATIDO_SEGUNDOS,
+            help=(
+                "Reencola los trabajos en curso cuyo worker no da señales hace más de estos segundos "
+                f"(worker caído; los vivos avisan cada {LATIDO_SEGUNDOS} s)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers tiene que ser al menos 1.")
+        nombre = f"{socket.gethostname()}:{os.getpid()}"
+
+        if options["liberar_tras"] <= LATIDO_SEGUNDOS:
+            raise CommandError(f"--liberar-tras tiene que superar el intervalo del latido ({LATIDO_SEGUNDOS} s).")
+
+        liberados = liberar_colgados(options["liberar_tras"])
+        if liberados:
+            self.stdout.write(f"{liberados} trabajos colgados liberados.")
+
+        latido = Latido(nombre)
+        latido.start()
+        try:
+            if workers == 1 and not options["procesos"]:
+                return self._en_linea(nombre, options)
+            return self._en_pool(nombre, workers, options)
+        finally:
+            latido.detener()
+
+    def _en_pool(self, nombre, workers, options):
+        if options["procesos"]:
+            # Los hijos no deben heredar las conexiones abiertas del proceso padre
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_proceso)
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ligas-trabajo")
+
+        en_curso = {}
+        procesados = 0
+        try:
+            with pool:
+                while True:
+                    while len(en_curso) < workers:
+                        trabajo = tomar(nombre)
+                        if trabajo is None:
+                            break
+                        en_curso[pool.submit(ejecutar_por_id, trabajo.pk)] = trabajo
+
+                    if not en_curso:
+                        if options["una_vez"]:
+                            break
+                        time.sleep(options["intervalo"])
+                        continue
+
+                    listos, _ = wait(en_curso, timeout=options["intervalo"], return_when=FIRST_COMPLETED)
+                    for futuro in listos:
+                        trabajo = en_curso.pop(futuro)
+                        try:
+                            estado = futuro.result()
+                        except Exception as exc:  # noqa: BLE001 - p. ej. el proceso hijo murió
+                            self.stderr.write(f"Trabajo #{trabajo.pk} ({trabajo.tipo}): {exc}")
+                            continue
+                        procesados += 1
+                        self.stdout.write(f"Trabajo #{trabajo.pk} ({trabajo.tipo}): {estado}")
+        except KeyboardInterrupt:
+            self.stdout.write("Interrumpido; los trabajos en curso se reencolan con --liberar-tras.")
+
+        self.stdout.write(self.style.SUCCESS(f"{procesados} trabajos procesados."))
+
+    def _en_linea(self, nombre, options):
+        procesados = 0
+        try:
+            while True:
+                trabajo = tomar(nombre)
+                if trabajo is None:
+                    if options["una_vez"]:
+                        break
+                    time.sleep(options["intervalo"])
+                    continue
+                ejecutar(trabajo)
+                procesados += 1
+                self.stdout.write(f"Trabajo #{trabajo.pk} ({trabajo.tipo}): {trabajo.estado}")
+        except KeyboardInterrupt:
+            self.stdout.write("Interrumpido; los trabajos en curso se reencolan con --liberar-tras.")
+
+        self.stdout.write(self.style.SUCCESS(f"{procesados} trabajos procesados."))
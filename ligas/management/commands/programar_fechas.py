@@ -0,0 +1,44 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.models import Fecha
+from ligas.programacion import DURACION_PARTIDO, ProgramacionError, schedule_fecha
+
+
+class Command(BaseCommand):
+    help = "Asigna día y hora a los partidos de una o más fechas según el horario de cada categoría."
+
+    def add_arguments(self, parser):
+        parser.add_argument("fecha_ids", type=int, nargs="+")
+        parser.add_argument(
+            "--duracion",
+            type=int,
+            default=int(DURACION_PARTIDO.total_seconds() // 60),
+            help="Minutos que ocupa cada partido en la cancha.",
+        )
+        parser.add_argument(
+            "--sobrescribir",
+            action="store_true",
+            help="Reprograma también los partidos que ya tienen horario.",
+        )
+
+    def handle(self, *args, **options):
+        fechas = Fecha.objects.select_related("ronda").in_bulk(options["fecha_ids"])
+        faltantes = set(options["fecha_ids"]) - set(fechas)
+        if faltantes:
+            raise CommandError(f"No existen las fechas: {', '.join(map(str, sorted(faltantes)))}.")
+
+        duracion = datetime.timedelta(minutes=options["duracion"])
+        for fecha_id in options["fecha_ids"]:
+            fecha = fechas[fecha_id]
+            try:
+                resultado = schedule_fecha(fecha, duracion=duracion, sobrescribir=options["sobrescribir"])
+            except ProgramacionError as exc:
+                raise CommandError(f"{fecha}: {exc}") from exc
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{fecha}: {resultado.programados} partidos programados "
+                    f"({resultado.desplazados} corridos por superposición de cancha)."
+                )
+            )
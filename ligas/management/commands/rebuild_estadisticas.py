@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from ligas.estadisticas import rebuild_estadisticas
+from ligas.models import Categoria
+
+
+class Command(BaseCommand):
+    help = "Recalcula goleadores y tarjetas acumuladas a partir de los eventos de partido."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--categoria",
+            type=int,
+            action="append",
+            dest="categorias",
+            help="Limita el recálculo a la categoría indicada (se puede repetir).",
+        )
+
+    def handle(self, *args, **options):
+        categorias = None
+        if options["categorias"]:
+            categorias = list(Categoria.objects.filter(pk__in=options["categorias"]))
+        filas = rebuild_estadisticas(categorias)
+        self.stdout.write(self.style.SUCCESS(f"Se recalcularon {filas} estadísticas de jugadores."))
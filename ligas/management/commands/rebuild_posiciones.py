@@ -0,0 +1,135 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ligas.models import Categoria, TablaPosicion
+from ligas.posiciones import calcular_tablas, guardar_tablas
+
+
+def _inicializar_proceso():
+    # Con "spawn" el proceso hijo arranca sin Django configurado; con "fork" no hace nada
+    django.setup()
+
+
+def _calcular_shard(etiqueta, categoria_ids):
+    """Run in a worker process: compute one shard with the process' own connection."""
+
+    inicio = time.perf_counter()
+    tablas = calcular_tablas(categoria_ids)
+    return etiqueta, tablas, time.perf_counter() - inicio, os.getpid()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula la tabla de posiciones (TablaPosicion) de cada categoría a partir de los resultados, "
+        "repartiendo las categorías (o ligas) entre varios procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--categoria",
+            type=int,
+            action="append",
+            dest="categorias",
+            help="Limita el recálculo a la categoría indicada (se puede repetir).",
+        )
+        parser.add_argument(
+            "--liga",
+            type=int,
+            action="append",
+            dest="ligas",
+            help="Limita el recálculo a las categorías de la liga indicada (se puede repetir).",
+        )
+        parser.add_argument("--inactivas", action="store_true", help="Incluye las categorías inactivas.")
+        parser.add_argument(
+            "--por-liga",
+            action="store_true",
+            help="Un shard por liga en lugar de uno por categoría (menos consultas con muchas categorías chicas).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Procesos en paralelo (por defecto, uno por núcleo); con 1 se calcula en este proceso.",
+        )
+        parser.add_argument(
+            "--verificar",
+            action="store_true",
+            help="No escribe nada: informa qué categorías tienen la tabla guardada desactualizada.",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers tiene que ser al menos 1.")
+
+        categorias = Categoria.objects.all()
+        if not options["inactivas"]:
+            categorias = categorias.filter(activa=True)
+        if options["categorias"]:
+            categorias = categorias.filter(pk__in=options["categorias"])
+        if options["ligas"]:
+            categorias = categorias.filter(liga_id__in=options["ligas"])
+
+        shards = {}
+        for categoria_id, liga_id in categorias.order_by("liga_id", "pk").values_list("pk", "liga_id"):
+            etiqueta = f"liga {liga_id}" if options["por_liga"] else f"categoría {categoria_id}"
+            shards.setdefault(etiqueta, []).append(categoria_id)
+        if not shards:
+            self.stdout.write("No hay categorías para recalcular.")
+            return
+
+        inicio = time.perf_counter()
+        tablas = {}
+        for etiqueta, parcial, segundos, pid in self._calcular(shards, min(workers, len(shards))):
+            tablas.update(parcial)
+            filas = sum(len(filas) for filas in parcial.values())
+            self.stdout.write(f"{etiqueta}: {filas} filas en {segundos:.3f} s (proceso {pid})")
+        calculo = time.perf_counter() - inicio
+
+        if options["verificar"]:
+            return self._verificar(tablas)
+
+        inicio = time.perf_counter()
+        escritas = guardar_tablas(tablas)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Se recalcularon {escritas} filas de {len(tablas)} categorías en {len(shards)} shards: "
+                f"cálculo {calculo:.2f} s, escritura {time.perf_counter() - inicio:.2f} s."
+            )
+        )
+
+    def _calcular(self, shards, workers):
+        if workers == 1:
+            for etiqueta, categoria_ids in shards.items():
+                yield _calcular_shard(etiqueta, categoria_ids)
+            return
+
+        # Los hijos no deben heredar las conexiones abiertas del proceso padre
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_proceso) as pool:
+            futuros = [
+                pool.submit(_calcular_shard, etiqueta, categoria_ids) for etiqueta, categoria_ids in shards.items()
+            ]
+            for futuro in as_completed(futuros):
+                yield futuro.result()
+
+    def _verificar(self, tablas):
+        guardadas = {}
+        for categoria_id, *fila in TablaPosicion.objects.filter(categoria_id__in=tablas).values_list(
+            "categoria_id", "equipo_id", "puntos", "pj", "pg", "pe", "pp", "gf", "gc"
+        ):
+            guardadas.setdefault(categoria_id, set()).add(tuple(fila))
+        desactualizadas = sorted(
+            categoria_id for categoria_id, filas in tablas.items() if set(filas) != guardadas.get(categoria_id, set())
+        )
+        if desactualizadas:
+            raise CommandError(
+                f"{len(desactualizadas)} categorías con la tabla desactualizada: "
+                f"{', '.join(map(str, desactualizadas))}."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Las tablas de {len(tablas)} categorías están al día."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ligas.archivo import ArchivoError, restaurar_liga
+from ligas.models import Liga
+
+
+class Command(BaseCommand):
+    help = "Devuelve a las tablas activas los datos de una liga archivada."
+
+    def add_arguments(self, parser):
+        parser.add_argument("liga_id", type=int)
+
+    def handle(self, *args, **options):
+        try:
+            liga = Liga.objects.get(pk=options["liga_id"])
+        except Liga.DoesNotExist as exc:
+            raise CommandError(f"No existe la liga {options['liga_id']}.") from exc
+
+        try:
+            resultado = restaurar_liga(liga)
+        except ArchivoError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"{liga} restaurada: {sum(resultado.filas.values())} filas."))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0007_alter_partidofixture_goles_local_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arbitro',
+            name='activo',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='arbitro',
+            name='max_partidos_por_dia',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+        migrations.CreateModel(
+            name='IndisponibilidadArbitro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('arbitro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indisponibilidades', to='ligas.arbitro')),
+            ],
+            options={
+                'verbose_name': 'Indisponibilidad de árbitro',
+                'verbose_name_plural': 'Indisponibilidades de árbitros',
+                'ordering': ['fecha', 'arbitro__apellido'],
+                'unique_together': {('arbitro', 'fecha')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0008_arbitro_activo_arbitro_max_partidos_por_dia_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaJugador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goles', models.PositiveIntegerField(default=0)),
+                ('amarillas', models.PositiveIntegerField(default=0)),
+                ('rojas', models.PositiveIntegerField(default=0)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estadisticas', to='ligas.categoria')),
+                ('jugador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='estadisticas', to='ligas.jugador')),
+            ],
+            options={
+                'verbose_name': 'Estadística de jugador',
+                'verbose_name_plural': 'Estadísticas de jugadores',
+                'ordering': ['-goles', 'jugador__apellido', 'jugador__nombre'],
+                'indexes': [models.Index(fields=['categoria', '-goles'], name='estad_goleadores_idx'), models.Index(fields=['categoria', '-rojas', '-amarillas'], name='estad_disciplina_idx')],
+                'unique_together': {('categoria', 'jugador')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0009_estadisticajugador'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DisciplinaJugador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amarillas', models.PositiveIntegerField(default=0)),
+                ('rojas', models.PositiveIntegerField(default=0)),
+                ('fechas_pendientes', models.PositiveIntegerField(default=0)),
+                ('jugador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='disciplina', to='ligas.jugador')),
+                ('torneo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='disciplina', to='ligas.torneo')),
+            ],
+            options={
+                'verbose_name': 'Disciplina de jugador',
+                'verbose_name_plural': 'Disciplina de jugadores',
+                'ordering': ['torneo', 'jugador__apellido', 'jugador__nombre'],
+                'unique_together': {('jugador', 'torneo')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Suspension',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('motivo', models.CharField(choices=[('GOL', 'Gol'), ('TA', 'Tarjeta Amarilla'), ('TR', 'Tarjeta Roja'), ('WO', 'Walkover')], max_length=3)),
+                ('fecha', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suspensiones', to='ligas.fecha')),
+                ('jugador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suspensiones', to='ligas.jugador')),
+            ],
+            options={
+                'verbose_name': 'Suspensión',
+                'verbose_name_plural': 'Suspensiones',
+                'ordering': ['fecha', 'jugador__apellido', 'jugador__nombre'],
+                'unique_together': {('fecha', 'jugador')},
+            },
+        ),
+    ]
@@ -0,0 +1,14 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0010_disciplina_suspensiones'),
+    ]
+
+    # El índice sobre `dni` lo reemplaza `dni_normalizado` en 0012; crearlo acá
+    # solo para borrarlo en la migración siguiente costaba dos pasadas por la tabla.
+    operations = []
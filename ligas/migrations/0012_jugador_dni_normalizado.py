@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:49
+
+import re
+
+from django.db import migrations, models
+
+
+def poblar_dni_normalizado(apps, schema_editor):
+    Jugador = apps.get_model("ligas", "Jugador")
+    lote = []
+    for jugador in Jugador.objects.exclude(dni="").only("id", "dni").iterator(chunk_size=2000):
+        jugador.dni_normalizado = re.sub(r"[^0-9A-Za-z]", "", jugador.dni).upper()
+        lote.append(jugador)
+        if len(lote) >= 2000:
+            Jugador.objects.bulk_update(lote, ["dni_normalizado"])
+            lote = []
+    if lote:
+        Jugador.objects.bulk_update(lote, ["dni_normalizado"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0011_jugador_dni_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jugador',
+            name='dni_normalizado',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(poblar_dni_normalizado, migrations.RunPython.noop),
+    ]
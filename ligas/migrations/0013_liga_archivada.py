@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0012_jugador_dni_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='liga',
+            name='archivada',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='LigaArchivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('formato', models.PositiveSmallIntegerField(default=1)),
+                ('resumen', models.JSONField(default=dict)),
+                ('datos', models.BinaryField()),
+                ('liga', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archivo', to='ligas.liga')),
+            ],
+            options={
+                'verbose_name': 'Liga archivada',
+                'verbose_name_plural': 'Ligas archivadas',
+            },
+        ),
+    ]
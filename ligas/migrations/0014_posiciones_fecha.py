@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0013_liga_archivada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PosicionesFecha',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ronda', models.PositiveSmallIntegerField(choices=[(1, 'Ronda 1 (Ida)'), (2, 'Ronda 2 (Vuelta)')])),
+                ('fecha_nro', models.PositiveIntegerField()),
+                ('filas', models.JSONField(default=list)),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posiciones_fecha', to='ligas.categoria')),
+                ('torneo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posiciones_fecha', to='ligas.torneo')),
+            ],
+            options={
+                'verbose_name': 'Posiciones por fecha',
+                'verbose_name_plural': 'Posiciones por fecha',
+                'ordering': ['torneo', 'categoria', 'ronda', 'fecha_nro'],
+                'unique_together': {('torneo', 'ronda', 'fecha_nro', 'categoria')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:18
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def latido_inicial(apps, schema_editor):
+    # Los trabajos tomados antes de esta migración cuentan desde que empezaron
+    Trabajo = apps.get_model("ligas", "Trabajo")
+    Trabajo.objects.filter(estado="en_curso").update(latido=F("iniciado"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ligas', '0015_trabajos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajo',
+            name='latido',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(latido_inicial, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,15 @@
+import re
+
+from django.conf import settings
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
+
+
+def normalizar_dni(valor) -> str:
+    """Return the DNI without separators, uppercased (``"40.111.222"`` -> ``"40111222"``)."""
+
+    return re.sub(r"[^0-9A-Za-z]", "", str(valor or "")).upper()
 
 
 # ==========
@@ -23,6 +33,8 @@ class Club(models.Model):
 class Liga(models.Model):
     nombre = models.CharField(max_length=120)
     temporada = models.CharField(max_length=20)  # ej: "2025"
+    # Fixture, resultados, eventos y tablas movidos a LigaArchivada (ver ligas/archivo.py)
+    archivada = models.BooleanField(default=False, editable=False)
 
     class Meta:
         unique_together = ("nombre", "temporada")
@@ -105,6 +117,8 @@ class Jugador(models.Model):
     apellido = models.CharField(max_length=120)
     nombre = models.CharField(max_length=120)
     dni = models.CharField(max_length=20, blank=True)
+    # Clave de búsqueda exacta: el mismo DNI en varios equipos es la misma persona
+    dni_normalizado = models.CharField(max_length=20, blank=True, editable=False, db_index=True)
     fecha_nac = models.DateField(null=True, blank=True)
 
     class Meta:
@@ -115,10 +129,19 @@ class Jugador(models.Model):
     def __str__(self) -> str:
         return f"{self.apellido}, {self.nombre} - {self.equipo}"
 
+    def save(self, *args, **kwargs):
+        self.dni_normalizado = normalizar_dni(self.dni)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "dni" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "dni_normalizado"}
+        super().save(*args, **kwargs)
+
 
 class Arbitro(models.Model):
     apellido = models.CharField(max_length=120)
     nombre = models.CharField(max_length=120)
+    activo = models.BooleanField(default=True)
+    max_partidos_por_dia = models.PositiveSmallIntegerField(default=3)
 
     class Meta:
         ordering = ["apellido", "nombre"]
@@ -129,6 +152,21 @@ class Arbitro(models.Model):
         return f"{self.apellido}, {self.nombre}"
 
 
+class IndisponibilidadArbitro(models.Model):
+    # Días en los que el árbitro avisó que no puede dirigir
+    arbitro = models.ForeignKey(Arbitro, on_delete=models.CASCADE, related_name="indisponibilidades")
+    fecha = models.DateField()
+
+    class Meta:
+        unique_together = ("arbitro", "fecha")
+        ordering = ["fecha", "arbitro__apellido"]
+        verbose_name = "Indisponibilidad de árbitro"
+        verbose_name_plural = "Indisponibilidades de árbitros"
+
+    def __str__(self) -> str:
+        return f"{self.arbitro} - {self.fecha:%d/%m/%Y}"
+
+
 # =================
 # FIXTURE / FECHAS
 # =================
@@ -295,6 +333,65 @@ class ReglaPuntos(models.Model):
         return f"Reglas {self.categoria}"
 
 
+# ======================
+# ESTADÍSTICAS DE JUGADORES
+# ======================
+
+class EstadisticaJugador(models.Model):
+    # "Materializada" a partir de EventoPartido (ver ligas/estadisticas.py)
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name="estadisticas")
+    jugador = models.ForeignKey(Jugador, on_delete=models.CASCADE, related_name="estadisticas")
+    goles = models.PositiveIntegerField(default=0)
+    amarillas = models.PositiveIntegerField(default=0)
+    rojas = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("categoria", "jugador")
+        ordering = ["-goles", "jugador__apellido", "jugador__nombre"]
+        indexes = [
+            models.Index(fields=["categoria", "-goles"], name="estad_goleadores_idx"),
+            models.Index(fields=["categoria", "-rojas", "-amarillas"], name="estad_disciplina_idx"),
+        ]
+        verbose_name = "Estadística de jugador"
+        verbose_name_plural = "Estadísticas de jugadores"
+
+    def __str__(self) -> str:
+        return f"{self.jugador} ({self.goles} goles)"
+
+
+class DisciplinaJugador(models.Model):
+    # Acumulado de tarjetas por jugador y torneo (ver ligas/suspensiones.py)
+    jugador = models.ForeignKey(Jugador, on_delete=models.CASCADE, related_name="disciplina")
+    torneo = models.ForeignKey(Torneo, on_delete=models.CASCADE, related_name="disciplina")
+    amarillas = models.PositiveIntegerField(default=0)
+    rojas = models.PositiveIntegerField(default=0)
+    fechas_pendientes = models.PositiveIntegerField(default=0)  # suspensiones sin fecha disponible aún
+
+    class Meta:
+        unique_together = ("jugador", "torneo")
+        ordering = ["torneo", "jugador__apellido", "jugador__nombre"]
+        verbose_name = "Disciplina de jugador"
+        verbose_name_plural = "Disciplina de jugadores"
+
+    def __str__(self) -> str:
+        return f"{self.jugador} - {self.torneo}: {self.amarillas} TA / {self.rojas} TR"
+
+
+class Suspension(models.Model):
+    jugador = models.ForeignKey(Jugador, on_delete=models.CASCADE, related_name="suspensiones")
+    fecha = models.ForeignKey(Fecha, on_delete=models.CASCADE, related_name="suspensiones")
+    motivo = models.CharField(max_length=3, choices=EventoPartido.TIPOS)
+
+    class Meta:
+        unique_together = ("fecha", "jugador")
+        ordering = ["fecha", "jugador__apellido", "jugador__nombre"]
+        verbose_name = "Suspensión"
+        verbose_name_plural = "Suspensiones"
+
+    def __str__(self) -> str:
+        return f"{self.jugador} suspendido en {self.fecha}"
+
+
 # ======================
 # TABLA DE POSICIONES
 # ======================
@@ -325,6 +422,90 @@ class TablaPosicion(models.Model):
         return f"{self.categoria} - {self.equipo} ({self.puntos} pts)"
 
 
+class PosicionesFecha(models.Model):
+    # Foto inmutable de la tabla de una categoría al cerrar una fecha del fixture
+    torneo = models.ForeignKey(Torneo, on_delete=models.CASCADE, related_name="posiciones_fecha")
+    ronda = models.PositiveSmallIntegerField(choices=PartidoFixture.RONDA_CHOICES)
+    fecha_nro = models.PositiveIntegerField()
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name="posiciones_fecha")
+    filas = models.JSONField(default=list)  # [club_id, puntos, pj, pg, pe, pp, gf, gc] en orden de tabla
+    creada = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("torneo", "ronda", "fecha_nro", "categoria")
+        ordering = ["torneo", "categoria", "ronda", "fecha_nro"]
+        verbose_name = "Posiciones por fecha"
+        verbose_name_plural = "Posiciones por fecha"
+
+    def __str__(self) -> str:
+        return f"{self.torneo} - {self.categoria.nombre}: ronda {self.ronda}, fecha {self.fecha_nro}"
+
+
+# ======================
+# ARCHIVO DE TEMPORADAS
+# ======================
+
+class LigaArchivada(models.Model):
+    # Snapshot JSON comprimido (zlib) de los datos de juego de una liga terminada
+    liga = models.OneToOneField(Liga, on_delete=models.CASCADE, related_name="archivo")
+    creada = models.DateTimeField(auto_now_add=True)
+    formato = models.PositiveSmallIntegerField(default=1)
+    resumen = models.JSONField(default=dict)  # filas archivadas por tabla
+    datos = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Liga archivada"
+        verbose_name_plural = "Ligas archivadas"
+
+    def __str__(self) -> str:
+        return f"Archivo de {self.liga}"
+
+
+# ======================
+# TRABAJOS EN SEGUNDO PLANO
+# ======================
+
+class Trabajo(models.Model):
+    # Cola de tareas largas; la procesa `manage.py procesar_trabajos` (ver ligas.trabajos)
+    PENDIENTE = "pendiente"
+    EN_CURSO = "en_curso"
+    TERMINADO = "terminado"
+    ERROR = "error"
+    ESTADOS = (
+        (PENDIENTE, "Pendiente"),
+        (EN_CURSO, "En curso"),
+        (TERMINADO, "Terminado"),
+        (ERROR, "Error"),
+    )
+
+    tipo = models.CharField(max_length=60)
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default=PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    progreso = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    mensaje = models.CharField(max_length=255, blank=True)  # texto para el usuario
+    resultado = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)  # traceback del último intento fallido
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    worker = models.CharField(max_length=120, blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    disponible_desde = models.DateTimeField(default=timezone.now)  # los reintentos esperan
+    iniciado = models.DateTimeField(null=True, blank=True)
+    latido = models.DateTimeField(null=True, blank=True)  # último aviso del worker que lo corre
+    terminado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-creado"]
+        indexes = [models.Index(fields=["estado", "disponible_desde"], name="trabajo_cola_idx")]
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.tipo} ({self.get_estado_display()})"
+
+
 # ======================
 # CONFIGURACIÓN / IDENTIDAD
 # ======================
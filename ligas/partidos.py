@@ -0,0 +1,155 @@
+"""Expansion of the club-level fixture into per-categoria ``Partido`` rows."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import (
+    Categoria,
+    DisciplinaJugador,
+    Equipo,
+    EventoPartido,
+    Fecha,
+    Partido,
+    PartidoFixture,
+    Ronda,
+    Torneo,
+)
+from .suspensiones import programar_recalculo
+
+RONDA_NOMBRES = dict(PartidoFixture.RONDA_CHOICES)
+
+PartidoKey = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class MaterializacionResultado:
+    """Summary of a :func:`materialize_partidos` run."""
+
+    fechas_creadas: int
+    partidos_creados: int
+    partidos_eliminados: int
+    sin_equipo: int
+
+
+def _ronda_ids(torneo: Torneo, numeros) -> Dict[int, int]:
+    """Map each fixture round number to the ``Ronda`` that holds its fechas."""
+
+    ronda_ids: Dict[int, int] = {}
+    for numero in sorted(numeros):
+        ronda, _ = Ronda.objects.get_or_create(torneo=torneo, nombre=RONDA_NOMBRES[numero])
+        ronda_ids[numero] = ronda.id
+    return ronda_ids
+
+
+def _fecha_ids(ronda_ids) -> Dict[Tuple[int, int], int]:
+    fechas = Fecha.objects.filter(ronda_id__in=ronda_ids).order_by()
+    return {
+        (ronda_id, numero): fecha_id
+        for fecha_id, ronda_id, numero in fechas.values_list("id", "ronda_id", "numero")
+    }
+
+
+def materialize_partidos(torneo: Torneo, *, batch_size: int = 1000) -> MaterializacionResultado:
+    """Create the ``Fecha`` and per-categoria ``Partido`` rows for ``torneo``.
+
+    Every ``PartidoFixture`` is expanded into one ``Partido`` per active
+    categoria of the liga, resolving both ``Equipo`` rows from a single
+    prefetched ``(club, categoria)`` map. Only missing rows are inserted, in
+    batches, so re-running after a fixture change is idempotent and
+    incremental. ``Partido`` rows no longer backed by the fixture are removed
+    as long as they were not played and have no events; crossings where one of
+    the clubs has no equipo in a categoria are skipped and counted.
+    """
+
+    with transaction.atomic():
+        fixture = list(
+            PartidoFixture.objects.filter(torneo=torneo)
+            .order_by("ronda", "fecha_nro", "id")
+            .values_list("ronda", "fecha_nro", "club_local_id", "club_visitante_id")
+        )
+        categoria_ids = list(
+            Categoria.objects.filter(liga_id=torneo.liga_id, activa=True)
+            .order_by("nombre")
+            .values_list("id", flat=True)
+        )
+        equipos = {
+            (club_id, categoria_id): equipo_id
+            for equipo_id, club_id, categoria_id in Equipo.objects.filter(
+                categoria__liga_id=torneo.liga_id
+            ).order_by().values_list("id", "club_id", "categoria_id")
+        }
+
+        ronda_ids = _ronda_ids(torneo, {ronda for ronda, *_ in fixture})
+        fecha_ids = _fecha_ids(ronda_ids.values())
+        necesarias = sorted({(ronda_ids[ronda], fecha_nro) for ronda, fecha_nro, *_ in fixture})
+        nuevas = [
+            Fecha(ronda_id=ronda_id, numero=numero)
+            for ronda_id, numero in necesarias
+            if (ronda_id, numero) not in fecha_ids
+        ]
+        if nuevas:
+            Fecha.objects.bulk_create(nuevas, batch_size=batch_size, ignore_conflicts=True)
+            fecha_ids = _fecha_ids(ronda_ids.values())
+
+        deseados: List[PartidoKey] = []
+        sin_equipo = 0
+        for ronda, fecha_nro, local_id, visitante_id in fixture:
+            fecha_id = fecha_ids[(ronda_ids[ronda], fecha_nro)]
+            for categoria_id in categoria_ids:
+                local = equipos.get((local_id, categoria_id))
+                visitante = equipos.get((visitante_id, categoria_id))
+                if local is None or visitante is None:
+                    sin_equipo += 1
+                    continue
+                deseados.append((fecha_id, categoria_id, local, visitante))
+
+        existentes = {
+            (fecha_id, categoria_id, local_id, visitante_id): partido_id
+            for partido_id, fecha_id, categoria_id, local_id, visitante_id in Partido.objects.filter(
+                fecha_ref__ronda__torneo=torneo
+            ).order_by().values_list("id", "fecha_ref_id", "categoria_id", "local_id", "visitante_id")
+        }
+
+        a_crear = [
+            Partido(fecha_ref_id=fecha_id, categoria_id=categoria_id, local_id=local, visitante_id=visitante)
+            for fecha_id, categoria_id, local, visitante in deseados
+            if (fecha_id, categoria_id, local, visitante) not in existentes
+        ]
+        if a_crear:
+            Partido.objects.bulk_create(a_crear, batch_size=batch_size)
+
+        deseados_set = set(deseados)
+        obsoletos = [partido_id for key, partido_id in existentes.items() if key not in deseados_set]
+        eliminados = 0
+        if obsoletos:
+            _, por_modelo = (
+                Partido.objects.filter(pk__in=obsoletos, jugado=False)
+                .exclude(Exists(EventoPartido.objects.filter(partido=OuterRef("pk"))))
+                .delete()
+            )
+            eliminados = por_modelo.get(Partido._meta.label, 0)
+
+        if nuevas:
+            # Suspensiones que esperaban fechas futuras
+            for jugador_id in DisciplinaJugador.objects.filter(
+                torneo=torneo, fechas_pendientes__gt=0
+            ).values_list("jugador_id", flat=True):
+                programar_recalculo(jugador_id, torneo.pk)
+
+    return MaterializacionResultado(
+        fechas_creadas=len(nuevas),
+        partidos_creados=len(a_crear),
+        partidos_eliminados=eliminados,
+        sin_equipo=sin_equipo,
+    )
+
+
+__all__ = [
+    "MaterializacionResultado",
+    "materialize_partidos",
+]
@@ -0,0 +1,69 @@
+"""Authentication backend that keeps each user's permission set in the cache.
+
+``ModelBackend`` resolves permissions with two joins (user and group
+permissions) the first time ``has_perm`` runs in every request; the admin
+sidebar and the views of the panel trigger it on every page. This backend
+stores the resulting set in the shared cache under a key that embeds a
+per-user and a global version counter (see :mod:`ligas.versioning`), so most
+requests answer ``has_perm`` without touching the auth tables.
+
+A bump is only visible to the processes that share the cache. With the
+per-process ``locmem`` backend another worker would keep a revoked permission
+until its copy expires, so ``LIGAS_PERMISOS_TIMEOUT`` (see ``config.settings``)
+is a few seconds there and an hour with ``file`` or ``redis``.
+
+The counters are bumped by the handlers in ``ligas.signals``: changes to a
+user's groups, direct permissions or flags bump that user; changes to groups,
+group permissions or the permission table itself bump the global counter.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .versioning import bump_version, get_version
+
+AMBITO = "permisos"
+# Sin cache compartida (ver config.settings) no se puede confiar en el bump más de unos segundos
+TIMEOUT_LOCAL = 10
+
+
+def clave_permisos(user_id: int) -> str:
+    return f"ligas:permisos:{get_version(AMBITO)}:{user_id}.{get_version(AMBITO, user_id)}"
+
+
+def bump_usuario(user_id: Optional[int]) -> None:
+    if user_id is not None:
+        bump_version(AMBITO, user_id)
+
+
+def bump_permisos() -> None:
+    bump_version(AMBITO)
+
+
+class PermisosCacheadosBackend(ModelBackend):
+    """``ModelBackend`` whose permission snapshot survives between requests."""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key = clave_permisos(user_obj.pk)
+            permisos = cache.get(key)
+            if permisos is None:
+                permisos = super().get_all_permissions(user_obj)
+                cache.set(key, frozenset(permisos), getattr(settings, "LIGAS_PERMISOS_TIMEOUT", TIMEOUT_LOCAL))
+            user_obj._perm_cache = set(permisos)
+        return user_obj._perm_cache
+
+
+__all__ = [
+    "PermisosCacheadosBackend",
+    "bump_permisos",
+    "bump_usuario",
+    "clave_permisos",
+]
@@ -0,0 +1,385 @@
+"""Standings snapshots per fixture fecha.
+
+"What was the table after fecha 7?" used to mean replaying every result up to
+that fecha, once per point of a position-evolution chart. Instead, one
+``PosicionesFecha`` row per categoria is written each time a fecha of the
+fixture is complete (every match has results for every categoria). It holds
+the compact table at that point: ``[club_id, puntos, pj, pg, pe, pp, gf, gc]``
+rows, already sorted.
+
+Every categoria is scored with its ``ReglaPuntos`` (3/1/0 without one). With
+``diferencia_maxima_goles`` the winner's goals are trimmed so the difference
+does not exceed the cap. A ``WO`` event on the categoria's ``Partido`` marks
+its ``equipo`` as the side that did not show up: that result scores the
+walkover points instead of the regular ones.
+
+Rows are immutable in practice. When a result changes, the season is replayed
+once, from the first fecha, and only the snapshots from the affected fecha on
+are rewritten. :func:`programar_posiciones` collapses all the result changes of
+one transaction into a single rebuild per torneo, run after commit: one read
+query and one bulk write, cheap enough to stay in the request.
+
+:func:`calcular_tablas` and :func:`guardar_tablas` rebuild the materialized
+``TablaPosicion`` of whole categorias from the same results. The first only
+reads, so ``manage.py rebuild_posiciones`` can run it in parallel shards.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import (
+    Categoria,
+    Equipo,
+    EventoPartido,
+    PartidoFixture,
+    PosicionesFecha,
+    ReglaPuntos,
+    ResultadoCategoriaPartido,
+    TablaPosicion,
+    Torneo,
+)
+from .purga import borrar_directo
+from .versioning import bump_liga, bump_torneo, invalidar
+
+COLUMNAS = ("club_id", "puntos", "pj", "pg", "pe", "pp", "gf", "gc")
+CAMPOS_TABLA = ("equipo_id",) + COLUMNAS[1:]
+# victoria, empate, derrota, walkover ganador y perdedor, tope de diferencia (0 = sin tope)
+REGLA_POR_DEFECTO = (3, 1, 0, 3, 0, 0)
+CAMPOS_REGLA = (
+    "puntos_victoria",
+    "puntos_empate",
+    "puntos_derrota",
+    "puntos_walkover_ganador",
+    "puntos_walkover_perdedor",
+    "diferencia_maxima_goles",
+)
+RONDA_POR_NOMBRE = {nombre: numero for numero, nombre in PartidoFixture.RONDA_CHOICES}
+
+ClaveFecha = Tuple[int, int]  # (ronda, fecha_nro)
+ClaveWalkover = Tuple[int, int, int, int, int]  # (torneo, ronda, fecha_nro, categoria, club que no se presentó)
+
+def _orden(fila: List[int]) -> tuple:
+    # Mismo criterio que TablaPosicion.Meta.ordering; el club desempata para que sea estable
+    _, puntos, _, pg, _, _, gf, gc = fila
+    return (-puntos, -pg, gc, -gf, fila[0])
+
+
+class Acumulador:
+    """Running per-club standings of one categoria under its ``ReglaPuntos``."""
+
+    def __init__(
+        self,
+        victoria: int,
+        empate: int,
+        derrota: int,
+        walkover_ganador: int = 3,
+        walkover_perdedor: int = 0,
+        tope_diferencia: int = 0,
+    ) -> None:
+        self.puntos = (victoria, empate, derrota)
+        self.walkover = (walkover_ganador, walkover_perdedor)
+        self.tope_diferencia = tope_diferencia
+        self.clubes: Dict[int, List[int]] = {}
+
+    def _fila(self, club_id: int) -> List[int]:
+        return self.clubes.setdefault(club_id, [club_id, 0, 0, 0, 0, 0, 0, 0])
+
+    def sumar(
+        self,
+        local_id: int,
+        visitante_id: int,
+        goles_local: int,
+        goles_visitante: int,
+        walkover: Optional[int] = None,
+    ) -> None:
+        """Add one result; ``walkover`` is the club that lost it by not showing up."""
+
+        tope = self.tope_diferencia
+        if tope and abs(goles_local - goles_visitante) > tope:
+            if goles_local > goles_visitante:
+                goles_local = goles_visitante + tope
+            else:
+                goles_visitante = goles_local + tope
+        victoria, empate, derrota = self.puntos
+        for club_id, favor, contra in (
+            (local_id, goles_local, goles_visitante),
+            (visitante_id, goles_visitante, goles_local),
+        ):
+            fila = self._fila(club_id)
+            fila[2] += 1
+            fila[6] += favor
+            fila[7] += contra
+            if walkover is not None:
+                ganador, perdedor = self.walkover
+                if club_id == walkover:
+                    fila[1] += perdedor
+                    fila[5] += 1
+                else:
+                    fila[1] += ganador
+                    fila[3] += 1
+            elif favor > contra:
+                fila[1] += victoria
+                fila[3] += 1
+            elif favor == contra:
+                fila[1] += empate
+                fila[4] += 1
+            else:
+                fila[1] += derrota
+                fila[5] += 1
+
+    def tabla(self) -> List[List[int]]:
+        return sorted((list(fila) for fila in self.clubes.values()), key=_orden)
+
+
+def acumuladores(categoria_ids: Iterable[int]) -> Dict[int, Acumulador]:
+    """One :class:`Acumulador` per categoria, with its ``ReglaPuntos`` (3/1/0 if it has none)."""
+
+    categoria_ids = list(categoria_ids)
+    reglas = {
+        categoria_id: regla
+        for categoria_id, *regla in ReglaPuntos.objects.filter(categoria_id__in=categoria_ids).values_list(
+            "categoria_id", *CAMPOS_REGLA
+        )
+    }
+    return {
+        categoria_id: Acumulador(*reglas.get(categoria_id, REGLA_POR_DEFECTO)) for categoria_id in categoria_ids
+    }
+
+
+def walkovers(**filtros) -> set[ClaveWalkover]:
+    """Results lost by walkover, from the ``WO`` events matching ``filtros``."""
+
+    return {
+        (torneo_id, RONDA_POR_NOMBRE.get(ronda), fecha_nro, categoria_id, club_id)
+        for torneo_id, ronda, fecha_nro, categoria_id, club_id in EventoPartido.objects.filter(
+            tipo=EventoPartido.WO, equipo__isnull=False, **filtros
+        )
+        .order_by()
+        .values_list(
+            "partido__fecha_ref__ronda__torneo_id",
+            "partido__fecha_ref__ronda__nombre",
+            "partido__fecha_ref__numero",
+            "partido__categoria_id",
+            "equipo__club_id",
+        )
+    }
+
+
+def _perdedor_walkover(
+    walkover: set[ClaveWalkover], torneo_id: int, ronda: int, fecha_nro: int, categoria_id: int, *clubes: int
+) -> Optional[int]:
+    return next((club_id for club_id in clubes if (torneo_id, ronda, fecha_nro, categoria_id, club_id) in walkover), None)
+
+
+def fechas_completas(torneo_id: int) -> List[ClaveFecha]:
+    """Fechas of the fixture whose matches are all played, in order."""
+
+    completas: Dict[ClaveFecha, bool] = {}
+    for ronda, fecha_nro, jugado in (
+        PartidoFixture.objects.filter(torneo_id=torneo_id).order_by().values_list("ronda", "fecha_nro", "jugado")
+    ):
+        completas[(ronda, fecha_nro)] = completas.get((ronda, fecha_nro), True) and jugado
+    return sorted(fecha for fecha, completa in completas.items() if completa)
+
+
+def actualizar_posiciones(torneo_id: int, desde: Optional[ClaveFecha] = None) -> int:
+    """Rewrite the snapshots of ``torneo_id`` from fecha ``desde`` on; return the rows written.
+
+    The whole season is read in one query and replayed in memory, so the cost
+    does not depend on how many fechas are rewritten.
+    """
+
+    desde = desde or (0, 0)
+    completas = [fecha for fecha in fechas_completas(torneo_id) if fecha >= desde]
+    resultados = (
+        ResultadoCategoriaPartido.objects.filter(partido__torneo_id=torneo_id)
+        .order_by("partido__ronda", "partido__fecha_nro")
+        .values_list(
+            "partido__ronda",
+            "partido__fecha_nro",
+            "categoria_id",
+            "partido__club_local_id",
+            "partido__club_visitante_id",
+            "goles_local",
+            "goles_visitante",
+        )
+    )
+    walkover = walkovers(partido__fecha_ref__ronda__torneo_id=torneo_id)
+    por_fecha: Dict[ClaveFecha, List[tuple]] = defaultdict(list)
+    for ronda, fecha_nro, categoria_id, local_id, visitante_id, goles_local, goles_visitante in resultados:
+        perdedor = _perdedor_walkover(walkover, torneo_id, ronda, fecha_nro, categoria_id, local_id, visitante_id)
+        por_fecha[(ronda, fecha_nro)].append(
+            (categoria_id, local_id, visitante_id, goles_local, goles_visitante, perdedor)
+        )
+    tablas = acumuladores(sorted({resultado[0] for lista in por_fecha.values() for resultado in lista}))
+
+    snapshots = []
+    pendientes = iter(completas)
+    siguiente = next(pendientes, None)
+    for fecha in sorted(set(por_fecha) | set(completas)):
+        if siguiente is None:
+            break
+        for categoria_id, *resultado in por_fecha.get(fecha, ()):
+            tablas[categoria_id].sumar(*resultado)
+        if fecha == siguiente:
+            snapshots.extend(
+                PosicionesFecha(
+                    torneo_id=torneo_id,
+                    ronda=fecha[0],
+                    fecha_nro=fecha[1],
+                    categoria_id=categoria_id,
+                    filas=tabla.tabla(),
+                )
+                for categoria_id, tabla in tablas.items()
+            )
+            siguiente = next(pendientes, None)
+
+    ronda, fecha_nro = desde
+    with transaction.atomic():
+        # Serializa dos reconstrucciones del mismo torneo (no-op en SQLite)
+        Torneo.objects.select_for_update().filter(pk=torneo_id).exists()
+        PosicionesFecha.objects.filter(
+            Q(ronda__gt=ronda) | Q(ronda=ronda, fecha_nro__gte=fecha_nro), torneo_id=torneo_id
+        ).delete()
+        PosicionesFecha.objects.bulk_create(snapshots, batch_size=500)
+        # Corre en on_commit, después del bump de quien la programó: sin este la ETag ya nueva
+        # quedaría asociada a los snapshots viejos
+        invalidar(bump_torneo, torneo_id)
+    return len(snapshots)
+
+
+class _Reconstruccion:
+    """Rebuild of one torneo shared by the ``on_commit`` callbacks of a transaction."""
+
+    def __init__(self, torneo_id: int, desde: ClaveFecha) -> None:
+        self.torneo_id = torneo_id
+        self.desde = desde
+        self.ejecutada = False
+
+    def ejecutar(self) -> None:
+        if self.ejecutada:  # ya la corrió otro callback de la misma transacción
+            return
+        self.ejecutada = True
+        actualizar_posiciones(self.torneo_id, self.desde)
+
+
+class _EnCola(threading.local):
+    def __init__(self) -> None:
+        # Referencias débiles: sólo los callbacks encolados en on_commit mantienen viva cada
+        # reconstrucción, así que cuando un rollback los descarta la entrada desaparece con ellos
+        self.por_torneo: "weakref.WeakValueDictionary[Tuple[str, int], _Reconstruccion]" = (
+            weakref.WeakValueDictionary()
+        )
+
+
+_en_cola = _EnCola()
+
+
+def programar_posiciones(torneo_id: Optional[int], ronda: int, fecha_nro: int) -> None:
+    """Schedule a rebuild of ``torneo_id`` from ``(ronda, fecha_nro)`` after the transaction commits.
+
+    Calls within one transaction share a single rebuild from the earliest
+    fecha seen. The pending rebuild is only kept alive by its queued
+    callbacks, so a rollback that discards them discards it too.
+    """
+
+    if torneo_id is None:
+        return
+    desde = (ronda, fecha_nro)
+    clave = (transaction.get_connection().alias, torneo_id)
+    reconstruccion = _en_cola.por_torneo.get(clave)
+    if reconstruccion is None or reconstruccion.ejecutada:
+        reconstruccion = _en_cola.por_torneo[clave] = _Reconstruccion(torneo_id, desde)
+    else:
+        reconstruccion.desde = min(reconstruccion.desde, desde)
+    # Un callback por llamada: si se revierte el savepoint de la primera, siguen los de las demás
+    transaction.on_commit(reconstruccion.ejecutar)
+
+
+def desplegar(filas: List[List[int]]) -> List[dict]:
+    """Expand compact snapshot rows into dicts with their ``posicion``."""
+
+    return [{"posicion": posicion, **dict(zip(COLUMNAS, fila))} for posicion, fila in enumerate(filas, start=1)]
+
+
+def calcular_tablas(categoria_ids: Sequence[int]) -> Dict[int, List[tuple]]:
+    """Standings of each categoria from all its fixture results, without writing anything.
+
+    Rows are ``(equipo_id, puntos, pj, pg, pe, pp, gf, gc)``, one per equipo of
+    the categoria (with zeros if it has not played yet). Results of clubs
+    without an equipo in the categoria are left out.
+    """
+
+    tablas = acumuladores(categoria_ids)
+    walkover = walkovers(partido__categoria_id__in=categoria_ids)
+    for torneo_id, ronda, fecha_nro, categoria_id, local_id, visitante_id, goles_local, goles_visitante in (
+        ResultadoCategoriaPartido.objects.filter(categoria_id__in=categoria_ids)
+        .order_by()
+        .values_list(
+            "partido__torneo_id",
+            "partido__ronda",
+            "partido__fecha_nro",
+            "categoria_id",
+            "partido__club_local_id",
+            "partido__club_visitante_id",
+            "goles_local",
+            "goles_visitante",
+        )
+    ):
+        perdedor = _perdedor_walkover(walkover, torneo_id, ronda, fecha_nro, categoria_id, local_id, visitante_id)
+        tablas[categoria_id].sumar(local_id, visitante_id, goles_local, goles_visitante, perdedor)
+
+    equipos: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for equipo_id, club_id, categoria_id in Equipo.objects.filter(categoria_id__in=categoria_ids).values_list(
+        "id", "club_id", "categoria_id"
+    ):
+        equipos[categoria_id][club_id] = equipo_id
+
+    filas = {}
+    for categoria_id, tabla in tablas.items():
+        por_club = {fila[0]: fila for fila in tabla.tabla()}
+        filas[categoria_id] = [
+            (equipo_id, *por_club.get(club_id, (club_id, 0, 0, 0, 0, 0, 0, 0))[1:])
+            for club_id, equipo_id in equipos[categoria_id].items()
+        ]
+    return filas
+
+
+def guardar_tablas(tablas: Dict[int, List[tuple]], *, batch_size: int = 1000) -> int:
+    """Replace the ``TablaPosicion`` rows of the categorias in ``tablas``; return the rows written."""
+
+    categoria_ids = list(tablas)
+    objetos = [
+        TablaPosicion(categoria_id=categoria_id, **dict(zip(CAMPOS_TABLA, fila)))
+        for categoria_id, filas in tablas.items()
+        for fila in filas
+    ]
+    manager = TablaPosicion._base_manager
+    with transaction.atomic():
+        # DELETE directo: con el Collector cada fila dispararía tabla_modificada; se invalida una vez al final
+        borrar_directo(manager.filter(categoria_id__in=categoria_ids))
+        TablaPosicion.objects.bulk_create(objetos, batch_size=batch_size)
+        for liga_id in Categoria.objects.filter(pk__in=categoria_ids).values_list("liga_id", flat=True).distinct():
+            invalidar(bump_liga, liga_id)
+    return len(objetos)
+
+
+__all__ = [
+    "COLUMNAS",
+    "Acumulador",
+    "acumuladores",
+    "actualizar_posiciones",
+    "calcular_tablas",
+    "desplegar",
+    "fechas_completas",
+    "guardar_tablas",
+    "programar_posiciones",
+    "walkovers",
+]
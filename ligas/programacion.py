@@ -0,0 +1,163 @@
+"""Kickoff scheduling for the partidos of a fecha.
+
+Each partido starts from its categoria's usual ``horario`` on the day of the
+fecha. Partidos are played on the field of the local club, so every club gets
+an interval index of the time already taken that day (including partidos of
+other fechas or ligas); when the preferred kickoff overlaps, the partido is
+moved to the first free gap after it.
+"""
+
+from __future__ import annotations
+
+import datetime
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Fecha, Partido, PartidoFixture
+from .partidos import RONDA_NOMBRES
+from .versioning import bump_torneo, invalidar
+
+DURACION_PARTIDO = datetime.timedelta(minutes=60)
+HORARIO_POR_DEFECTO = datetime.time(9, 0)
+
+
+class ProgramacionError(Exception):
+    """Raised when a fecha cannot be scheduled."""
+
+
+@dataclass(frozen=True)
+class ProgramacionResultado:
+    """Summary of :func:`schedule_fecha`."""
+
+    programados: int
+    desplazados: int
+    fixture_actualizados: int
+
+
+class _Cancha:
+    """Sorted, non-overlapping busy intervals of a field with bisect lookups."""
+
+    def __init__(self):
+        self.inicios: List[datetime.datetime] = []
+        self.fines: List[datetime.datetime] = []
+
+    def ocupar(self, inicio: datetime.datetime, fin: datetime.datetime) -> None:
+        idx = bisect_right(self.inicios, inicio)
+        # Fusiona con los intervalos que se solapan para mantener el índice ordenado
+        if idx > 0 and self.fines[idx - 1] >= inicio:
+            idx -= 1
+            inicio = self.inicios[idx]
+            fin = max(fin, self.fines[idx])
+        fin_idx = idx
+        while fin_idx < len(self.inicios) and self.inicios[fin_idx] <= fin:
+            fin = max(fin, self.fines[fin_idx])
+            fin_idx += 1
+        self.inicios[idx:fin_idx] = [inicio]
+        self.fines[idx:fin_idx] = [fin]
+
+    def primer_hueco(self, desde: datetime.datetime, duracion: datetime.timedelta) -> datetime.datetime:
+        idx = bisect_right(self.inicios, desde)
+        if idx > 0 and self.fines[idx - 1] > desde:
+            desde = self.fines[idx - 1]
+        while idx < len(self.inicios) and self.inicios[idx] < desde + duracion:
+            desde = max(desde, self.fines[idx])
+            idx += 1
+        return desde
+
+
+def schedule_fecha(
+    fecha: Fecha,
+    *,
+    duracion: datetime.timedelta = DURACION_PARTIDO,
+    sobrescribir: bool = False,
+) -> ProgramacionResultado:
+    """Fill ``Partido.dia_hora`` for ``fecha`` and the matching ``fecha_programada``.
+
+    Partidos are placed in order of their categoria's ``horario``. Without
+    ``sobrescribir`` partidos already scheduled keep their time and block the
+    field. Every write is a single bulk update; the fixture rows of the fecha
+    get the earliest kickoff of their crossing.
+    """
+
+    if fecha.fecha is None:
+        raise ProgramacionError("La fecha no tiene día asignado.")
+
+    partidos = list(
+        Partido.objects.filter(fecha_ref=fecha)
+        .select_related("categoria", "local", "visitante")
+        .order_by("categoria__nombre", "id")
+    )
+    pendientes = [p for p in partidos if sobrescribir or p.dia_hora is None]
+    if not pendientes:
+        return ProgramacionResultado(programados=0, desplazados=0, fixture_actualizados=0)
+
+    tz = timezone.get_current_timezone()
+    inicio_dia = timezone.make_aware(datetime.datetime.combine(fecha.fecha, datetime.time.min), tz)
+    ocupados = (
+        Partido.objects.filter(
+            dia_hora__gte=inicio_dia - duracion,
+            dia_hora__lt=inicio_dia + datetime.timedelta(days=1),
+            local__club_id__in={p.local.club_id for p in pendientes},
+        )
+        .exclude(pk__in=[p.pk for p in pendientes])
+        .order_by()
+        .values_list("local__club_id", "dia_hora")
+    )
+    canchas: Dict[int, _Cancha] = {}
+    for club_id, dia_hora in ocupados:
+        canchas.setdefault(club_id, _Cancha()).ocupar(dia_hora, dia_hora + duracion)
+
+    pendientes.sort(key=lambda p: p.categoria.horario or HORARIO_POR_DEFECTO)
+    desplazados = 0
+    for partido in pendientes:
+        horario = partido.categoria.horario or HORARIO_POR_DEFECTO
+        deseado = timezone.make_aware(datetime.datetime.combine(fecha.fecha, horario), tz)
+        cancha = canchas.setdefault(partido.local.club_id, _Cancha())
+        inicio = cancha.primer_hueco(deseado, duracion)
+        if inicio != deseado:
+            desplazados += 1
+        cancha.ocupar(inicio, inicio + duracion)
+        partido.dia_hora = inicio
+
+    primeros: Dict[Tuple[int, int], datetime.datetime] = {}
+    for partido in partidos:
+        if partido.dia_hora is None:
+            continue
+        key = (partido.local.club_id, partido.visitante.club_id)
+        if key not in primeros or partido.dia_hora < primeros[key]:
+            primeros[key] = partido.dia_hora
+
+    with transaction.atomic():
+        Partido.objects.bulk_update(pendientes, ["dia_hora"], batch_size=500)
+        fixture: List[PartidoFixture] = []
+        numeros = {nombre: numero for numero, nombre in RONDA_NOMBRES.items()}
+        ronda_nro = numeros.get(fecha.ronda.nombre)
+        if ronda_nro is not None:
+            for partido_fixture in PartidoFixture.objects.filter(
+                torneo_id=fecha.ronda.torneo_id, ronda=ronda_nro, fecha_nro=fecha.numero
+            ).order_by():
+                programada = primeros.get((partido_fixture.club_local_id, partido_fixture.club_visitante_id))
+                if programada is not None and programada != partido_fixture.fecha_programada:
+                    partido_fixture.fecha_programada = programada
+                    fixture.append(partido_fixture)
+            PartidoFixture.objects.bulk_update(fixture, ["fecha_programada"], batch_size=500)
+            if fixture:
+                invalidar(bump_torneo, fecha.ronda.torneo_id)
+
+    return ProgramacionResultado(
+        programados=len(pendientes),
+        desplazados=desplazados,
+        fixture_actualizados=len(fixture),
+    )
+
+
+__all__ = [
+    "DURACION_PARTIDO",
+    "ProgramacionError",
+    "ProgramacionResultado",
+    "schedule_fecha",
+]
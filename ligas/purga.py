@@ -0,0 +1,249 @@
+"""Chunked, bottom-up deletion of a whole liga or torneo.
+
+``Model.delete()`` collects every cascaded row in Python, sends one signal per
+object and deletes everything in one transaction. For a full season that
+means hundreds of thousands of instances in memory, plus the statistics
+handlers undoing every event one by one. It also fails outright on the
+``PROTECT`` foreign keys of ``Equipo``/``Partido``.
+
+The purge walks the dependency tree from the leaves up instead. Every step
+deletes at most ``chunk_size`` rows with a raw ``DELETE ... WHERE id IN
+(...)`` in its own short transaction, and progress is written to the cache
+after each chunk. Signals are not sent: the data being removed is
+self-contained, and the cache version counters are bumped once at the end.
+
+Use :func:`programar_purga` from views (it queues a ``purgar`` job, see
+:mod:`ligas.trabajos`) and :func:`progreso` to poll its state.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model, QuerySet
+
+from .estadisticas import rebuild_estadisticas
+from .models import (
+    Categoria,
+    DisciplinaJugador,
+    Equipo,
+    EstadisticaJugador,
+    EventoPartido,
+    Fecha,
+    Jugador,
+    Liga,
+    LigaArchivada,
+    Partido,
+    PartidoFixture,
+    PosicionesFecha,
+    ReglaPuntos,
+    ResultadoCategoriaPartido,
+    Ronda,
+    Suspension,
+    TablaPosicion,
+    Torneo,
+    Trabajo,
+)
+from .trabajos import encolar
+from .versioning import bump_global, bump_liga, bump_torneo
+
+CHUNK_SIZE = 2000
+PROGRESO_TIMEOUT = 24 * 60 * 60
+TIPOS = ("liga", "torneo")
+
+# (modelo, lookup hasta el torneo): de las hojas hacia arriba
+PASOS_TORNEO: Sequence[Tuple[Type[Model], str]] = (
+    (EventoPartido, "partido__fecha_ref__ronda__torneo"),
+    (Suspension, "fecha__ronda__torneo"),
+    (Partido, "fecha_ref__ronda__torneo"),
+    (Fecha, "ronda__torneo"),
+    (Ronda, "torneo"),
+    (ResultadoCategoriaPartido, "partido__torneo"),
+    (PartidoFixture, "torneo"),
+    (DisciplinaJugador, "torneo"),
+    (PosicionesFecha, "torneo"),
+)
+
+# Lo que cuelga de las categorías, una vez borrados los torneos de la liga
+PASOS_CATEGORIAS: Sequence[Tuple[Type[Model], str]] = (
+    (EventoPartido, "equipo__categoria__liga"),
+    (Partido, "categoria__liga"),
+    (ResultadoCategoriaPartido, "categoria__liga"),
+    (EstadisticaJugador, "jugador__equipo__categoria__liga"),
+    (EstadisticaJugador, "categoria__liga"),
+    (DisciplinaJugador, "jugador__equipo__categoria__liga"),
+    (Suspension, "jugador__equipo__categoria__liga"),
+    (TablaPosicion, "categoria__liga"),
+    (Jugador, "equipo__categoria__liga"),
+    (Equipo, "categoria__liga"),
+    (ReglaPuntos, "categoria__liga"),
+    (Categoria, "liga"),
+    (LigaArchivada, "liga"),
+)
+
+
+class PurgaError(Exception):
+    """Raised for an unknown purge target."""
+
+
+def clave_progreso(tipo: str, pk: int) -> str:
+    return f"ligas:purga:{tipo}:{pk}"
+
+
+def progreso(tipo: str, pk: int) -> Optional[dict]:
+    """Last reported state of the purge of ``tipo``/``pk`` (``None`` if there is none)."""
+
+    return cache.get(clave_progreso(tipo, pk))
+
+
+def _reportar(tipo: str, pk: int, **estado) -> None:
+    cache.set(clave_progreso(tipo, pk), {"tipo": tipo, "id": pk, **estado}, PROGRESO_TIMEOUT)
+
+
+def borrar_directo(queryset: QuerySet) -> int:
+    """Delete ``queryset`` with a single ``DELETE``, without the collector or signals; return the row count."""
+
+    # QuerySet._raw_delete es API privada de Django (probada con 5.2; pyproject fija django<6.0).
+    # Es el único lugar que la usa: revisar aquí al subir de versión.
+    return queryset._raw_delete(queryset.db)
+
+
+def _borrar_en_lotes(queryset: QuerySet, chunk_size: int, al_avanzar: Callable[[int], None]) -> int:
+    modelo = queryset.model
+    manager = modelo._base_manager
+    ids_qs = queryset.order_by().values_list("pk", flat=True)
+    borrados = 0
+    while True:
+        ids = list(ids_qs[:chunk_size])
+        if not ids:
+            return borrados
+        with transaction.atomic(using=manager.db):
+            # DELETE directo: sin Collector ni señales (ver docstring del módulo)
+            borrados += borrar_directo(manager.filter(pk__in=ids))
+        al_avanzar(len(ids))
+
+
+def _pasos(tipo: str, pk: int) -> List[QuerySet]:
+    if tipo == "torneo":
+        pasos = [modelo._base_manager.filter(**{lookup: pk}) for modelo, lookup in PASOS_TORNEO]
+        pasos.append(Torneo._base_manager.filter(pk=pk))
+        return pasos
+    pasos = [modelo._base_manager.filter(**{f"{lookup}__liga": pk}) for modelo, lookup in PASOS_TORNEO]
+    pasos.append(Torneo._base_manager.filter(liga=pk))
+    pasos.extend(modelo._base_manager.filter(**{lookup: pk}) for modelo, lookup in PASOS_CATEGORIAS)
+    pasos.append(Liga._base_manager.filter(pk=pk))
+    return pasos
+
+
+def purgar(
+    tipo: str,
+    pk: int,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    reportar: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """Delete the liga or torneo ``pk`` and everything below it; return the rows deleted.
+
+    ``reportar(borrados, total)`` is called after every chunk.
+    """
+
+    if tipo not in TIPOS:
+        raise PurgaError(f"No se puede purgar '{tipo}'.")
+
+    if tipo == "liga":
+        torneo_ids = list(Torneo.objects.filter(liga_id=pk).values_list("pk", flat=True))
+        liga_id = pk
+    else:
+        torneo_ids = [pk]
+        liga_id = Torneo.objects.filter(pk=pk).values_list("liga_id", flat=True).first()
+
+    pasos = _pasos(tipo, pk)
+    # Los SET_NULL que Django resolvería: eventos de otros partidos que citan jugadores de la liga
+    if tipo == "liga":
+        EventoPartido.objects.filter(jugador__equipo__categoria__liga=pk).update(jugador=None)
+
+    # Cota superior: una fila alcanzable por dos caminos se cuenta dos veces
+    total = sum(queryset.count() for queryset in pasos)
+    inicio = time.monotonic()
+    borrados = 0
+    eventos = 0
+    _reportar(tipo, pk, estado="en_curso", paso="", borrados=0, total=total)
+    try:
+        for queryset in pasos:
+            nombre = str(queryset.model._meta.verbose_name_plural)
+
+            def al_avanzar(cantidad, nombre=nombre):
+                nonlocal borrados
+                borrados += cantidad
+                _reportar(tipo, pk, estado="en_curso", paso=nombre, borrados=borrados, total=total)
+                if reportar is not None:
+                    reportar(borrados, total)
+
+            cantidad = _borrar_en_lotes(queryset, chunk_size, al_avanzar)
+            if queryset.model is EventoPartido:
+                eventos += cantidad
+        if tipo == "torneo" and eventos:
+            # Sin señales, los goles y tarjetas de los eventos borrados siguen sumados
+            rebuild_estadisticas(Categoria.objects.filter(liga_id=liga_id))
+    except Exception as exc:
+        _reportar(tipo, pk, estado="error", paso="", borrados=borrados, total=total, error=str(exc))
+        raise
+    finally:
+        bump_global()
+        bump_liga(liga_id)
+        for torneo_id in torneo_ids:
+            bump_torneo(torneo_id)
+
+    _reportar(
+        tipo, pk, estado="terminada", paso="", borrados=borrados, total=borrados,
+        segundos=round(time.monotonic() - inicio, 2),
+    )
+    return borrados
+
+
+def _purgas_activas():
+    return Trabajo.objects.filter(tipo="purgar", estado__in=(Trabajo.PENDIENTE, Trabajo.EN_CURSO))
+
+
+def purgas_pendientes() -> Dict[str, Set[int]]:
+    """Ids of the ligas and torneos whose purge is queued or running, by ``tipo``."""
+
+    pendientes: Dict[str, Set[int]] = {tipo: set() for tipo in TIPOS}
+    for parametros in _purgas_activas().values_list("parametros", flat=True):
+        if parametros.get("tipo") in pendientes:
+            pendientes[parametros["tipo"]].add(parametros["pk"])
+    return pendientes
+
+
+def programar_purga(tipo: str, pk: int, *, chunk_size: int = CHUNK_SIZE, usuario=None) -> Trabajo:
+    """Queue a ``purgar`` job; workers see it once the current transaction commits.
+
+    If the object already has a purge queued or running, that job is returned
+    instead of queueing a second one.
+    """
+
+    if tipo not in TIPOS:
+        raise PurgaError(f"No se puede purgar '{tipo}'.")
+    modelo = Liga if tipo == "liga" else Torneo
+    with transaction.atomic():
+        # Bloquea la fila: dos POST simultáneos no encolan dos purgas del mismo objeto
+        list(modelo._base_manager.select_for_update().filter(pk=pk).values_list("pk", flat=True))
+        existente = _purgas_activas().filter(parametros__tipo=tipo, parametros__pk=pk).order_by("pk").first()
+        if existente is not None:
+            return existente
+        _reportar(tipo, pk, estado="pendiente", paso="", borrados=0, total=None)
+        return encolar("purgar", usuario=usuario, tipo=tipo, pk=pk, chunk_size=chunk_size)
+
+
+__all__ = [
+    "PurgaError",
+    "borrar_directo",
+    "clave_progreso",
+    "programar_purga",
+    "progreso",
+    "purgar",
+    "purgas_pendientes",
+]
@@ -0,0 +1,204 @@
+"""Signal handlers that keep materialized data in sync with its sources."""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .estadisticas import apply_evento
+from .models import (
+    Categoria,
+    Club,
+    Equipo,
+    EventoPartido,
+    Liga,
+    Partido,
+    PartidoFixture,
+    ReglaPuntos,
+    ResultadoCategoriaPartido,
+    SiteIdentity,
+    TablaPosicion,
+    Torneo,
+)
+from .permisos import bump_permisos, bump_usuario
+from .posiciones import RONDA_POR_NOMBRE, programar_posiciones
+from .suspensiones import TIPOS_DISCIPLINA, programar_recalculo
+from .versioning import bump_global, bump_identidad, bump_liga, bump_torneo, invalidar
+
+
+def _snapshot(evento):
+    """Return ``(jugador_id, categoria_id, tipo, torneo_id)`` for ``evento``."""
+
+    categoria_id, torneo_id = (
+        Partido.objects.filter(pk=evento.partido_id)
+        .values_list("categoria_id", "fecha_ref__ronda__torneo_id")
+        .first()
+    ) or (None, None)
+    return (evento.jugador_id, categoria_id, evento.tipo, torneo_id)
+
+
+def _recalcular_disciplina(snapshot):
+    jugador_id, _, tipo, torneo_id = snapshot
+    if tipo in TIPOS_DISCIPLINA:
+        programar_recalculo(jugador_id, torneo_id)
+
+
+def _recalcular_walkover(evento, *snapshots):
+    # Un WO cambia los puntos del resultado: se rehacen las posiciones desde su fecha
+    if not any(snapshot and snapshot[2] == EventoPartido.WO for snapshot in snapshots):
+        return
+    torneo_id, ronda, numero = (
+        Partido.objects.filter(pk=evento.partido_id)
+        .values_list("fecha_ref__ronda__torneo_id", "fecha_ref__ronda__nombre", "fecha_ref__numero")
+        .first()
+    ) or (None, None, None)
+    programar_posiciones(torneo_id, RONDA_POR_NOMBRE.get(ronda, 0), numero or 0)
+
+
+@receiver(pre_save, sender=EventoPartido)
+def evento_pre_save(sender, instance, raw=False, **kwargs):
+    instance._snapshot_previo = None
+    if raw or instance.pk is None:
+        return
+    instance._snapshot_previo = (
+        EventoPartido.objects.filter(pk=instance.pk)
+        .values_list("jugador_id", "partido__categoria_id", "tipo", "partido__fecha_ref__ronda__torneo_id")
+        .first()
+    )
+
+
+@receiver(post_save, sender=EventoPartido)
+def evento_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previo = getattr(instance, "_snapshot_previo", None)
+    actual = _snapshot(instance)
+    if previo == actual:
+        return
+    if previo is not None:
+        apply_evento(*previo[:3], signo=-1)
+        _recalcular_disciplina(previo)
+    apply_evento(*actual[:3], signo=1)
+    _recalcular_disciplina(actual)
+    _recalcular_walkover(instance, previo, actual)
+
+
+@receiver(pre_delete, sender=EventoPartido)
+def evento_pre_delete(sender, instance, **kwargs):
+    # pre_delete: la fila del partido todavía existe aunque se borre en cascada
+    instance._snapshot_previo = _snapshot(instance)
+    apply_evento(*instance._snapshot_previo[:3], signo=-1)
+    _recalcular_walkover(instance, instance._snapshot_previo)
+
+
+@receiver(post_delete, sender=EventoPartido)
+def evento_post_delete(sender, instance, **kwargs):
+    _recalcular_disciplina(instance._snapshot_previo)
+
+
+@receiver(post_save, sender=Liga)
+@receiver(post_delete, sender=Liga)
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+@receiver(post_save, sender=Torneo)
+@receiver(post_delete, sender=Torneo)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def catalogo_modificado(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar(bump_global)
+
+
+@receiver(post_save, sender=PartidoFixture)
+@receiver(post_delete, sender=PartidoFixture)
+def partido_fixture_modificado(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    invalidar(bump_torneo, instance.torneo_id)
+    if not (created and not instance.jugado):  # un partido nuevo sin jugar no cierra ninguna fecha
+        programar_posiciones(instance.torneo_id, instance.ronda, instance.fecha_nro)
+
+
+@receiver(post_save, sender=ResultadoCategoriaPartido)
+@receiver(post_delete, sender=ResultadoCategoriaPartido)
+def resultado_modificado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    torneo_id, ronda, fecha_nro = (
+        PartidoFixture.objects.filter(pk=instance.partido_id).values_list("torneo_id", "ronda", "fecha_nro").first()
+    ) or (None, None, None)
+    invalidar(bump_torneo, torneo_id)
+    programar_posiciones(torneo_id, ronda, fecha_nro)
+
+
+@receiver(post_save, sender=ReglaPuntos)
+@receiver(post_delete, sender=ReglaPuntos)
+def regla_puntos_modificada(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for torneo_id in Torneo.objects.filter(liga__categorias=instance.categoria_id).values_list("pk", flat=True):
+        programar_posiciones(torneo_id, 0, 0)
+
+
+@receiver(post_save, sender=TablaPosicion)
+@receiver(post_delete, sender=TablaPosicion)
+def tabla_modificada(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    liga_id = Categoria.objects.filter(pk=instance.categoria_id).values_list("liga_id", flat=True).first()
+    invalidar(bump_liga, liga_id)
+
+
+@receiver(post_save, sender=Equipo)
+@receiver(post_delete, sender=Equipo)
+def equipo_modificado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    liga_id = Categoria.objects.filter(pk=instance.categoria_id).values_list("liga_id", flat=True).first()
+    invalidar(bump_liga, liga_id)
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def usuario_modificado(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        # El login actualiza last_login y no cambia permisos
+        return
+    invalidar(bump_usuario, instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def permisos_usuario_modificados(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidar(bump_usuario, instance.pk)
+    elif pk_set is None:
+        # clear() desde el grupo/permiso: no sabemos qué usuarios tenía
+        invalidar(bump_permisos)
+    else:
+        for user_id in pk_set:
+            invalidar(bump_usuario, user_id)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permisos_grupo_modificados(sender, raw=False, action="post_", **kwargs):
+    if raw or not action.startswith("post_"):
+        return
+    invalidar(bump_permisos)
+
+
+@receiver(post_save, sender=SiteIdentity)
+@receiver(post_delete, sender=SiteIdentity)
+def identidad_modificada(sender, raw=False, created=False, **kwargs):
+    # get_solo() crea la fila con los valores por defecto: no cambia nada visible
+    if not raw and not created:
+        invalidar(bump_identidad)
@@ -0,0 +1,115 @@
+"""Card accumulation and pending suspensions per jugador and torneo.
+
+Every card written or removed triggers :func:`recalcular_disciplina` for that
+jugador and torneo only, which replays their own cards (an indexed lookup of a
+handful of rows) and rewrites their ``Suspension`` rows. Team sheets then ask
+for :func:`jugadores_suspendidos` once per fecha and check each player with a
+set membership test.
+
+Rules: every ``AMARILLAS_POR_SUSPENSION`` yellow cards and every red card
+suspend the player for the following fecha(s) of the torneo, served one after
+the other. Suspensions that do not fit in the fechas created so far are kept
+in ``DisciplinaJugador.fechas_pendientes``.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import DisciplinaJugador, EventoPartido, Fecha, Partido, Suspension
+
+AMARILLAS_POR_SUSPENSION = getattr(settings, "LIGAS_AMARILLAS_POR_SUSPENSION", 5)
+FECHAS_POR_ROJA = getattr(settings, "LIGAS_FECHAS_POR_ROJA", 1)
+
+TIPOS_DISCIPLINA = (EventoPartido.TA, EventoPartido.TR)
+
+
+def torneo_de_partido(partido_id: int) -> Optional[int]:
+    return (
+        Partido.objects.filter(pk=partido_id)
+        .values_list("fecha_ref__ronda__torneo_id", flat=True)
+        .first()
+    )
+
+
+def recalcular_disciplina(jugador_id: int, torneo_id: int) -> None:
+    """Rebuild the counters and suspensions of one jugador in one torneo."""
+
+    fechas: List[int] = list(
+        Fecha.objects.filter(ronda__torneo_id=torneo_id)
+        .order_by("ronda_id", "numero")
+        .values_list("id", flat=True)
+    )
+    posicion = {fecha_id: idx for idx, fecha_id in enumerate(fechas)}
+    tarjetas = sorted(
+        (
+            (posicion.get(fecha_id, -1), minuto or 0, evento_id, tipo)
+            for evento_id, tipo, fecha_id, minuto in EventoPartido.objects.filter(
+                jugador_id=jugador_id,
+                tipo__in=TIPOS_DISCIPLINA,
+                partido__fecha_ref__ronda__torneo_id=torneo_id,
+            )
+            .order_by()
+            .values_list("id", "tipo", "partido__fecha_ref_id", "minuto")
+        )
+    )
+
+    amarillas = rojas = pendientes = 0
+    cursor = 0
+    suspensiones: List[Tuple[int, str]] = []
+    for idx_fecha, _, _, tipo in tarjetas:
+        if tipo == EventoPartido.TA:
+            amarillas += 1
+            cantidad = 1 if amarillas % AMARILLAS_POR_SUSPENSION == 0 else 0
+        else:
+            rojas += 1
+            cantidad = FECHAS_POR_ROJA
+        if not cantidad:
+            continue
+        cursor = max(cursor, idx_fecha + 1)
+        for _ in range(cantidad):
+            if cursor < len(fechas):
+                suspensiones.append((fechas[cursor], tipo))
+                cursor += 1
+            else:
+                pendientes += 1
+
+    with transaction.atomic():
+        Suspension.objects.filter(jugador_id=jugador_id, fecha_id__in=fechas).delete()
+        if not tarjetas:
+            DisciplinaJugador.objects.filter(jugador_id=jugador_id, torneo_id=torneo_id).delete()
+            return
+        Suspension.objects.bulk_create(
+            [Suspension(jugador_id=jugador_id, fecha_id=fecha_id, motivo=tipo) for fecha_id, tipo in suspensiones]
+        )
+        DisciplinaJugador.objects.update_or_create(
+            jugador_id=jugador_id,
+            torneo_id=torneo_id,
+            defaults={"amarillas": amarillas, "rojas": rojas, "fechas_pendientes": pendientes},
+        )
+
+
+def programar_recalculo(jugador_id: Optional[int], torneo_id: Optional[int]) -> None:
+    """Recompute after the current transaction commits (cascades finish first)."""
+
+    if jugador_id is None or torneo_id is None:
+        return
+    transaction.on_commit(lambda: recalcular_disciplina(jugador_id, torneo_id))
+
+
+def jugadores_suspendidos(fecha: Fecha) -> Set[int]:
+    """Return the ids of the jugadores suspended for ``fecha``."""
+
+    return set(Suspension.objects.filter(fecha=fecha).values_list("jugador_id", flat=True))
+
+
+__all__ = [
+    "AMARILLAS_POR_SUSPENSION",
+    "FECHAS_POR_ROJA",
+    "jugadores_suspendidos",
+    "programar_recalculo",
+    "recalcular_disciplina",
+]
@@ -0,0 +1,124 @@
+"""Tasks that run through the job queue of :mod:`ligas.trabajos`.
+
+Each one is a thin wrapper: it loads its objects from the JSON parameters,
+calls the service and turns the outcome into a JSON result. Domain errors
+become :class:`~ligas.trabajos.TrabajoError` so they are not retried.
+Imported from ``LigasConfig.ready()`` so that every process knows them.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+from django.core.files.storage import default_storage
+
+from .equipos import generar_equipos
+from .fixture import FixtureAlreadyExists, FixtureGenerationError, generate_fixture, replan_fixture
+from .importacion import ImportacionError, importar_jugadores, leer_archivo
+from .models import Club, Liga, Torneo
+from .partidos import materialize_partidos
+from .purga import CHUNK_SIZE, PurgaError, purgar
+from .trabajos import TrabajoError, avanzar, tarea
+
+# Filas con error guardadas en el resultado de una importación (el resto solo se cuenta)
+ERRORES_IMPORTACION = 200
+
+
+def _clubes(club_ids: List[int]) -> List[Club]:
+    # En el orden pedido: el fixture depende de él
+    por_id = Club.objects.in_bulk(club_ids)
+    return [por_id[club_id] for club_id in club_ids if club_id in por_id]
+
+
+@tarea("purgar")
+def tarea_purgar(trabajo, *, tipo, pk, chunk_size=CHUNK_SIZE):
+    try:
+        borrados = purgar(
+            tipo, pk, chunk_size=chunk_size, reportar=lambda hechos, total: avanzar(trabajo, hechos, total)
+        )
+    except PurgaError as exc:
+        raise TrabajoError(str(exc)) from exc
+    return {"borrados": borrados}
+
+
+@tarea("generar_fixture")
+def tarea_generar_fixture(trabajo, *, torneo_id, club_ids):
+    try:
+        torneo = Torneo.objects.get(pk=torneo_id)
+        creados = generate_fixture(torneo, _clubes(club_ids))
+    except Torneo.DoesNotExist as exc:
+        raise TrabajoError("El torneo ya no existe.") from exc
+    except (FixtureAlreadyExists, FixtureGenerationError) as exc:
+        raise TrabajoError(str(exc)) from exc
+    return {"partidos": len(creados)}
+
+
+@tarea("replanificar_fixture")
+def tarea_replanificar_fixture(trabajo, *, torneo_id, club_ids):
+    try:
+        torneo = Torneo.objects.get(pk=torneo_id)
+        resumen = replan_fixture(torneo, _clubes(club_ids))
+    except Torneo.DoesNotExist as exc:
+        raise TrabajoError("El torneo ya no existe.") from exc
+    except FixtureGenerationError as exc:
+        raise TrabajoError(str(exc)) from exc
+    return {
+        "creados": resumen.creados,
+        "actualizados": resumen.actualizados,
+        "eliminados": resumen.eliminados,
+        "fijos": resumen.fijos,
+    }
+
+
+@tarea("generar_equipos")
+def tarea_generar_equipos(trabajo, *, club_ids, liga_ids):
+    resultado = generar_equipos(_clubes(club_ids), Liga.objects.filter(pk__in=liga_ids))
+    return {
+        "creados": resultado.creados,
+        "existentes": resultado.existentes,
+        "alias_completados": resultado.alias_completados,
+        "ligas_sin_categorias": list(resultado.ligas_sin_categorias),
+    }
+
+
+@tarea("materializar_partidos")
+def tarea_materializar_partidos(trabajo, *, torneo_id):
+    try:
+        torneo = Torneo.objects.get(pk=torneo_id)
+    except Torneo.DoesNotExist as exc:
+        raise TrabajoError("El torneo ya no existe.") from exc
+    resultado = materialize_partidos(torneo)
+    return {
+        "fechas_creadas": resultado.fechas_creadas,
+        "partidos_creados": resultado.partidos_creados,
+        "partidos_eliminados": resultado.partidos_eliminados,
+        "sin_equipo": resultado.sin_equipo,
+    }
+
+
+@tarea("importar_jugadores")
+def tarea_importar_jugadores(trabajo, *, liga_id, ruta):
+    """Import the roster the view saved at ``ruta`` in the default storage, then delete it."""
+
+    # El archivo queda para los reintentos; se borra cuando ya no habrá otro
+    borrar = True
+    try:
+        liga = Liga.objects.get(pk=liga_id)
+        with default_storage.open(ruta, "rb") as stream:
+            resultado = importar_jugadores(liga, leer_archivo(stream, ruta))
+    except Liga.DoesNotExist as exc:
+        raise TrabajoError("La liga ya no existe.") from exc
+    except ImportacionError as exc:
+        raise TrabajoError(str(exc)) from exc
+    except Exception:
+        borrar = trabajo.intentos >= trabajo.max_intentos
+        raise
+    finally:
+        if borrar:
+            default_storage.delete(ruta)
+    return {
+        "creados": resultado.creados,
+        "duplicados": resultado.duplicados,
+        "total_errores": len(resultado.errores),
+        "errores": [{"fila": error.fila, "mensaje": error.mensaje} for error in resultado.errores[:ERRORES_IMPORTACION]],
+    }
@@ -0,0 +1,176 @@
+"""Season rollover: clone a liga into a new temporada.
+
+The copy is set based. Each table is read once with ``values()``, the foreign
+keys are remapped in memory (old categoria/equipo id -> new id) and the rows
+are written with ``bulk_create`` in batches, so the number of queries grows
+with the number of batches, not with the number of categorias, equipos or
+jugadores. New ids are read back with one query per table using the natural
+keys (``(liga, nombre)`` for categorias, ``(club, categoria)`` for equipos),
+which works on every database backend.
+
+Torneos, fixture and results are not copied: they belong to the season that
+was played.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from django.db import transaction
+
+from .models import Categoria, Equipo, Jugador, Liga, ReglaPuntos
+from .versioning import bump_liga, invalidar
+
+
+class TemporadaError(Exception):
+    """Raised when the rollover cannot be done (e.g. the target liga exists)."""
+
+
+@dataclass(frozen=True)
+class ClonacionResultado:
+    """Summary of :func:`clonar_liga`."""
+
+    liga: Liga
+    categorias: int
+    reglas: int
+    equipos: int
+    jugadores: int
+
+
+def _lotes(filas, tamano: int) -> Iterator[List]:
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def clonar_liga(
+    liga: Liga,
+    temporada: str,
+    *,
+    nombre: Optional[str] = None,
+    equipos: bool = True,
+    jugadores: bool = False,
+    atomic: bool = True,
+    batch_size: int = 1000,
+) -> ClonacionResultado:
+    """Copy ``liga`` with its categorias, reglas de puntos and (optionally) equipos and rosters.
+
+    With ``atomic=False`` each table is committed as it is copied, which keeps
+    transactions short on very large rosters at the cost of leaving a partial
+    liga behind if the process is interrupted.
+    """
+
+    nombre = nombre or liga.nombre
+    if Liga.objects.filter(nombre=nombre, temporada=temporada).exists():
+        raise TemporadaError(f"Ya existe la liga {nombre} {temporada}.")
+    if jugadores and not equipos:
+        raise TemporadaError("Para copiar los planteles hay que copiar también los equipos.")
+
+    with transaction.atomic() if atomic else contextlib.nullcontext():
+        nueva = Liga.objects.create(nombre=nombre, temporada=temporada)
+
+        categorias_origen = list(
+            Categoria.objects.filter(liga=liga).values("id", "nombre", "horario", "activa", "suma_puntos_general")
+        )
+        Categoria.objects.bulk_create(
+            [
+                Categoria(
+                    liga=nueva,
+                    nombre=fila["nombre"],
+                    horario=fila["horario"],
+                    activa=fila["activa"],
+                    suma_puntos_general=fila["suma_puntos_general"],
+                )
+                for fila in categorias_origen
+            ],
+            batch_size=batch_size,
+        )
+        nuevas_por_nombre = dict(Categoria.objects.filter(liga=nueva).values_list("nombre", "id"))
+        categoria_map: Dict[int, int] = {fila["id"]: nuevas_por_nombre[fila["nombre"]] for fila in categorias_origen}
+
+        reglas = [
+            ReglaPuntos(**{**fila, "categoria_id": categoria_map[fila["categoria_id"]]})
+            for fila in ReglaPuntos.objects.filter(categoria__liga=liga).values(
+                "categoria_id",
+                "puntos_victoria",
+                "puntos_empate",
+                "puntos_derrota",
+                "puntos_walkover_ganador",
+                "puntos_walkover_perdedor",
+                "diferencia_maxima_goles",
+            )
+        ]
+        ReglaPuntos.objects.bulk_create(reglas, batch_size=batch_size)
+
+        total_equipos = 0
+        total_jugadores = 0
+        if equipos:
+            equipos_origen = list(
+                Equipo.objects.filter(categoria__liga=liga).values_list("id", "club_id", "categoria_id", "alias")
+            )
+            for lote in _lotes(equipos_origen, batch_size):
+                Equipo.objects.bulk_create(
+                    [
+                        Equipo(club_id=club_id, categoria_id=categoria_map[categoria_id], alias=alias)
+                        for _, club_id, categoria_id, alias in lote
+                    ]
+                )
+            total_equipos = len(equipos_origen)
+
+            if jugadores:
+                nuevos_por_clave = {
+                    (club_id, categoria_id): equipo_id
+                    for equipo_id, club_id, categoria_id in Equipo.objects.filter(categoria__liga=nueva).values_list(
+                        "id", "club_id", "categoria_id"
+                    )
+                }
+                equipo_map = {
+                    equipo_id: nuevos_por_clave[(club_id, categoria_map[categoria_id])]
+                    for equipo_id, club_id, categoria_id, _ in equipos_origen
+                }
+                plantel = (
+                    Jugador.objects.filter(equipo__categoria__liga=liga)
+                    .order_by("pk")
+                    .values_list("equipo_id", "apellido", "nombre", "dni", "dni_normalizado", "fecha_nac")
+                    .iterator(chunk_size=batch_size)
+                )
+                for lote in _lotes(plantel, batch_size):
+                    # bulk_create no pasa por save(): dni_normalizado se copia tal cual
+                    Jugador.objects.bulk_create(
+                        [
+                            Jugador(
+                                equipo_id=equipo_map[equipo_id],
+                                apellido=apellido,
+                                nombre=nombre_jugador,
+                                dni=dni,
+                                dni_normalizado=dni_normalizado,
+                                fecha_nac=fecha_nac,
+                            )
+                            for equipo_id, apellido, nombre_jugador, dni, dni_normalizado, fecha_nac in lote
+                        ]
+                    )
+                    total_jugadores += len(lote)
+
+        invalidar(bump_liga, nueva.pk)
+
+    return ClonacionResultado(
+        liga=nueva,
+        categorias=len(categorias_origen),
+        reglas=len(reglas),
+        equipos=total_equipos,
+        jugadores=total_jugadores,
+    )
+
+
+__all__ = [
+    "ClonacionResultado",
+    "TemporadaError",
+    "clonar_liga",
+]
@@ -1,23 +1,71 @@
+import datetime
+import io
+import json
+import os
+import runpy
+import shutil
+import tempfile
 from unittest import mock
 
-from django.contrib.auth.models import Permission, User
+from django.contrib.admin import site as admin_site
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
 from django.db.utils import ProgrammingError
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from .fixture import FixtureAlreadyExists, FixtureGenerationError, generate_fixture
+from .arbitros import ArbitroSlot, PartidoSlot, assign_arbitros, plan_asignaciones
+from .archivo import ArchivoError, archivar_liga, restaurar_liga
+from .equipos import generar_equipos
+from .estadisticas import rebuild_estadisticas, top_goleadores
+from .fixture import FixtureAlreadyExists, FixtureGenerationError, generate_fixture, replan_fixture
 from .forms import ResultadoPartidoFixtureForm
+from . import cache as ligas_cache, live
+from .importacion import ImportacionError, importar_jugadores, leer_csv
+from .partidos import materialize_partidos
+from .programacion import ProgramacionError, schedule_fecha
+from .posiciones import actualizar_posiciones
+from .purga import programar_purga, progreso, purgar
+from .suspensiones import AMARILLAS_POR_SUSPENSION, jugadores_suspendidos
+from .temporadas import clonar_liga
+from .trabajos import ejecutar, encolar, latir, liberar_colgados, tomar
 from .models import (
+    Arbitro,
     Categoria,
     Club,
     Equipo,
+    EstadisticaJugador,
+    EventoPartido,
+    Fecha,
+    IndisponibilidadArbitro,
+    Jugador,
     Liga,
+    LigaArchivada,
+    Partido,
     PartidoFixture,
+    PosicionesFecha,
+    ReglaPuntos,
     ResultadoCategoriaPartido,
+    TablaPosicion,
+    DisciplinaJugador,
+    Ronda,
+    SiteIdentity,
+    Suspension,
     Torneo,
+    Trabajo,
 )
 
 
+@override_settings(LIGAS_TRABAJOS_EAGER=True)
 class EquipoGenerateViewTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -79,6 +127,217 @@ class EquipoGenerateViewTests(TestCase):
         )
 
 
+    def test_generate_many_clubs_and_ligas_in_bulk(self):
+        otra_liga = Liga.objects.create(nombre="Liga Test B", temporada="2024")
+        Categoria.objects.create(liga=otra_liga, nombre="Sub 14")
+        clubes = [self.club] + [Club.objects.create(nombre=f"Club Masivo {i}") for i in range(3)]
+        Equipo.objects.create(club=clubes[1], categoria=self.categoria_a, alias="")
+
+        with self.assertNumQueries(8):
+            resultado = generar_equipos(clubes, [self.liga, otra_liga])
+
+        self.assertEqual((resultado.creados, resultado.existentes, resultado.alias_completados), (11, 1, 1))
+        self.assertEqual(Equipo.objects.filter(club__in=clubes).count(), 12)
+        self.assertEqual(
+            Equipo.objects.get(club=clubes[1], categoria=self.categoria_a).alias,
+            f"{clubes[1].nombre} - {self.categoria_a.nombre}",
+        )
+
+        response = self.client.post(
+            reverse("ligas:equipo_generate"),
+            {"club": [c.id for c in clubes], "liga": [self.liga.id, otra_liga.id]},
+        )
+        self.assertRedirects(response, reverse("ligas:equipo_list"), fetch_redirect_response=False)
+        self.assertEqual(Equipo.objects.filter(club__in=clubes).count(), 12)
+
+    def test_generate_counts_only_rows_actually_inserted(self):
+        clubes = [self.club, Club.objects.create(nombre="Club Concurrente")]
+        bulk_create = Equipo.objects.bulk_create
+
+        def con_conflicto(objetos, **kwargs):
+            # La base omite una fila por conflicto: ignore_conflicts no lo informa
+            return bulk_create(objetos[1:], **kwargs)
+
+        with mock.patch.object(Equipo.objects, "bulk_create", side_effect=con_conflicto):
+            resultado = generar_equipos(clubes, [self.liga])
+
+        self.assertEqual(Equipo.objects.filter(club__in=clubes).count(), 3)
+        self.assertEqual(resultado.creados, 3)
+
+
+class ClonarLigaTests(TestCase):
+    def setUp(self):
+        self.liga = Liga.objects.create(nombre="Liga Rollover", temporada="2025")
+        self.clubes = [Club.objects.create(nombre=f"Rollover {i}") for i in range(3)]
+        for nombre in ("Sub 10", "Sub 12"):
+            categoria = Categoria.objects.create(liga=self.liga, nombre=nombre, horario=datetime.time(10), activa=True)
+            ReglaPuntos.objects.create(categoria=categoria, puntos_victoria=2)
+            for club in self.clubes:
+                equipo = Equipo.objects.create(club=club, categoria=categoria, alias=f"{club.nombre} {nombre}")
+                Jugador.objects.create(equipo=equipo, apellido="Paz", nombre=club.nombre, dni="40.111.222")
+
+    def test_clone_copies_everything_with_remapped_ids(self):
+        with self.assertNumQueries(14):
+            resultado = clonar_liga(self.liga, "2026", jugadores=True)
+
+        nueva = resultado.liga
+        self.assertEqual((resultado.categorias, resultado.reglas, resultado.equipos, resultado.jugadores), (2, 2, 6, 6))
+        categoria = Categoria.objects.get(liga=nueva, nombre="Sub 12")
+        self.assertEqual(categoria.horario, datetime.time(10))
+        self.assertEqual(categoria.regla_puntos.puntos_victoria, 2)
+        equipo = Equipo.objects.get(categoria=categoria, club=self.clubes[1])
+        self.assertEqual(equipo.alias, "Rollover 1 Sub 12")
+        jugador = equipo.jugadores.get()
+        self.assertEqual((jugador.nombre, jugador.dni_normalizado), ("Rollover 1", "40111222"))
+        self.assertEqual(Jugador.objects.filter(equipo__categoria__liga=self.liga).count(), 6)
+
+    def test_command_refuses_existing_target(self):
+        call_command("clonar_liga", self.liga.pk, "2026", "--sin-equipos", stdout=io.StringIO())
+        self.assertEqual(Equipo.objects.filter(categoria__liga__temporada="2026").count(), 0)
+
+        with self.assertRaisesMessage(CommandError, "Ya existe la liga Liga Rollover 2026."):
+            call_command("clonar_liga", self.liga.pk, "2026", stdout=io.StringIO())
+
+
+class ImportacionJugadoresTests(TestCase):
+    def setUp(self):
+        # Antes que los override_settings de cada test: al desactivarse restaura lo que había al activarse
+        media = override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+        media.enable()
+        self.addCleanup(shutil.rmtree, media.options["MEDIA_ROOT"], True)
+        self.addCleanup(media.disable)
+        self.liga = Liga.objects.create(nombre="Liga Import", temporada="2025")
+        self.categoria = Categoria.objects.create(liga=self.liga, nombre="Sub 12")
+        self.club = Club.objects.create(nombre="Club Norte")
+        self.equipo = Equipo.objects.create(club=self.club, categoria=self.categoria)
+        Jugador.objects.create(equipo=self.equipo, apellido="Previo", nombre="Ya", dni="30111222")
+
+    def _csv(self, *lineas):
+        return io.BytesIO(("\n".join(lineas) + "\n").encode("utf-8"))
+
+    def test_import_validates_dedupes_and_batches(self):
+        archivo = self._csv(
+            "Club;Categoría;Apellido;Nombre;DNI;Fecha_nac",
+            "club norte;Sub 12;Gómez;Ana;40.111.222;15/03/2013",
+            "Club Norte;Sub 12;Pérez;Luis;40111333;2013-05-01",
+            "Club Norte;Sub 12;Gómez;Ana;40111222;",
+            "Club Norte;Sub 12;Previo;Ya;30111222;",
+            "Club Sur;Sub 12;Díaz;Juan;40111444;",
+            "Club Norte;Sub 12;Ruiz;Eva;abc;",
+            "Club Norte;Sub 12;Sosa;Mía;40111555;31/02/2013",
+        )
+
+        # Equipos, savepoint, un lote (búsqueda de DNI + insert), release
+        with self.assertNumQueries(5):
+            resultado = importar_jugadores(self.liga, leer_csv(archivo))
+
+        self.assertEqual((resultado.creados, resultado.duplicados), (2, 2))
+        self.assertEqual([error.fila for error in resultado.errores], [6, 7, 8])
+        gomez = Jugador.objects.get(apellido="Gómez")
+        self.assertEqual((gomez.dni, gomez.fecha_nac), ("40111222", datetime.date(2013, 3, 15)))
+
+    def test_missing_columns_raise(self):
+        with self.assertRaises(ImportacionError):
+            importar_jugadores(self.liga, leer_csv(self._csv("apellido,nombre", "A,B")))
+
+    def test_latin1_csv_is_decoded(self):
+        archivo = io.BytesIO("club;categoria;apellido;nombre;dni\nClub Norte;Sub 12;Núñez;José;42111222\n".encode("cp1252"))
+
+        resultado = importar_jugadores(self.liga, leer_csv(archivo))
+
+        self.assertEqual(resultado.creados, 1)
+        self.assertTrue(Jugador.objects.filter(apellido="Núñez", nombre="José").exists())
+
+    def _login_importador(self):
+        user = User.objects.create_user(username="importador", password="testpass123", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="add_jugador"))
+        self.client.login(username="importador", password="testpass123")
+
+    @override_settings(LIGAS_TRABAJOS_EAGER=True)
+    def test_view_rejects_unreadable_files_without_error_500(self):
+        self._login_importador()
+        url = reverse("ligas:jugador_import")
+
+        response = self.client.post(url, {"liga": self.liga.id, "archivo": SimpleUploadedFile("plantel.pdf", b"%PDF")})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["form"].errors["archivo"])
+
+        for nombre, contenido in (
+            ("plantel.xlsx", b"club,categoria,apellido,nombre,dni\n"),  # un CSV renombrado
+            ("plantel.csv", b"club,categoria,apellido,nombre,dni\nClub Norte,Sub 12,A,B,4\x81\x8d\n"),
+        ):
+            with self.assertLogs("ligas.trabajos", "WARNING"):
+                response = self.client.post(
+                    url, {"liga": self.liga.id, "archivo": SimpleUploadedFile(nombre, contenido)}
+                )
+
+            trabajo = Trabajo.objects.filter(tipo="importar_jugadores").latest("pk")
+            self.assertRedirects(response, f"{url}?trabajo={trabajo.pk}", fetch_redirect_response=False)
+            self.assertEqual(trabajo.estado, Trabajo.ERROR, nombre)
+            self.assertTrue(trabajo.mensaje, nombre)
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, "importaciones")), [])
+
+    def test_view_queues_uploaded_file_for_worker(self):
+        self._login_importador()
+        archivo = SimpleUploadedFile(
+            "plantel.csv",
+            b"club,categoria,apellido,nombre,dni\nClub Norte,Sub 12,Luna,Sol,41222333\n",
+            content_type="text/csv",
+        )
+
+        response = self.client.post(reverse("ligas:jugador_import"), {"liga": self.liga.id, "archivo": archivo})
+
+        trabajo = Trabajo.objects.get(tipo="importar_jugadores")
+        estado_url = f"{reverse('ligas:jugador_import')}?trabajo={trabajo.pk}"
+        self.assertRedirects(response, estado_url, fetch_redirect_response=False)
+        self.assertFalse(Jugador.objects.filter(dni="41222333").exists())
+        self.assertEqual(self.client.get(estado_url).context["trabajo"].estado, Trabajo.PENDIENTE)
+
+        ejecutar(tomar("test"))
+
+        self.assertTrue(Jugador.objects.filter(dni="41222333", equipo=self.equipo).exists())
+        self.assertEqual(self.client.get(estado_url).context["resultado"]["creados"], 1)
+        self.assertFalse(default_storage.exists(trabajo.parametros["ruta"]))
+
+
+class RegistroDniTests(TestCase):
+    def setUp(self):
+        liga = Liga.objects.create(nombre="Liga DNI", temporada="2025")
+        categoria_a = Categoria.objects.create(liga=liga, nombre="Sub 12")
+        categoria_b = Categoria.objects.create(liga=liga, nombre="Sub 14")
+        club = Club.objects.create(nombre="Club DNI")
+        self.equipo_a = Equipo.objects.create(club=club, categoria=categoria_a)
+        self.equipo_b = Equipo.objects.create(club=club, categoria=categoria_b)
+        self.jugador = Jugador.objects.create(equipo=self.equipo_a, apellido="Gómez", nombre="Ana", dni="40.111.222")
+        Jugador.objects.create(equipo=self.equipo_b, apellido="Gomez", nombre="Ana", dni="40111222")
+        Jugador.objects.create(equipo=self.equipo_b, apellido="Pérez", nombre="Luis", dni="40111333")
+
+        user = User.objects.create_user(username="registro", password="testpass123", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="view_jugador"))
+        self.client.login(username="registro", password="testpass123")
+
+    def test_save_keeps_normalized_dni(self):
+        self.assertEqual(self.jugador.dni_normalizado, "40111222")
+        self.jugador.dni = "40 111 999"
+        self.jugador.save(update_fields=["dni"])
+        self.jugador.refresh_from_db()
+        self.assertEqual(self.jugador.dni_normalizado, "40111999")
+
+    def test_list_search_by_dni_uses_exact_match(self):
+        response = self.client.get(reverse("ligas:jugador_list"), {"q": "40.111.222"})
+
+        self.assertEqual(len(response.context["object_list"]), 2)
+        self.assertIn('"ligas_jugador"."dni_normalizado" = ', str(response.context["object_list"].query))
+
+    def test_duplicates_report_groups_by_dni(self):
+        response = self.client.get(reverse("ligas:jugador_duplicados"))
+
+        grupos = response.context["grupos"]
+        self.assertEqual(len(grupos), 1)
+        self.assertEqual((grupos[0]["dni_normalizado"], grupos[0]["registros"], grupos[0]["equipos"]), ("40111222", 2, 2))
+        self.assertEqual(len(grupos[0]["jugadores"]), 2)
+
+
 class FixtureGenerationServiceTests(TestCase):
     def setUp(self):
         self.liga = Liga.objects.create(nombre="Liga Test", temporada="2024")
@@ -179,6 +438,70 @@ class FixtureGenerationServiceTests(TestCase):
         with self.assertRaises(FixtureGenerationError):
             generate_fixture(Torneo.objects.create(liga=self.liga, nombre="Preliminar"), [clubes[0]])
 
+    def test_replan_fixture_adds_club_and_keeps_played(self):
+        clubes = [Club.objects.create(nombre=f"Club R{i}") for i in range(4)]
+        generate_fixture(self.torneo_par, clubes)
+        jugado = PartidoFixture.objects.filter(torneo=self.torneo_par).order_by("ronda", "fecha_nro", "id").first()
+        jugado.jugado = True
+        jugado.goles_local = 1
+        jugado.goles_visitante = 0
+        jugado.save()
+        clubes.append(Club.objects.create(nombre="Club R4"))
+
+        resumen = replan_fixture(self.torneo_par, clubes)
+
+        self.assertEqual(resumen.fijos, 1)
+        self.assertTrue(resumen.has_changes)
+        jugado.refresh_from_db()
+        self.assertTrue(jugado.jugado)
+        self.assertEqual(jugado.goles_local, 1)
+
+        partidos = PartidoFixture.objects.filter(torneo=self.torneo_par)
+        self.assertEqual(partidos.count(), len(clubes) * (len(clubes) - 1))
+        cruces = {}
+        for partido in partidos:
+            pair = frozenset((partido.club_local_id, partido.club_visitante_id))
+            cruces.setdefault((partido.ronda, pair), 0)
+            cruces[(partido.ronda, pair)] += 1
+        self.assertTrue(all(cuenta == 1 for cuenta in cruces.values()))
+
+        sin_cambios = replan_fixture(self.torneo_par, clubes)
+        self.assertFalse(sin_cambios.has_changes)
+
+    def test_replan_fixture_never_repeats_club_in_a_fecha(self):
+        clubes = [Club.objects.create(nombre=f"Club T{i}") for i in range(4)]
+        generate_fixture(self.torneo_par, clubes)
+        jugado = PartidoFixture.objects.filter(torneo=self.torneo_par).order_by("ronda", "fecha_nro", "id").first()
+        jugado.jugado = True
+        jugado.save()
+        clubes += [Club.objects.create(nombre=f"Club T{i}") for i in range(4, 6)]
+
+        replan_fixture(self.torneo_par, clubes)
+
+        partidos = PartidoFixture.objects.filter(torneo=self.torneo_par)
+        self.assertEqual(partidos.count(), len(clubes) * (len(clubes) - 1))
+        por_fecha = {}
+        for partido in partidos:
+            clubes_fecha = por_fecha.setdefault((partido.ronda, partido.fecha_nro), [])
+            clubes_fecha += [partido.club_local_id, partido.club_visitante_id]
+        for clave, ids in por_fecha.items():
+            self.assertEqual(len(ids), len(set(ids)), clave)
+        self.assertFalse(replan_fixture(self.torneo_par, clubes).has_changes)
+
+    def test_replan_fixture_removes_club(self):
+        clubes = [Club.objects.create(nombre=f"Club S{i}") for i in range(5)]
+        generate_fixture(self.torneo_impar, clubes)
+        ids_originales = set(PartidoFixture.objects.filter(torneo=self.torneo_impar).values_list("id", flat=True))
+
+        resumen = replan_fixture(self.torneo_impar, clubes[:4])
+
+        partidos = PartidoFixture.objects.filter(torneo=self.torneo_impar)
+        self.assertEqual(partidos.count(), 4 * 3)
+        self.assertFalse(partidos.filter(club_local=clubes[4]).exists())
+        self.assertFalse(partidos.filter(club_visitante=clubes[4]).exists())
+        self.assertEqual(resumen.creados, 0)
+        self.assertTrue(set(partidos.values_list("id", flat=True)) <= ids_originales)
+
     def test_generate_fixture_missing_table(self):
         clubes = [
             Club.objects.create(nombre="Club X"),
@@ -197,6 +520,891 @@ class FixtureGenerationServiceTests(TestCase):
         self.assertFalse(PartidoFixture.objects.filter(torneo=self.torneo_par).exists())
 
 
+class MaterializePartidosTests(TestCase):
+    def setUp(self):
+        self.liga = Liga.objects.create(nombre="Liga Partidos", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=self.liga, nombre="Apertura")
+        self.categorias = [
+            Categoria.objects.create(liga=self.liga, nombre="Sub 11"),
+            Categoria.objects.create(liga=self.liga, nombre="Sub 13"),
+        ]
+        self.clubes = [Club.objects.create(nombre=f"Club M{i}") for i in range(4)]
+        for club in self.clubes:
+            for categoria in self.categorias:
+                Equipo.objects.create(club=club, categoria=categoria)
+        generate_fixture(self.torneo, self.clubes)
+
+    def test_materialize_creates_fechas_and_partidos(self):
+        resultado = materialize_partidos(self.torneo)
+
+        fixture_count = PartidoFixture.objects.filter(torneo=self.torneo).count()
+        self.assertEqual(resultado.partidos_creados, fixture_count * len(self.categorias))
+        self.assertEqual(resultado.fechas_creadas, 2 * 3)
+        self.assertEqual(resultado.sin_equipo, 0)
+        self.assertEqual(Fecha.objects.filter(ronda__torneo=self.torneo).count(), 6)
+
+        partido = PartidoFixture.objects.filter(torneo=self.torneo).order_by("ronda", "fecha_nro", "id").first()
+        expandidos = Partido.objects.filter(
+            fecha_ref__ronda__torneo=self.torneo,
+            fecha_ref__numero=partido.fecha_nro,
+            local__club=partido.club_local,
+            visitante__club=partido.club_visitante,
+        )
+        self.assertEqual(expandidos.count(), len(self.categorias))
+
+    def test_materialize_is_idempotent_and_incremental(self):
+        materialize_partidos(self.torneo)
+        with self.assertNumQueries(9):
+            repetido = materialize_partidos(self.torneo)
+        self.assertEqual((repetido.fechas_creadas, repetido.partidos_creados, repetido.partidos_eliminados), (0, 0, 0))
+
+        jugado = Partido.objects.filter(fecha_ref__ronda__torneo=self.torneo).first()
+        jugado.jugado = True
+        jugado.save()
+        PartidoFixture.objects.filter(torneo=self.torneo).delete()
+
+        resultado = materialize_partidos(self.torneo)
+        self.assertEqual(resultado.partidos_eliminados, len(self.clubes) * 3 * len(self.categorias) - 1)
+        self.assertEqual(list(Partido.objects.filter(fecha_ref__ronda__torneo=self.torneo)), [jugado])
+
+    def test_materialize_skips_clubs_without_equipo(self):
+        Equipo.objects.filter(club=self.clubes[0], categoria=self.categorias[1]).delete()
+
+        resultado = materialize_partidos(self.torneo)
+
+        self.assertEqual(resultado.sin_equipo, 2 * 3)
+
+
+class AsignacionArbitrosTests(TestCase):
+    def setUp(self):
+        liga = Liga.objects.create(nombre="Liga Árbitros", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=liga, nombre="Apertura")
+        categorias = [
+            Categoria.objects.create(liga=liga, nombre="Sub 9"),
+            Categoria.objects.create(liga=liga, nombre="Sub 11"),
+        ]
+        clubes = [Club.objects.create(nombre=f"Club A{i}") for i in range(4)]
+        for club in clubes:
+            for categoria in categorias:
+                Equipo.objects.create(club=club, categoria=categoria)
+        generate_fixture(self.torneo, clubes)
+        materialize_partidos(self.torneo)
+        self.fecha = Fecha.objects.get(ronda__torneo=self.torneo, ronda__nombre="Ronda 1 (Ida)", numero=1)
+        self.fecha.fecha = datetime.date(2025, 4, 5)
+        self.fecha.save()
+
+    def test_assign_respects_availability_and_daily_limit(self):
+        disponibles = [
+            Arbitro.objects.create(apellido="Uno", nombre="A", max_partidos_por_dia=2),
+            Arbitro.objects.create(apellido="Dos", nombre="B", max_partidos_por_dia=2),
+        ]
+        ausente = Arbitro.objects.create(apellido="Tres", nombre="C")
+        IndisponibilidadArbitro.objects.create(arbitro=ausente, fecha=self.fecha.fecha)
+        Arbitro.objects.create(apellido="Cuatro", nombre="D", activo=False)
+
+        resultado = assign_arbitros(self.fecha)
+
+        self.assertEqual((resultado.asignados, resultado.sin_asignar), (4, 0))
+        partidos = list(Partido.objects.filter(fecha_ref=self.fecha).select_related("local"))
+        self.assertEqual({p.arbitro_id for p in partidos}, {a.id for a in disponibles})
+        cruces_por_arbitro = {}
+        for partido in partidos:
+            cruces_por_arbitro.setdefault(partido.arbitro_id, []).append(partido.local.club_id)
+        for clubes in cruces_por_arbitro.values():
+            self.assertEqual(len(clubes), len(set(clubes)))
+
+    def test_assign_leaves_partidos_without_capacity(self):
+        Arbitro.objects.create(apellido="Solo", nombre="A", max_partidos_por_dia=1)
+
+        resultado = assign_arbitros(self.fecha)
+
+        self.assertEqual((resultado.asignados, resultado.sin_asignar), (1, 3))
+        self.assertEqual(Partido.objects.filter(fecha_ref=self.fecha, arbitro__isnull=False).count(), 1)
+
+    def test_plan_balances_season_load_and_club_history(self):
+        plan = plan_asignaciones(
+            [PartidoSlot(1, 10, 11), PartidoSlot(2, 12, 13)],
+            [
+                ArbitroSlot(arbitro_id=1, capacidad=2, carga=8),
+                ArbitroSlot(arbitro_id=2, capacidad=2, carga=0, clubes={10: 3}),
+                ArbitroSlot(arbitro_id=3, capacidad=2, carga=1),
+            ],
+        )
+
+        self.assertEqual(plan, {1: 3, 2: 2})
+
+
+class ProgramacionFechaTests(TestCase):
+    def setUp(self):
+        liga = Liga.objects.create(nombre="Liga Horarios", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=liga, nombre="Apertura")
+        self.sub9 = Categoria.objects.create(liga=liga, nombre="Sub 9", horario=datetime.time(10, 0))
+        self.sub11 = Categoria.objects.create(liga=liga, nombre="Sub 11", horario=datetime.time(10, 30))
+        self.clubes = [Club.objects.create(nombre=f"Club H{i}") for i in range(2)]
+        for club in self.clubes:
+            Equipo.objects.create(club=club, categoria=self.sub9)
+            Equipo.objects.create(club=club, categoria=self.sub11)
+        generate_fixture(self.torneo, self.clubes)
+        materialize_partidos(self.torneo)
+        self.fecha = Fecha.objects.get(ronda__torneo=self.torneo, ronda__nombre="Ronda 1 (Ida)", numero=1)
+
+    def test_schedule_requires_day(self):
+        with self.assertRaises(ProgramacionError):
+            schedule_fecha(self.fecha)
+
+    def test_schedule_avoids_field_overlaps(self):
+        self.fecha.fecha = datetime.date(2025, 5, 10)
+        self.fecha.save()
+
+        resultado = schedule_fecha(self.fecha)
+
+        self.assertEqual((resultado.programados, resultado.desplazados), (2, 1))
+        horarios = {
+            p.categoria_id: timezone.localtime(p.dia_hora).time()
+            for p in Partido.objects.filter(fecha_ref=self.fecha)
+        }
+        self.assertEqual(horarios[self.sub9.id], datetime.time(10, 0))
+        self.assertEqual(horarios[self.sub11.id], datetime.time(11, 0))
+
+        partido_fixture = PartidoFixture.objects.get(torneo=self.torneo, ronda=PartidoFixture.RONDA_IDA, fecha_nro=1)
+        self.assertEqual(timezone.localtime(partido_fixture.fecha_programada).time(), datetime.time(10, 0))
+
+        self.assertEqual(schedule_fecha(self.fecha).programados, 0)
+
+
+class EventosTestMixin:
+    """Liga mínima con un partido por categoría para cargar eventos."""
+
+    def crear_partido(self):
+        self.liga = Liga.objects.create(nombre="Liga Eventos", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=self.liga, nombre="Apertura")
+        self.categoria = Categoria.objects.create(liga=self.liga, nombre="Primera")
+        ronda = Ronda.objects.create(torneo=self.torneo, nombre="Ronda 1 (Ida)")
+        self.fechas = [Fecha.objects.create(ronda=ronda, numero=n) for n in range(1, 5)]
+        local = Equipo.objects.create(club=Club.objects.create(nombre="Club E1"), categoria=self.categoria)
+        visitante = Equipo.objects.create(club=Club.objects.create(nombre="Club E2"), categoria=self.categoria)
+        self.partidos = [
+            Partido.objects.create(fecha_ref=fecha, categoria=self.categoria, local=local, visitante=visitante)
+            for fecha in self.fechas
+        ]
+        self.partido = self.partidos[0]
+        self.jugador = Jugador.objects.create(equipo=local, apellido="Pérez", nombre="Ana")
+        self.otro = Jugador.objects.create(equipo=visitante, apellido="Gómez", nombre="Luz")
+
+
+class EstadisticasJugadorTests(EventosTestMixin, TestCase):
+    def setUp(self):
+        self.crear_partido()
+
+    def test_counters_follow_event_writes(self):
+        gol = EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.GOL)
+        EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.GOL)
+        EventoPartido.objects.create(partido=self.partido, jugador=self.otro, tipo=EventoPartido.TA)
+
+        estadistica = EstadisticaJugador.objects.get(jugador=self.jugador)
+        self.assertEqual(estadistica.goles, 2)
+        self.assertEqual(EstadisticaJugador.objects.get(jugador=self.otro).amarillas, 1)
+
+        gol.tipo = EventoPartido.TR
+        gol.save()
+        estadistica.refresh_from_db()
+        self.assertEqual((estadistica.goles, estadistica.rojas), (1, 1))
+
+        gol.delete()
+        estadistica.refresh_from_db()
+        self.assertEqual((estadistica.goles, estadistica.rojas), (1, 0))
+        self.assertEqual([fila.jugador for fila in top_goleadores(self.categoria)], [self.jugador])
+
+    def test_rebuild_matches_incremental_counters(self):
+        EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.GOL)
+        EventoPartido.objects.create(partido=self.partido, jugador=self.otro, tipo=EventoPartido.TR)
+        incremental = set(EstadisticaJugador.objects.values_list("jugador_id", "goles", "amarillas", "rojas"))
+
+        EstadisticaJugador.objects.all().delete()
+        self.assertEqual(rebuild_estadisticas(), 2)
+
+        reconstruido = set(EstadisticaJugador.objects.values_list("jugador_id", "goles", "amarillas", "rojas"))
+        self.assertEqual(reconstruido, incremental)
+
+    def test_partido_delete_cascades_counters(self):
+        EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.GOL)
+
+        self.partido.delete()
+
+        self.assertEqual(EstadisticaJugador.objects.get(jugador=self.jugador).goles, 0)
+
+    def test_goleadores_page(self):
+        EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.GOL)
+        User.objects.create_superuser(username="admin", password="testpass123")
+        self.client.login(username="admin", password="testpass123")
+
+        response = self.client.get(reverse("ligas:categoria_goleadores", args=[self.categoria.pk]))
+
+        self.assertContains(response, "Pérez, Ana")
+
+
+class SuspensionesTests(EventosTestMixin, TestCase):
+    def setUp(self):
+        self.crear_partido()
+
+    def test_red_card_suspends_next_fecha(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tarjeta = EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.TR)
+
+        self.assertEqual(jugadores_suspendidos(self.fechas[1]), {self.jugador.id})
+        self.assertEqual(jugadores_suspendidos(self.fechas[2]), set())
+        self.assertEqual(DisciplinaJugador.objects.get(jugador=self.jugador, torneo=self.torneo).rojas, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tarjeta.delete()
+
+        self.assertEqual(jugadores_suspendidos(self.fechas[1]), set())
+        self.assertFalse(DisciplinaJugador.objects.filter(jugador=self.jugador).exists())
+
+    def test_yellow_accumulation_and_pending_fechas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(AMARILLAS_POR_SUSPENSION):
+                EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.TA)
+            EventoPartido.objects.create(partido=self.partidos[2], jugador=self.jugador, tipo=EventoPartido.TR)
+            EventoPartido.objects.create(partido=self.partidos[3], jugador=self.jugador, tipo=EventoPartido.TR)
+
+        suspendido_en = set(Suspension.objects.filter(jugador=self.jugador).values_list("fecha__numero", flat=True))
+        self.assertEqual(suspendido_en, {2, 4})
+        disciplina = DisciplinaJugador.objects.get(jugador=self.jugador, torneo=self.torneo)
+        self.assertEqual((disciplina.amarillas, disciplina.rojas, disciplina.fechas_pendientes), (5, 2, 1))
+
+        with self.assertNumQueries(1):
+            suspendidos = jugadores_suspendidos(self.fechas[3])
+        self.assertIn(self.jugador.id, suspendidos)
+        self.assertNotIn(self.otro.id, suspendidos)
+
+
+class PurgaTests(EventosTestMixin, TestCase):
+    def setUp(self):
+        self.crear_partido()
+        with self.captureOnCommitCallbacks(execute=True):
+            EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.GOL)
+            EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.TR)
+        ReglaPuntos.objects.create(categoria=self.categoria)
+        fixture = PartidoFixture.objects.create(
+            torneo=self.torneo,
+            ronda=PartidoFixture.RONDA_IDA,
+            fecha_nro=1,
+            club_local=self.partido.local.club,
+            club_visitante=self.partido.visitante.club,
+        )
+        ResultadoCategoriaPartido.objects.create(partido=fixture, categoria=self.categoria, goles_local=1, goles_visitante=0)
+
+    def test_purge_liga_deletes_whole_tree_in_chunks(self):
+        otra = Liga.objects.create(nombre="Liga que queda", temporada="2025")
+        borrados = purgar("liga", self.liga.pk, chunk_size=2)
+
+        for modelo in (Torneo, Ronda, Fecha, Partido, EventoPartido, PartidoFixture, ResultadoCategoriaPartido,
+                       Categoria, ReglaPuntos, Equipo, Jugador, EstadisticaJugador, DisciplinaJugador, Suspension):
+            self.assertFalse(modelo.objects.exists(), modelo)
+        self.assertEqual(list(Liga.objects.values_list("pk", flat=True)), [otra.pk])
+        estado = progreso("liga", self.liga.pk)
+        self.assertEqual((estado["estado"], estado["borrados"], estado["total"]), ("terminada", borrados, borrados))
+
+    def test_pending_purge_is_queued_once_and_hidden_from_the_panel(self):
+        user = User.objects.create_user(username="purga", password="testpass123", is_staff=True)
+        user.user_permissions.add(*Permission.objects.filter(
+            codename__in=["view_liga", "delete_liga", "view_torneo", "change_torneo"]
+        ))
+        self.client.login(username="purga", password="testpass123")
+
+        response = self.client.post(reverse("ligas:liga_delete", args=[self.liga.pk]))
+        self.assertRedirects(response, reverse("ligas:liga_list"), fetch_redirect_response=False)
+        trabajo = Trabajo.objects.get(tipo="purgar")
+        self.assertEqual(programar_purga("liga", self.liga.pk), trabajo)
+        self.assertEqual(self.client.post(reverse("ligas:liga_delete", args=[self.liga.pk])).status_code, 404)
+        self.assertEqual(Trabajo.objects.filter(tipo="purgar").count(), 1)
+
+        self.assertNotIn(self.liga, self.client.get(reverse("ligas:liga_list")).context["object_list"])
+        self.assertNotIn(self.torneo, self.client.get(reverse("ligas:torneo_list")).context["object_list"])
+        self.assertEqual(self.client.get(reverse("ligas:torneo_update", args=[self.torneo.pk])).status_code, 404)
+        self.assertTrue(Liga.objects.filter(pk=self.liga.pk).exists())
+
+    @override_settings(LIGAS_TRABAJOS_EAGER=True)
+    def test_torneo_delete_view_purges_after_commit(self):
+        user = User.objects.create_user(username="purga", password="testpass123", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="delete_torneo"))
+        self.client.login(username="purga", password="testpass123")
+        self.assertEqual(EstadisticaJugador.objects.get(jugador=self.jugador).goles, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("ligas:torneo_delete", args=[self.torneo.pk]))
+
+        self.assertRedirects(response, reverse("ligas:torneo_list"), fetch_redirect_response=False)
+        self.assertFalse(Torneo.objects.filter(pk=self.torneo.pk).exists())
+        self.assertFalse(Partido.objects.exists())
+        # Los equipos, jugadores y categorías son de la liga y se conservan
+        self.assertTrue(Jugador.objects.filter(pk=self.jugador.pk).exists())
+        self.assertFalse(EstadisticaJugador.objects.filter(goles__gt=0).exists())
+
+        estado = self.client.get(reverse("ligas:purga_estado", args=["torneo", self.torneo.pk])).json()
+        self.assertEqual(estado["estado"], "terminada")
+        self.assertEqual(self.client.get(reverse("ligas:purga_estado", args=["club", 1])).status_code, 403)
+
+
+class ArchivoLigaTests(EventosTestMixin, TestCase):
+    def setUp(self):
+        self.crear_partido()
+        self.fechas[0].fecha = datetime.date(2025, 3, 9)
+        self.fechas[0].save()
+        with self.captureOnCommitCallbacks(execute=True):
+            EventoPartido.objects.create(partido=self.partido, jugador=self.jugador, tipo=EventoPartido.GOL, minuto=12)
+        self.fixture = PartidoFixture.objects.create(
+            torneo=self.torneo,
+            ronda=PartidoFixture.RONDA_IDA,
+            fecha_nro=1,
+            club_local=self.partido.local.club,
+            club_visitante=self.partido.visitante.club,
+        )
+        ResultadoCategoriaPartido.objects.create(
+            partido=self.fixture, categoria=self.categoria, goles_local=2, goles_visitante=1
+        )
+        TablaPosicion.objects.create(categoria=self.categoria, equipo=self.partido.local, puntos=3, pj=1, pg=1, gf=2, gc=1)
+
+    def test_refuses_liga_with_unplayed_matches(self):
+        with self.assertRaises(ArchivoError):
+            archivar_liga(self.liga)
+        self.assertTrue(PartidoFixture.objects.filter(pk=self.fixture.pk).exists())
+
+    def test_archive_view_and_restore_round_trip(self):
+        PartidoFixture.objects.filter(pk=self.fixture.pk).update(jugado=True, goles_local=2, goles_visitante=1)
+        resultado = archivar_liga(self.liga)
+
+        self.assertTrue(Liga.objects.get(pk=self.liga.pk).archivada)
+        self.assertEqual(resultado.filas["ligas.eventopartido"], 1)
+        for modelo in (Ronda, Fecha, Partido, EventoPartido, PartidoFixture, ResultadoCategoriaPartido, TablaPosicion):
+            self.assertFalse(modelo.objects.exists(), modelo)
+        # Catálogo y estadísticas quedan en las tablas activas
+        self.assertEqual(EstadisticaJugador.objects.get(jugador=self.jugador).goles, 1)
+
+        user = User.objects.create_user(username="archivo", password="testpass123", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="view_liga"))
+        self.client.login(username="archivo", password="testpass123")
+        response = self.client.get(reverse("ligas:liga_archivo", args=[self.liga.pk]))
+        self.assertContains(response, "<td>2 - 1</td>", html=True)
+        self.assertContains(response, "Club E1")
+
+        restaurar_liga(Liga.objects.get(pk=self.liga.pk))
+        self.assertFalse(Liga.objects.get(pk=self.liga.pk).archivada)
+        self.assertFalse(LigaArchivada.objects.exists())
+        evento = EventoPartido.objects.select_related("partido__fecha_ref").get()
+        self.assertEqual((evento.minuto, evento.jugador_id), (12, self.jugador.pk))
+        self.assertEqual(evento.partido.fecha_ref.fecha, datetime.date(2025, 3, 9))
+        self.assertEqual(Fecha.objects.filter(ronda__torneo=self.torneo).count(), 4)
+        self.assertEqual(ResultadoCategoriaPartido.objects.get().partido.goles_local, 2)
+        self.assertEqual(TablaPosicion.objects.get().puntos, 3)
+
+    def test_catalogue_is_locked_and_restore_checks_references(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            EventoPartido.objects.create(partido=self.partido, jugador=self.otro, tipo=EventoPartido.TR, minuto=40)
+        PartidoFixture.objects.filter(pk=self.fixture.pk).update(jugado=True)
+        archivar_liga(self.liga)
+
+        user = User.objects.create_user(username="catalogo", password="testpass123", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="delete_jugador"))
+        self.client.login(username="catalogo", password="testpass123")
+        response = self.client.post(reverse("ligas:jugador_delete", args=[self.otro.pk]))
+        self.assertRedirects(response, reverse("ligas:jugador_list"), fetch_redirect_response=False)
+        self.assertTrue(Jugador.objects.filter(pk=self.otro.pk).exists())
+
+        # Un borrado por fuera del panel: la restauración falla sin escribir nada
+        otro_pk = self.otro.pk
+        self.otro.delete()
+        with self.assertRaises(ArchivoError) as ctx:
+            restaurar_liga(Liga.objects.get(pk=self.liga.pk))
+        self.assertIn(f"ligas.jugador {otro_pk}", str(ctx.exception))
+        self.assertTrue(Liga.objects.get(pk=self.liga.pk).archivada)
+        self.assertTrue(LigaArchivada.objects.exists())
+        self.assertFalse(Ronda.objects.exists())
+
+
+class ExportacionesTests(TestCase):
+    def setUp(self):
+        self.liga = Liga.objects.create(nombre="Liga Export", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=self.liga, nombre="Apertura")
+        self.categoria = Categoria.objects.create(liga=self.liga, nombre="Sub 13")
+        self.clubes = [Club.objects.create(nombre=f"Export {idx}") for idx in range(4)]
+        for club in self.clubes:
+            Equipo.objects.create(club=club, categoria=self.categoria)
+        generate_fixture(self.torneo, self.clubes)
+        self.primero = PartidoFixture.objects.filter(torneo=self.torneo).order_by("ronda", "fecha_nro", "id").first()
+        self.primero.fecha_programada = timezone.make_aware(datetime.datetime(2025, 4, 5, 10, 0))
+        self.primero.save(update_fields=["fecha_programada"])
+        ResultadoCategoriaPartido.objects.create(
+            partido=self.primero, categoria=self.categoria, goles_local=2, goles_visitante=1
+        )
+
+        self.user = User.objects.create_user(username="exportador", password="testpass123", is_staff=True)
+        self.user.user_permissions.add(
+            *Permission.objects.filter(codename__in=["view_partidofixture", "view_resultadocategoriapartido"])
+        )
+        self.client.login(username="exportador", password="testpass123")
+
+    def _contenido(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_fixture_csv_and_jsonl_stream_every_row(self):
+        url = reverse("ligas:liga_export", args=[self.liga.pk, "fixture", "csv"])
+        lineas = self._contenido(self.client.get(url, {"torneo": self.torneo.pk})).splitlines()
+        self.assertEqual(lineas[0].split(",")[:4], ["id", "torneo", "ronda", "fecha"])
+        self.assertEqual(len(lineas) - 1, PartidoFixture.objects.filter(torneo=self.torneo).count())
+
+        url = reverse("ligas:liga_export", args=[self.liga.pk, "resultados", "jsonl"])
+        filas = [json.loads(linea) for linea in self._contenido(self.client.get(url)).splitlines()]
+        self.assertEqual(len(filas), 1)
+        self.assertEqual((filas[0]["categoria"], filas[0]["goles_local"]), ("Sub 13", 2))
+
+    async def test_asgi_export_streams_through_async_iterator(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("ligas:liga_export", args=[self.liga.pk, "fixture", "csv"])
+
+        with mock.patch("ligas.exports.FILAS_POR_BLOQUE", 2):
+            response = await self.async_client.get(url, {"torneo": self.torneo.pk})
+            self.assertEqual(response.status_code, 200)
+            # Con un iterador sync, Django lo pasaría a lista entero antes de enviar nada
+            self.assertTrue(response.is_async)
+            bloques = [bloque async for bloque in response.streaming_content]
+
+        lineas = b"".join(bloques).decode("utf-8").splitlines()
+        total = await PartidoFixture.objects.filter(torneo=self.torneo).acount()
+        self.assertEqual(len(lineas) - 1, total)
+        self.assertEqual(len(bloques), total // 2 + 1)
+
+    def test_fixture_ics_only_includes_scheduled_partidos(self):
+        url = reverse("ligas:liga_export", args=[self.liga.pk, "fixture", "ics"])
+        response = self.client.get(url)
+        contenido = self._contenido(response)
+
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+        self.assertEqual(contenido.count("BEGIN:VEVENT"), 1)
+        self.assertIn(f"UID:fixture-{self.primero.pk}@ligas", contenido)
+        self.assertTrue(contenido.endswith("END:VCALENDAR\r\n"))
+
+    def test_unknown_format_and_missing_permission(self):
+        self.assertEqual(
+            self.client.get(reverse("ligas:liga_export", args=[self.liga.pk, "resultados", "ics"])).status_code,
+            404,
+        )
+        response = self.client.get(reverse("ligas:liga_export", args=[self.liga.pk, "posiciones", "csv"]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_posiciones_rejects_torneo_filter(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="view_tablaposicion"))
+        url = reverse("ligas:liga_export", args=[self.liga.pk, "posiciones", "csv"])
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url, {"torneo": self.torneo.pk}).status_code, 404)
+        with self.assertRaisesMessage(CommandError, "no admite un torneo"):
+            call_command("exportar_temporada", self.liga.pk, "posiciones", torneo=self.torneo.pk, stdout=io.StringIO())
+
+
+class ApiPublicaTests(TestCase):
+    def setUp(self):
+        self.liga = Liga.objects.create(nombre="Liga API", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=self.liga, nombre="Clausura")
+        self.categoria = Categoria.objects.create(liga=self.liga, nombre="Sub 11")
+        self.clubes = [Club.objects.create(nombre=f"API {idx}") for idx in range(4)]
+        for club in self.clubes:
+            Equipo.objects.create(club=club, categoria=self.categoria)
+        generate_fixture(self.torneo, self.clubes)
+        self.url = reverse("ligas:api_torneo_fixture", args=[self.torneo.pk])
+
+    def test_fixture_grouped_by_fecha_and_filterable(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data["fechas"]), 6)
+        self.assertEqual(len(data["fechas"][0]["partidos"]), 2)
+        self.assertIn("local", data["fechas"][0]["partidos"][0])
+
+        data = self.client.get(self.url, {"ronda": 2, "fecha": 1}).json()
+        self.assertEqual([(f["ronda"], f["fecha"]) for f in data["fechas"]], [(2, 1)])
+
+    def test_if_none_match_returns_304_without_queries(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        # La versión se lee con la API async de la cache, nunca con la sync desde el event loop
+        with self.assertNumQueries(0), mock.patch("ligas.versioning.get_version", side_effect=AssertionError):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_result_write_changes_etag(self):
+        etag = self.client.get(reverse("ligas:api_torneo_resultados", args=[self.torneo.pk]))["ETag"]
+        partido = PartidoFixture.objects.filter(torneo=self.torneo).first()
+        ResultadoCategoriaPartido.objects.create(
+            partido=partido, categoria=self.categoria, goles_local=1, goles_visitante=0
+        )
+
+        response = self.client.get(
+            reverse("ligas:api_torneo_resultados", args=[self.torneo.pk]), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["resultados"][0]["categoria_nombre"], "Sub 11")
+
+
+class PosicionesFechaTests(TestCase):
+    def setUp(self):
+        self.liga = Liga.objects.create(nombre="Liga Evolución", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=self.liga, nombre="Apertura")
+        self.categorias = [Categoria.objects.create(liga=self.liga, nombre=nombre) for nombre in ("Sub 9", "Sub 11")]
+        ReglaPuntos.objects.create(categoria=self.categorias[1], puntos_victoria=2)
+        self.clubes = [Club.objects.create(nombre=f"Evo {idx}") for idx in range(4)]
+        generate_fixture(self.torneo, self.clubes)
+
+    def _jugar_fecha(self, fecha_nro, goles_local=1, goles_visitante=0, ronda=PartidoFixture.RONDA_IDA):
+        with self.captureOnCommitCallbacks(execute=True):
+            for partido in PartidoFixture.objects.filter(torneo=self.torneo, ronda=ronda, fecha_nro=fecha_nro):
+                for categoria in self.categorias:
+                    ResultadoCategoriaPartido.objects.update_or_create(
+                        partido=partido,
+                        categoria=categoria,
+                        defaults={"goles_local": goles_local, "goles_visitante": goles_visitante},
+                    )
+                partido.jugado = True
+                partido.save()
+
+    def test_snapshot_written_when_fecha_completes_and_rewritten_on_correction(self):
+        partido = PartidoFixture.objects.filter(torneo=self.torneo, ronda=1, fecha_nro=1).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            ResultadoCategoriaPartido.objects.create(
+                partido=partido, categoria=self.categorias[0], goles_local=1, goles_visitante=0
+            )
+        self.assertFalse(PosicionesFecha.objects.exists())
+
+        self._jugar_fecha(1)
+        self._jugar_fecha(2)
+        self.assertEqual(PosicionesFecha.objects.filter(torneo=self.torneo).count(), 4)
+        snapshot = PosicionesFecha.objects.get(torneo=self.torneo, ronda=1, fecha_nro=1, categoria=self.categorias[1])
+        self.assertEqual(len(snapshot.filas), 4)
+        self.assertEqual(snapshot.filas[0][1:4], [2, 1, 1])  # ReglaPuntos: 2 por victoria
+
+        self._jugar_fecha(1, goles_local=0, goles_visitante=0)
+        snapshot = PosicionesFecha.objects.get(torneo=self.torneo, ronda=1, fecha_nro=1, categoria=self.categorias[0])
+        self.assertEqual([fila[1] for fila in snapshot.filas], [1, 1, 1, 1])
+        self.assertEqual(PosicionesFecha.objects.filter(torneo=self.torneo).count(), 4)
+
+        # fechas, resultados, walkovers y reglas; bloqueo, borrado e inserción dentro del savepoint
+        with self.assertNumQueries(9):
+            self.assertEqual(actualizar_posiciones(self.torneo.pk, (1, 2)), 2)
+
+    def test_snapshot_applies_goal_cap_and_walkover(self):
+        ReglaPuntos.objects.create(categoria=self.categorias[0], diferencia_maxima_goles=3)
+        for categoria in self.categorias:
+            for club in self.clubes:
+                Equipo.objects.create(club=club, categoria=categoria)
+        materialize_partidos(self.torneo)
+        self._jugar_fecha(1, goles_local=7, goles_visitante=0)
+
+        filas = PosicionesFecha.objects.get(ronda=1, fecha_nro=1, categoria=self.categorias[0]).filas
+        self.assertEqual({(fila[6], fila[7]) for fila in filas}, {(3, 0), (0, 3)})  # 7-0 cuenta como 3-0
+
+        partido = Partido.objects.filter(categoria=self.categorias[1], fecha_ref__numero=1).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            EventoPartido.objects.create(partido=partido, equipo=partido.local, tipo=EventoPartido.WO)
+        filas = {
+            fila[0]: fila
+            for fila in PosicionesFecha.objects.get(ronda=1, fecha_nro=1, categoria=self.categorias[1]).filas
+        }
+        # El local no se presentó: el visitante suma los 3 puntos del walkover (la regla da 2 por victoria)
+        self.assertEqual(filas[partido.visitante.club_id][1:4], [3, 1, 1])
+        self.assertEqual(filas[partido.local.club_id][1:6], [0, 1, 0, 0, 1])
+
+    def test_rolled_back_change_does_not_leak_into_next_rebuild(self):
+        self._jugar_fecha(1)
+        resultado = ResultadoCategoriaPartido.objects.filter(partido__fecha_nro=1).first()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            resultado.delete()
+            raise RuntimeError
+
+        with mock.patch("ligas.posiciones.actualizar_posiciones") as actualizar:
+            self._jugar_fecha(2)
+        actualizar.assert_called_once_with(self.torneo.pk, (1, 2))
+
+    def test_rebuild_posiciones_command_writes_and_verifies_tables(self):
+        for categoria in self.categorias:
+            for club in self.clubes:
+                Equipo.objects.create(club=club, categoria=categoria)
+        ReglaPuntos.objects.filter(categoria=self.categorias[1]).update(diferencia_maxima_goles=2)
+        self._jugar_fecha(1, goles_local=5)
+
+        salida = io.StringIO()
+        call_command("rebuild_posiciones", workers=1, por_liga=True, stdout=salida)
+
+        self.assertIn(f"liga {self.liga.pk}: 8 filas", salida.getvalue())
+        self.assertEqual(TablaPosicion.objects.filter(categoria__liga=self.liga).count(), 8)
+        primero = TablaPosicion.objects.filter(categoria=self.categorias[1]).first()
+        self.assertEqual((primero.puntos, primero.pj, primero.pg, primero.gf), (2, 1, 1, 2))  # 5-0 con tope de 2
+        self.assertEqual(TablaPosicion.objects.filter(categoria=self.categorias[0]).first().gf, 5)
+        self.assertEqual(TablaPosicion.objects.filter(categoria=self.categorias[0], pj=0).count(), 0)
+
+        call_command("rebuild_posiciones", workers=1, verificar=True, stdout=io.StringIO())
+        TablaPosicion.objects.filter(pk=primero.pk).update(puntos=10)
+        with self.assertRaisesMessage(CommandError, str(self.categorias[1].pk)):
+            call_command("rebuild_posiciones", workers=1, verificar=True, stdout=io.StringIO())
+
+    def test_evolucion_etag_changes_after_rebuild(self):
+        self._jugar_fecha(1)
+        url = reverse("ligas:api_torneo_evolucion", args=[self.torneo.pk])
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            actualizar_posiciones(self.torneo.pk, (1, 1))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_api_evolucion_served_from_snapshots(self):
+        self._jugar_fecha(1)
+        self._jugar_fecha(2)
+        url = reverse("ligas:api_torneo_evolucion", args=[self.torneo.pk])
+
+        with self.assertNumQueries(3):
+            data = self.client.get(url, {"categoria": self.categorias[0].pk}).json()
+        self.assertEqual([c["categoria"] for c in data["categorias"]], ["Sub 9"])
+        fechas = data["categorias"][0]["fechas"]
+        self.assertEqual([(f["ronda"], f["fecha"]) for f in fechas], [(1, 1), (1, 2)])
+        primero = fechas[1]["tabla"][0]
+        self.assertEqual((primero["posicion"], primero["puntos"], primero["pj"]), (1, 6, 2))
+        self.assertTrue(primero["club"].startswith("Evo"))
+
+
+class AdminChangelistTests(TestCase):
+    """Changelist queries must not grow with the number of rows (no N+1 from ``__str__``)."""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(username="admin", password="testpass123", email="a@example.com")
+        self.client.force_login(self.user)
+
+    def _poblar(self, n):
+        liga = Liga.objects.create(nombre=f"Liga Admin {n}", temporada="2025")
+        torneo = Torneo.objects.create(liga=liga, nombre="Apertura")
+        categoria = Categoria.objects.create(liga=liga, nombre="Primera")
+        ReglaPuntos.objects.create(categoria=categoria)
+        clubes = [Club.objects.create(nombre=f"Admin {n}-{idx}") for idx in range(2)]
+        local, visitante = [Equipo.objects.create(club=club, categoria=categoria) for club in clubes]
+        jugador = Jugador.objects.create(equipo=local, apellido="Pérez", nombre=f"Ana {n}")
+        arbitro = Arbitro.objects.create(apellido="Juez", nombre=str(n))
+        IndisponibilidadArbitro.objects.create(arbitro=arbitro, fecha=datetime.date(2025, 3, n))
+        fecha = Fecha.objects.create(ronda=Ronda.objects.create(torneo=torneo), numero=1)
+        partido = Partido.objects.create(fecha_ref=fecha, categoria=categoria, local=local, visitante=visitante)
+        EventoPartido.objects.create(partido=partido, equipo=local, jugador=jugador, tipo=EventoPartido.GOL)
+        EventoPartido.objects.create(partido=partido, equipo=local, jugador=jugador, tipo=EventoPartido.TR)
+        fixture = PartidoFixture.objects.create(
+            torneo=torneo, ronda=1, fecha_nro=1, club_local=clubes[0], club_visitante=clubes[1], jugado=True
+        )
+        ResultadoCategoriaPartido.objects.create(partido=fixture, categoria=categoria, goles_local=2, goles_visitante=1)
+        DisciplinaJugador.objects.get_or_create(jugador=jugador, torneo=torneo)
+        Suspension.objects.get_or_create(jugador=jugador, fecha=fecha, motivo=EventoPartido.TR)
+        for equipo in (local, visitante):
+            TablaPosicion.objects.create(categoria=categoria, equipo=equipo)
+        actualizar_posiciones(torneo.pk)
+        LigaArchivada.objects.create(liga=liga, datos=b"")
+        Trabajo.objects.create(tipo="purgar", usuario=self.user)
+
+    def _consultas(self):
+        consultas = {}
+        for modelo, modelo_admin in admin_site._registry.items():
+            if modelo._meta.app_label != "ligas":
+                continue
+            url = reverse(f"admin:ligas_{modelo._meta.model_name}_changelist")
+            with CaptureQueriesContext(connection) as capturadas:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertFalse(modelo_admin.show_full_result_count)
+            consultas[modelo._meta.model_name] = len(capturadas)
+        return consultas
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self._poblar(1)
+        self._consultas()  # calienta la cache de permisos y sesión
+        antes = self._consultas()
+        for n in range(2, 5):
+            self._poblar(n)
+        despues = self._consultas()
+
+        for modelo, cantidad in antes.items():
+            with self.subTest(changelist=modelo):
+                self.assertEqual(despues[modelo], cantidad)
+                self.assertLessEqual(cantidad, 8)
+
+
+class PaginasPublicasTests(TestCase):
+    def setUp(self):
+        self.liga = Liga.objects.create(nombre="Liga Pública", temporada="2025")
+        self.torneo = Torneo.objects.create(liga=self.liga, nombre="Verano")
+        self.categorias = [
+            Categoria.objects.create(liga=self.liga, nombre="Sub 8"),
+            Categoria.objects.create(liga=self.liga, nombre="Sub 10"),
+        ]
+        self.clubes = [Club.objects.create(nombre=f"Público {idx}") for idx in range(3)]
+        equipos = [Equipo.objects.create(club=club, categoria=self.categorias[0]) for club in self.clubes]
+        generate_fixture(self.torneo, self.clubes)
+        self.partido = PartidoFixture.objects.filter(torneo=self.torneo).order_by("ronda", "fecha_nro", "id").first()
+        ResultadoCategoriaPartido.objects.create(
+            partido=self.partido, categoria=self.categorias[0], goles_local=1, goles_visitante=1
+        )
+        TablaPosicion.objects.create(categoria=self.categorias[0], equipo=equipos[0], puntos=3, pj=1, pg=1, gf=2)
+
+    def test_home_lists_ligas_and_torneos(self):
+        response = self.client.get(reverse("ligas:home"))
+        self.assertContains(response, reverse("ligas:publico_fixture", args=[self.torneo.pk]))
+        self.assertContains(response, reverse("ligas:publico_posiciones", args=[self.liga.pk]))
+
+    async def test_fixture_page_is_async_and_computes_estado(self):
+        response = await self.async_client.get(reverse("ligas:publico_fixture", args=[self.torneo.pk]))
+        self.assertEqual(response.status_code, 200)
+        partidos = [p for r in response.context["rondas"] for f in r["fechas"] for p in f["partidos"]]
+        self.assertEqual(len(partidos), await PartidoFixture.objects.filter(torneo=self.torneo).acount())
+        estados = {p["id"]: p["estado"] for p in partidos}
+        self.assertEqual(estados[self.partido.pk], "parcial")
+
+        response = await self.async_client.get(reverse("ligas:publico_fixture", args=[9999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_standings_page(self):
+        response = self.client.get(reverse("ligas:publico_posiciones", args=[self.liga.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["categorias"][0]["tabla"][0]["dg"], 2)
+
+
+class CacheLigasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_or_set_computes_once_and_serves_stale_while_locked(self):
+        calcular = mock.Mock(side_effect=[1, 2])
+        key = "ligas:prueba"
+
+        self.assertEqual(ligas_cache.get_or_set(key, calcular, timeout=60), 1)
+        self.assertEqual(ligas_cache.get_or_set(key, calcular, timeout=60), 1)
+        self.assertEqual(calcular.call_count, 1)
+
+        cache.set(key, (0, 1), 60)  # vencimiento blando superado
+        cache.add(f"{key}:lock", 1)  # otro worker está recalculando
+        self.assertEqual(ligas_cache.get_or_set(key, calcular, timeout=60), 1)
+        self.assertEqual(calcular.call_count, 1)
+
+        cache.delete(f"{key}:lock")
+        self.assertEqual(ligas_cache.get_or_set(key, calcular, timeout=60), 2)
+
+
+class PermisosCacheadosTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="panel", password="testpass123", is_staff=True)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_jugador"))
+        self.client.login(username="panel", password="testpass123")
+
+    def test_second_request_skips_permission_queries(self):
+        self.client.get(reverse("ligas:jugador_list"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("ligas:jugador_list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q["sql"] for q in ctx.captured_queries if "auth_permission" in q["sql"]])
+
+    def test_group_changes_invalidate_snapshot(self):
+        self.client.get(reverse("ligas:jugador_list"))
+        grupo = Group.objects.create(name="Fixture")
+        self.user.groups.add(grupo)
+        self.assertFalse(User.objects.get(pk=self.user.pk).has_perm("ligas.change_partidofixture"))
+
+        grupo.permissions.add(Permission.objects.get(codename="change_partidofixture"))
+        self.assertTrue(User.objects.get(pk=self.user.pk).has_perm("ligas.change_partidofixture"))
+
+        self.user.groups.remove(grupo)
+        self.assertFalse(User.objects.get(pk=self.user.pk).has_perm("ligas.change_partidofixture"))
+
+    @override_settings(LIGAS_PERMISOS_TIMEOUT=7)
+    def test_snapshot_expires_after_configured_timeout(self):
+        with mock.patch("ligas.permisos.cache.set", wraps=cache.set) as guardar:
+            User.objects.get(pk=self.user.pk).has_perm("ligas.view_jugador")
+
+        self.assertEqual(guardar.call_args.args[2], 7)
+
+
+class FragmentosPanelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="menu", password="testpass123", is_staff=True)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_jugador"))
+        self.client.login(username="menu", password="testpass123")
+
+    def test_sidebar_fragment_follows_permissions(self):
+        club_list = reverse("ligas:club_list")
+        response = self.client.get(reverse("ligas:jugador_list"))
+        self.assertNotContains(response, f'href="{club_list}"')
+
+        self.user.user_permissions.add(Permission.objects.get(codename="view_club"))
+        response = self.client.get(reverse("ligas:jugador_list"))
+        self.assertContains(response, f'href="{club_list}"')
+
+    def test_identity_is_cached_until_saved(self):
+        self.client.get(reverse("ligas:jugador_list"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("ligas:jugador_list"))
+        self.assertFalse([q["sql"] for q in ctx.captured_queries if "siteidentity" in q["sql"]])
+
+        identidad = SiteIdentity.get_solo()
+        identidad.site_title = "Liga Norte"
+        identidad.sidebar_bg = "#000000"
+        identidad.save()
+        response = self.client.get(reverse("ligas:jugador_list"))
+        self.assertContains(response, "<title>Liga Norte")
+        self.assertContains(response, "--bg: #000000;")
+
+
+class ResultadosEnVivoTests(TestCase):
+    async def test_stream_delivers_published_delta(self):
+        broker = live.MemoryBroker()
+        with mock.patch.object(live, "_broker", broker):
+            stream = live.stream_torneo(7, heartbeat=0.05)
+            self.assertEqual(await anext(stream), "retry: 5000\n\n")
+            self.assertEqual(await anext(stream), ": ping\n\n")
+            self.assertEqual(broker.suscriptores(live.canal_torneo(7)), 1)
+
+            live.publicar(7, "resultado", {"p": 1, "e": "jugado"})
+            live.publicar(8, "resultado", {"p": 2, "e": "jugado"})
+            self.assertEqual(await anext(stream), 'id: 1\nevent: resultado\ndata: {"p":1,"e":"jugado"}\n\n')
+
+            await stream.aclose()
+            self.assertEqual(broker.suscriptores(live.canal_torneo(7)), 0)
+
+    def test_saving_results_publishes_after_commit(self):
+        user = User.objects.create_user(username="vivo", password="testpass123", is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename="change_partidofixture"))
+        self.client.login(username="vivo", password="testpass123")
+        liga = Liga.objects.create(nombre="Liga Vivo", temporada="2025")
+        torneo = Torneo.objects.create(liga=liga, nombre="Anual")
+        categoria = Categoria.objects.create(liga=liga, nombre="Sub 9")
+        partido = PartidoFixture.objects.create(
+            torneo=torneo,
+            ronda=PartidoFixture.RONDA_IDA,
+            fecha_nro=1,
+            club_local=Club.objects.create(nombre="Vivo Local"),
+            club_visitante=Club.objects.create(nombre="Vivo Visita"),
+        )
+
+        with mock.patch("ligas.abm_views.publicar") as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse("ligas:partido_fixture_resultados", args=[torneo.pk, partido.pk]),
+                    {f"categoria_{categoria.pk}_local": 3, f"categoria_{categoria.pk}_visitante": 1},
+                )
+
+        publicar.assert_called_once_with(
+            torneo.pk, "resultado", {"p": partido.pk, "e": "jugado", "g": [3, 1], "c": {str(categoria.pk): [3, 1]}}
+        )
+
+
 class TorneoFixtureViewTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -232,6 +1440,7 @@ class TorneoFixtureViewTests(TestCase):
         self.assertEqual(response.context["club_count"], len(self.clubes))
         self.assertNotContains(response, "Clubes participantes")
 
+    @override_settings(LIGAS_TRABAJOS_EAGER=True)
     def test_post_generates_fixture(self):
         response = self.client.post(self.url)
         self.assertRedirects(response, self.url)
@@ -243,6 +1452,95 @@ class TorneoFixtureViewTests(TestCase):
         self.assertRedirects(response, self.url)
         self.assertEqual(PartidoFixture.objects.filter(torneo=self.torneo).count(), count)
 
+    def test_post_queues_fixture_job_for_worker(self):
+        response = self.client.post(self.url)
+        self.assertRedirects(response, self.url)
+        self.assertFalse(PartidoFixture.objects.filter(torneo=self.torneo).exists())
+        trabajo = Trabajo.objects.get(tipo="generar_fixture")
+        estado_url = reverse("ligas:trabajo_estado", args=[trabajo.pk])
+        self.assertEqual(self.client.get(estado_url).json()["estado"], Trabajo.PENDIENTE)
+
+        salida = io.StringIO()
+        call_command("procesar_trabajos", workers=1, una_vez=True, stdout=salida)
+
+        self.assertIn("1 trabajos procesados", salida.getvalue())
+        estado = self.client.get(estado_url).json()
+        self.assertEqual((estado["estado"], estado["intentos"]), (Trabajo.TERMINADO, 1))
+        self.assertEqual(estado["resultado"]["partidos"], PartidoFixture.objects.filter(torneo=self.torneo).count())
+
+        otro = User.objects.create_user(username="ajeno", password="testpass123", is_staff=True)
+        self.client.force_login(otro)
+        self.assertEqual(self.client.get(estado_url).status_code, 403)
+
+    def test_failed_job_is_retried_then_marked_as_error(self):
+        trabajo = encolar("generar_fixture", max_intentos=2, torneo_id=self.torneo.pk, club_ids=[])
+        fallo = mock.patch("ligas.tareas.generate_fixture", side_effect=RuntimeError("sin conexión"))
+        with fallo, self.assertLogs("ligas.trabajos", "WARNING"):
+            ejecutar(tomar("test"))
+            trabajo.refresh_from_db()
+            self.assertEqual((trabajo.estado, trabajo.intentos), (Trabajo.PENDIENTE, 1))
+            self.assertIsNone(tomar("test"))  # espera el backoff
+
+            Trabajo.objects.filter(pk=trabajo.pk).update(disponible_desde=timezone.now())
+            ejecutar(tomar("test"))
+        trabajo.refresh_from_db()
+        self.assertEqual((trabajo.estado, trabajo.intentos), (Trabajo.ERROR, 2))
+        self.assertIn("sin conexión", trabajo.error)
+
+    def test_only_jobs_with_stale_heartbeat_are_released(self):
+        vivo = encolar("generar_fixture", torneo_id=self.torneo.pk, club_ids=[])
+        caido = encolar("generar_fixture", torneo_id=self.torneo.pk, club_ids=[])
+        for trabajo in (vivo, caido):
+            self.assertEqual(tomar(f"worker-{trabajo.pk}").pk, trabajo.pk)
+        # Una purga larga: empezó hace dos horas pero su worker sigue avisando
+        hace_dos_horas = timezone.now() - datetime.timedelta(hours=2)
+        Trabajo.objects.filter(pk=vivo.pk).update(iniciado=hace_dos_horas)
+        Trabajo.objects.filter(pk=caido.pk).update(
+            iniciado=hace_dos_horas, latido=timezone.now() - datetime.timedelta(minutes=10)
+        )
+        self.assertEqual(latir(f"worker-{vivo.pk}"), 1)
+
+        self.assertEqual(liberar_colgados(300), 1)
+
+        estados = dict(Trabajo.objects.values_list("pk", "estado"))
+        self.assertEqual((estados[vivo.pk], estados[caido.pk]), (Trabajo.EN_CURSO, Trabajo.PENDIENTE))
+
+    def test_post_replanificar_incorporates_new_club(self):
+        generate_fixture(self.torneo, self.clubes)
+        club_extra = Club.objects.create(nombre="Vista Club 5")
+        Equipo.objects.create(club=club_extra, categoria=self.categoria)
+
+        response = self.client.get(self.url)
+        self.assertTrue(response.context["fixture_desactualizado"])
+
+        response = self.client.post(self.url, {"accion": "replanificar"})
+        self.assertRedirects(response, self.url)
+        partidos = PartidoFixture.objects.filter(torneo=self.torneo)
+        self.assertEqual(partidos.count(), 4 * 3)  # queda en cola para el worker
+
+        ejecutar(tomar("test"))
+        trabajo = Trabajo.objects.get(tipo="replanificar_fixture")
+        self.assertEqual(trabajo.estado, Trabajo.TERMINADO)
+        self.assertEqual(trabajo.resultado["creados"] - trabajo.resultado["eliminados"], 5 * 4 - 4 * 3)
+        self.assertEqual(partidos.count(), 5 * 4)
+        self.assertFalse(self.client.get(self.url).context["fixture_desactualizado"])
+
+    def test_post_materializar_queues_partidos_for_worker(self):
+        generate_fixture(self.torneo, self.clubes)
+        self.user.user_permissions.add(Permission.objects.get(codename="add_partido"))
+        for club in self.clubes:
+            Equipo.objects.get_or_create(club=club, categoria=self.categoria)
+
+        response = self.client.post(self.url, {"accion": "materializar"})
+        self.assertRedirects(response, self.url)
+        self.assertFalse(Partido.objects.exists())
+
+        ejecutar(tomar("test"))
+        trabajo = Trabajo.objects.get(tipo="materializar_partidos")
+        self.assertEqual(trabajo.estado, Trabajo.TERMINADO)
+        self.assertEqual(trabajo.resultado["partidos_creados"], Partido.objects.count())
+        self.assertTrue(Partido.objects.exists())
+
     def test_fixture_table_columns_and_order(self):
         generate_fixture(self.torneo, self.clubes)
 
@@ -359,6 +1657,28 @@ class TorneoFixtureViewTests(TestCase):
             3,
         )
 
+    def test_only_changed_fecha_gets_new_fragment_key(self):
+        generate_fixture(self.torneo, self.clubes)
+        partido = PartidoFixture.objects.filter(torneo=self.torneo).order_by("ronda", "fecha_nro", "id").first()
+
+        def claves(response):
+            return {
+                (ronda["id"], fecha["numero"]): fecha["cache_key"]
+                for ronda in response.context["fixture_rounds_data"]
+                for fecha in ronda["fechas"]
+            }
+
+        antes = claves(self.client.get(self.url))
+        ResultadoCategoriaPartido.objects.create(partido=partido, categoria=self.categoria, goles_local=1, goles_visitante=0)
+        response = self.client.get(self.url)
+        despues = claves(response)
+
+        cambiadas = [fecha for fecha in antes if antes[fecha] != despues[fecha]]
+        self.assertEqual(cambiadas, [(partido.ronda, partido.fecha_nro)])
+        url = reverse("ligas:partido_fixture_resultados", args=[self.torneo.pk, partido.pk])
+        self.assertContains(response, f'href="{url}">')
+        self.assertContains(response, "estado-parcial")
+
     def test_resultados_validation_requires_enteros(self):
         generate_fixture(self.torneo, self.clubes)
         partido = PartidoFixture.objects.filter(torneo=self.torneo).first()
@@ -374,3 +1694,41 @@ class TorneoFixtureViewTests(TestCase):
         field_name = ResultadoPartidoFixtureForm._field_name(self.categoria, "local")
         self.assertIn("Ingrese un entero ≥ 0", form[field_name].errors)
 
+
+
+class ConfiguracionBaseDatosTests(SimpleTestCase):
+    """``config/settings.py`` resolves ``DATABASES`` from the environment."""
+
+    def _databases(self, **env):
+        propias = ("POSTGRES_", "DB_CONN_", "SQLITE_", "LIGAS_ASGI", "CACHE_")
+        entorno = {clave: valor for clave, valor in os.environ.items() if not clave.startswith(propias)}
+        with mock.patch.dict(os.environ, {**entorno, **env}, clear=True):
+            return runpy.run_path(str(settings.BASE_DIR / "config" / "settings.py"))["DATABASES"]["default"]
+
+    def test_sqlite_defaults_and_busy_timeout(self):
+        db = self._databases(SQLITE_BUSY_TIMEOUT_MS="250")
+
+        self.assertEqual(db["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(db["CONN_MAX_AGE"], 60)
+        self.assertIn("PRAGMA journal_mode=WAL;", db["OPTIONS"]["init_command"])
+        self.assertIn("PRAGMA busy_timeout=250;", db["OPTIONS"]["init_command"])
+        self.assertEqual(db["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+
+    def test_asgi_defaults_to_non_persistent_connections(self):
+        self.assertEqual(self._databases(LIGAS_ASGI="1")["CONN_MAX_AGE"], 0)
+        self.assertEqual(self._databases(LIGAS_ASGI="1", DB_CONN_MAX_AGE="30")["CONN_MAX_AGE"], 30)
+
+    def test_postgres_with_and_without_pool(self):
+        db = self._databases(POSTGRES_DB="ligas", POSTGRES_CONNECT_TIMEOUT="3")
+        self.assertEqual(db["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(db["OPTIONS"], {"connect_timeout": 3})
+        self.assertEqual(db["CONN_MAX_AGE"], 60)
+
+        sin_pool = mock.patch("importlib.util.find_spec", return_value=None)
+        with sin_pool, self.assertRaisesMessage(ImproperlyConfigured, "psycopg[pool]"):
+            self._databases(POSTGRES_DB="ligas", POSTGRES_POOL="1")
+
+        with mock.patch("importlib.util.find_spec", return_value=object()):
+            db = self._databases(POSTGRES_DB="ligas", POSTGRES_POOL="1", POSTGRES_POOL_MAX_SIZE="4")
+        self.assertEqual(db["CONN_MAX_AGE"], 0)
+        self.assertEqual(db["OPTIONS"]["pool"], {"min_size": 2, "max_size": 4, "timeout": 10})
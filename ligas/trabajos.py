@@ -0,0 +1,213 @@
+"""Database-backed queue for long operations.
+
+Views call :func:`encolar` with the name of a registered task and its JSON
+parameters. That inserts one ``Trabajo`` row in the request's transaction and
+returns right away. ``manage.py procesar_trabajos`` claims pending rows and
+runs them in a thread or process pool. Everything lives in the project
+database, so no broker or extra service is needed.
+
+A worker claims a row with a conditional ``UPDATE ... WHERE estado =
+'pendiente'``, so several workers can share the queue on any backend. A task
+that raises is retried with exponential backoff up to ``max_intentos``.
+While a job runs, its worker refreshes ``latido`` (see :class:`Latido`), and
+:func:`liberar_colgados` only requeues jobs whose heartbeat went stale.
+:class:`TrabajoError` marks a failure that a retry will not fix, and its
+message is shown to the user. Tasks report progress with :func:`avanzar`.
+
+With ``LIGAS_TRABAJOS_EAGER = True``, :func:`encolar` runs the task inline and
+errors propagate. The tests rely on this.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+import traceback
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Trabajo
+
+logger = logging.getLogger(__name__)
+
+REINTENTO_SEGUNDOS = 30
+LATIDO_SEGUNDOS = 30
+
+_TAREAS: Dict[str, Callable[..., Optional[dict]]] = {}
+
+
+class TrabajoError(Exception):
+    """Raised by a task for a failure that retrying will not fix."""
+
+
+def tarea(nombre: str):
+    """Register the decorated function as task ``nombre``.
+
+    The function receives the ``Trabajo`` plus its ``parametros`` as keyword
+    arguments, and returns a JSON-serializable result (or ``None``).
+    """
+
+    def registrar(funcion):
+        _TAREAS[nombre] = funcion
+        return funcion
+
+    return registrar
+
+
+def encolar(tipo: str, /, *, usuario=None, max_intentos: int = 3, **parametros) -> Trabajo:
+    """Queue task ``tipo``; it becomes visible to the workers when the transaction commits."""
+
+    if tipo not in _TAREAS:
+        raise TrabajoError(f"No existe la tarea '{tipo}'.")
+    eager = getattr(settings, "LIGAS_TRABAJOS_EAGER", False)
+    trabajo = Trabajo.objects.create(
+        tipo=tipo,
+        parametros=parametros,
+        usuario=usuario if usuario is not None and usuario.is_authenticated else None,
+        max_intentos=1 if eager else max_intentos,
+        estado=Trabajo.EN_CURSO if eager else Trabajo.PENDIENTE,
+        intentos=1 if eager else 0,
+        iniciado=timezone.now() if eager else None,
+        worker="eager" if eager else "",
+    )
+    if eager:
+        ejecutar(trabajo, propagar=True)
+    return trabajo
+
+
+def avanzar(trabajo: Trabajo, progreso: int, total: Optional[int] = None, mensaje: Optional[str] = None) -> None:
+    """Record the progress of a running task (one ``UPDATE``)."""
+
+    cambios = {"progreso": progreso, "latido": timezone.now()}
+    if total is not None:
+        cambios["total"] = total
+    if mensaje is not None:
+        cambios["mensaje"] = mensaje[:255]
+    Trabajo.objects.filter(pk=trabajo.pk).update(**cambios)
+    for campo, valor in cambios.items():
+        setattr(trabajo, campo, valor)
+
+
+def tomar(worker: str) -> Optional[Trabajo]:
+    """Claim the next available job for ``worker``; ``None`` when the queue is empty."""
+
+    ahora = timezone.now()
+    candidatos = (
+        Trabajo.objects.filter(estado=Trabajo.PENDIENTE, disponible_desde__lte=ahora)
+        .order_by("disponible_desde", "pk")
+        .values_list("pk", flat=True)
+    )
+    for pk in candidatos[:10]:
+        tomado = Trabajo.objects.filter(pk=pk, estado=Trabajo.PENDIENTE).update(
+            estado=Trabajo.EN_CURSO, intentos=F("intentos") + 1, iniciado=ahora, latido=ahora, worker=worker[:120]
+        )
+        if tomado:  # otro worker pudo ganarlo entre el SELECT y el UPDATE
+            return Trabajo.objects.get(pk=pk)
+    return None
+
+
+def _terminar(trabajo: Trabajo, **cambios) -> None:
+    Trabajo.objects.filter(pk=trabajo.pk).update(**cambios)
+    for campo, valor in cambios.items():
+        setattr(trabajo, campo, valor)
+
+
+def ejecutar(trabajo: Trabajo, *, propagar: bool = False) -> Trabajo:
+    """Run a claimed job and store its outcome (result, retry or error)."""
+
+    funcion = _TAREAS.get(trabajo.tipo)
+    try:
+        if funcion is None:
+            raise TrabajoError(f"No existe la tarea '{trabajo.tipo}'.")
+        resultado = funcion(trabajo, **trabajo.parametros)
+    except Exception as exc:
+        conocido = isinstance(exc, TrabajoError)
+        definitivo = conocido or trabajo.intentos >= trabajo.max_intentos
+        cambios = {"error": traceback.format_exc(), "mensaje": str(exc)[:255] if conocido else ""}
+        if definitivo:
+            _terminar(trabajo, estado=Trabajo.ERROR, terminado=timezone.now(), **cambios)
+        else:
+            espera = datetime.timedelta(seconds=REINTENTO_SEGUNDOS * 2 ** (trabajo.intentos - 1))
+            _terminar(trabajo, estado=Trabajo.PENDIENTE, disponible_desde=timezone.now() + espera, **cambios)
+        logger.warning("Falló el trabajo %s (intento %s)", trabajo, trabajo.intentos, exc_info=not conocido)
+        if propagar and not conocido:
+            raise
+    else:
+        _terminar(trabajo, estado=Trabajo.TERMINADO, resultado=resultado, error="", terminado=timezone.now())
+    return trabajo
+
+
+def ejecutar_por_id(pk: int) -> str:
+    """Pool entry point: run job ``pk`` with a fresh connection and return its final state."""
+
+    close_old_connections()
+    try:
+        return ejecutar(Trabajo.objects.get(pk=pk)).estado
+    finally:
+        connections.close_all()
+
+
+def latir(worker: str) -> int:
+    """Refresh the heartbeat of every job ``worker`` is running."""
+
+    return Trabajo.objects.filter(estado=Trabajo.EN_CURSO, worker=worker[:120]).update(latido=timezone.now())
+
+
+class Latido(threading.Thread):
+    """Daemon thread that calls :func:`latir` every ``intervalo`` seconds until :meth:`detener`.
+
+    It runs apart from the tasks, so a long step without :func:`avanzar`
+    (or a task busy in another process) still keeps its job alive.
+    """
+
+    def __init__(self, worker: str, intervalo: float = LATIDO_SEGUNDOS) -> None:
+        super().__init__(name="ligas-latido", daemon=True)
+        self.worker = worker
+        self.intervalo = intervalo
+        self._fin = threading.Event()
+
+    def run(self) -> None:
+        try:
+            while not self._fin.wait(self.intervalo):
+                try:
+                    latir(self.worker)
+                except Exception:  # noqa: BLE001 - un corte de la base no debe matar el hilo
+                    logger.warning("No se pudo registrar el latido de %s", self.worker, exc_info=True)
+        finally:
+            connections.close_all()
+
+    def detener(self) -> None:
+        self._fin.set()
+        self.join()
+
+
+def liberar_colgados(segundos: int) -> int:
+    """Requeue (or fail) the running jobs without a heartbeat for ``segundos``, e.g. from a dead worker."""
+
+    ahora = timezone.now()
+    limite = ahora - datetime.timedelta(seconds=segundos)
+    colgados = Trabajo.objects.filter(estado=Trabajo.EN_CURSO, latido__lt=limite)
+    # Si ya agotó los intentos no se reencola: puede ser justamente lo que tira abajo al worker
+    agotados = colgados.filter(intentos__gte=F("max_intentos")).update(
+        estado=Trabajo.ERROR, mensaje="El worker se detuvo durante el último intento.", terminado=ahora
+    )
+    return agotados + colgados.update(estado=Trabajo.PENDIENTE, disponible_desde=ahora)
+
+
+__all__ = [
+    "Latido",
+    "TrabajoError",
+    "avanzar",
+    "ejecutar",
+    "ejecutar_por_id",
+    "encolar",
+    "latir",
+    "liberar_colgados",
+    "tarea",
+    "tomar",
+]
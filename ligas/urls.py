@@ -1,19 +1,22 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 from .abm_views import (
     AdminHomeView,
-    LigaListView, LigaCreateView, LigaUpdateView, LigaDeleteView,
+    LigaListView, LigaCreateView, LigaUpdateView, LigaDeleteView, LigaExportView, LigaArchivoView,
     ClubListView, ClubCreateView, ClubUpdateView, ClubDeleteView,
     TorneoListView, TorneoCreateView, TorneoUpdateView, TorneoDeleteView, TorneoFixtureView,
     PartidoFixtureResultadoView,
     RondaListView, RondaCreateView, RondaUpdateView, RondaDeleteView,
     CategoriaListView, CategoriaCreateView, CategoriaUpdateView, CategoriaDeleteView,
+    CategoriaGoleadoresView,
     EquipoListView, EquipoCreateView, EquipoGenerateView, EquipoUpdateView, EquipoDeleteView,
     EquipoDetailView,
-    JugadorListView, JugadorCreateView, JugadorUpdateView, JugadorDeleteView,
+    JugadorListView, JugadorCreateView, JugadorImportView, JugadorDuplicadosView, JugadorUpdateView, JugadorDeleteView,
     ArbitroListView, ArbitroCreateView, ArbitroUpdateView, ArbitroDeleteView,
     IdentidadView,
+    PurgaEstadoView,
+    TrabajoEstadoView,
 )
 
 app_name = "ligas"
@@ -21,6 +24,17 @@ app_name = "ligas"
 urlpatterns = [
     # público/home
     path("", views.home, name="home"),
+    path("torneos/<int:pk>/fixture/", views.torneo_fixture, name="publico_fixture"),
+    path("ligas/<int:pk>/posiciones/", views.liga_posiciones, name="publico_posiciones"),
+
+    # API pública de sólo lectura
+    path("api/v1/ligas/", api.ligas, name="api_ligas"),
+    path("api/v1/ligas/<int:pk>/torneos/", api.liga_torneos, name="api_liga_torneos"),
+    path("api/v1/ligas/<int:pk>/posiciones/", api.liga_posiciones, name="api_liga_posiciones"),
+    path("api/v1/torneos/<int:pk>/fixture/", api.torneo_fixture, name="api_torneo_fixture"),
+    path("api/v1/torneos/<int:pk>/resultados/", api.torneo_resultados, name="api_torneo_resultados"),
+    path("api/v1/torneos/<int:pk>/evolucion/", api.torneo_evolucion, name="api_torneo_evolucion"),
+    path("api/v1/torneos/<int:pk>/en-vivo/", views.torneo_en_vivo, name="api_torneo_en_vivo"),
 
     # administración (non-admin)
     path("administracion/", AdminHomeView.as_view(), name="admin_home"),
@@ -29,6 +43,18 @@ urlpatterns = [
     path("administracion/ligas/nueva/", LigaCreateView.as_view(), name="liga_create"),
     path("administracion/ligas/<int:pk>/editar/", LigaUpdateView.as_view(), name="liga_update"),
     path("administracion/ligas/<int:pk>/eliminar/", LigaDeleteView.as_view(), name="liga_delete"),
+    path("administracion/ligas/<int:pk>/archivo/", LigaArchivoView.as_view(), name="liga_archivo"),
+    path(
+        "administracion/eliminaciones/<slug:tipo>/<int:pk>/",
+        PurgaEstadoView.as_view(),
+        name="purga_estado",
+    ),
+    path("administracion/trabajos/<int:pk>/", TrabajoEstadoView.as_view(), name="trabajo_estado"),
+    path(
+        "administracion/ligas/<int:pk>/exportar/<slug:dataset>.<slug:formato>",
+        LigaExportView.as_view(),
+        name="liga_export",
+    ),
 
     path("administracion/clubes/", ClubListView.as_view(), name="club_list"),
     path("administracion/clubes/nuevo/", ClubCreateView.as_view(), name="club_create"),
@@ -55,6 +81,7 @@ urlpatterns = [
     path("administracion/categorias/nuevo/", CategoriaCreateView.as_view(), name="categoria_create"),
     path("administracion/categorias/<int:pk>/editar/", CategoriaUpdateView.as_view(), name="categoria_update"),
     path("administracion/categorias/<int:pk>/eliminar/", CategoriaDeleteView.as_view(), name="categoria_delete"),
+    path("administracion/categorias/<int:pk>/goleadores/", CategoriaGoleadoresView.as_view(), name="categoria_goleadores"),
 
     path("administracion/equipos/", EquipoListView.as_view(), name="equipo_list"),
     path("administracion/equipos/generar/", EquipoGenerateView.as_view(), name="equipo_generate"),
@@ -65,6 +92,8 @@ urlpatterns = [
 
     path("administracion/jugadores/", JugadorListView.as_view(), name="jugador_list"),
     path("administracion/jugadores/nuevo/", JugadorCreateView.as_view(), name="jugador_create"),
+    path("administracion/jugadores/importar/", JugadorImportView.as_view(), name="jugador_import"),
+    path("administracion/jugadores/duplicados/", JugadorDuplicadosView.as_view(), name="jugador_duplicados"),
     path("administracion/jugadores/<int:pk>/editar/", JugadorUpdateView.as_view(), name="jugador_update"),
     path("administracion/jugadores/<int:pk>/eliminar/", JugadorDeleteView.as_view(), name="jugador_delete"),
 
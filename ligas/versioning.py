@@ -0,0 +1,120 @@
+"""Per-torneo and per-liga version counters kept in the cache.
+
+Every write that changes what the public API shows bumps a counter (from the
+signal handlers in ``ligas.signals`` or explicitly after bulk operations, which
+bypass signals). ETags are built from these counters only, so conditional
+requests are answered without touching the database.
+
+A missing counter (cold cache, eviction) is seeded from the clock instead of
+zero, so a restarted cache never hands out an ETag that was already issued
+for different content.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+PREFIJO = "ligas:version"
+# Nombres de club, ligas y torneos aparecen en todas las respuestas
+GLOBAL = "global"
+# Identidad del sitio (título, colores, logo) que usa la base del panel
+IDENTIDAD = "identidad"
+
+
+def _key(ambito: str, pk: Optional[int] = None) -> str:
+    return f"{PREFIJO}:{ambito}" if pk is None else f"{PREFIJO}:{ambito}:{pk}"
+
+
+def get_version(ambito: str, pk: Optional[int] = None) -> int:
+    key = _key(ambito, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(ambito: str, pk: Optional[int] = None) -> int:
+    """:func:`get_version` for async views, through the async cache API."""
+
+    key = _key(ambito, pk)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(ambito: str, pk: Optional[int] = None) -> None:
+    key = _key(ambito, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_torneo(torneo_id: Optional[int]) -> None:
+    if torneo_id is not None:
+        bump_version("torneo", torneo_id)
+
+
+def bump_liga(liga_id: Optional[int]) -> None:
+    if liga_id is not None:
+        bump_version("liga", liga_id)
+
+
+def bump_global() -> None:
+    bump_version(GLOBAL)
+
+
+def bump_identidad() -> None:
+    bump_version(IDENTIDAD)
+
+
+def invalidar(bump: Callable[..., None], *args) -> None:
+    """Bump now and again on commit.
+
+    The second bump covers readers that cached the pre-commit content under
+    the version produced by the first one.
+    """
+
+    bump(*args)
+    transaction.on_commit(lambda: bump(*args))
+
+
+def _etag(ambito: str, pk: Optional[int], version_global: int, version: Optional[int]) -> str:
+    partes = [ambito, str(version_global)]
+    if pk is not None:
+        partes.extend([str(pk), str(version)])
+    return '"' + "-".join(partes) + '"'
+
+
+def etag(ambito: str, pk: Optional[int] = None) -> str:
+    """Strong ETag for the resources of ``ambito``/``pk`` (plus the global counter)."""
+
+    return _etag(ambito, pk, get_version(GLOBAL), None if pk is None else get_version(ambito, pk))
+
+
+async def aetag(ambito: str, pk: Optional[int] = None) -> str:
+    """:func:`etag` for async views; the cache is not called from the event loop."""
+
+    version = None if pk is None else await aget_version(ambito, pk)
+    return _etag(ambito, pk, await aget_version(GLOBAL), version)
+
+
+__all__ = [
+    "aetag",
+    "aget_version",
+    "bump_global",
+    "bump_identidad",
+    "bump_liga",
+    "bump_torneo",
+    "bump_version",
+    "etag",
+    "get_version",
+    "invalidar",
+]
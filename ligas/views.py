@@ -1,5 +1,130 @@
+"""Public read-only pages, written as native async views.
+
+Data is loaded with the async ORM (``aget``/``async for``) and independent
+queries are awaited together with ``asyncio.gather``. Rendering goes through
+``sync_to_async`` because the context processors and the ``perms`` proxy of
+the base template still touch the database synchronously.
+"""
+
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render
 
+from .live import stream_torneo
+from .models import Categoria, Liga, PartidoFixture, ResultadoCategoriaPartido, TablaPosicion, Torneo
+
+RONDA_NOMBRES = dict(PartidoFixture.RONDA_CHOICES)
+
+arender = sync_to_async(render)
+
+
+async def _lista(queryset):
+    return [fila async for fila in queryset]
+
+
+async def _objeto(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist as exc:
+        raise Http404 from exc
+
+
+async def home(request):
+    ligas, torneos = await asyncio.gather(
+        _lista(Liga.objects.order_by("-temporada", "nombre").values("id", "nombre", "temporada")),
+        _lista(Torneo.objects.order_by("nombre").values("id", "nombre", "liga_id")),
+    )
+    por_liga = defaultdict(list)
+    for torneo in torneos:
+        por_liga[torneo["liga_id"]].append(torneo)
+    for liga in ligas:
+        liga["torneos"] = por_liga.get(liga["id"], [])
+    return await arender(request, "ligas/home.html", {"ligas_publicas": ligas})
+
+
+async def torneo_fixture(request, pk):
+    torneo, partidos, completados, total_categorias = await asyncio.gather(
+        _objeto(Torneo.objects.select_related("liga"), pk=pk),
+        _lista(
+            PartidoFixture.objects.filter(torneo_id=pk)
+            .order_by("ronda", "fecha_nro", "id")
+            .values(
+                "id", "ronda", "fecha_nro", "fecha_programada", "goles_local", "goles_visitante",
+                local=F("club_local__nombre"),
+                visitante=F("club_visitante__nombre"),
+            )
+        ),
+        _lista(
+            ResultadoCategoriaPartido.objects.filter(partido__torneo_id=pk)
+            .order_by()
+            .values_list("partido_id")
+            .annotate(n=Count("id"))
+        ),
+        Categoria.objects.filter(liga__torneos=pk).acount(),
+    )
+
+    completados = dict(completados)
+    fechas = defaultdict(list)
+    for partido in partidos:
+        cargados = completados.get(partido["id"], 0)
+        if cargados == 0:
+            partido["estado"] = "pendiente"
+        elif cargados == total_categorias:
+            partido["estado"] = "jugado"
+        else:
+            partido["estado"] = "parcial"
+        fechas[(partido["ronda"], partido["fecha_nro"])].append(partido)
+
+    rondas = defaultdict(list)
+    for (ronda, fecha_nro), lista in fechas.items():
+        rondas[ronda].append({"numero": fecha_nro, "partidos": lista})
+    return await arender(
+        request,
+        "ligas/publico/fixture.html",
+        {
+            "torneo": torneo,
+            "rondas": [
+                {"label": RONDA_NOMBRES.get(ronda, ronda), "fechas": lista} for ronda, lista in rondas.items()
+            ],
+        },
+    )
+
+
+async def liga_posiciones(request, pk):
+    liga, filas = await asyncio.gather(
+        _objeto(Liga.objects.all(), pk=pk),
+        _lista(
+            TablaPosicion.objects.filter(categoria__liga_id=pk)
+            .order_by("categoria__nombre", "-puntos", "-pg", "gc", "-gf", "equipo__club__nombre")
+            .values(
+                "puntos", "pj", "pg", "pe", "pp", "gf", "gc",
+                categoria_nombre=F("categoria__nombre"),
+                club=F("equipo__club__nombre"),
+            )
+        ),
+    )
+    categorias = defaultdict(list)
+    for fila in filas:
+        fila["dg"] = fila["gf"] - fila["gc"]
+        categorias[fila["categoria_nombre"]].append(fila)
+    return await arender(
+        request,
+        "ligas/publico/posiciones.html",
+        {"liga": liga, "categorias": [{"nombre": nombre, "tabla": tabla} for nombre, tabla in categorias.items()]},
+    )
+
+
+async def torneo_en_vivo(request, pk):
+    """Server-Sent Events with the result changes of a torneo (requires ASGI)."""
 
-def home(request):
-    return render(request, "ligas/home.html")
+    if not await Torneo.objects.filter(pk=pk).aexists():
+        raise Http404("Torneo inexistente.")
+    response = StreamingHttpResponse(stream_torneo(pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Evita que Nginx acumule el stream en su buffer
+    response["X-Accel-Buffering"] = "no"
+    return response